@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks de Parqués
+Mide los caminos calientes de ParquesGame y el despacho de ParquesServer
+sobre partidas a mitad de juego generadas con semilla fija, y compara los
+resultados contra una línea base guardada.
+
+La línea base depende de la máquina y no está en el repositorio: se crea
+con --save en la misma máquina, antes de los cambios que se quieren medir.
+Sin ella la comparación termina con error.
+
+Uso:
+    python parques_bench.py --save          # Guardar los resultados como línea base
+    python parques_bench.py                 # Ejecutar y comparar con la línea base
+    python parques_bench.py --threshold 0.1 # Fallar si algo empeora más de un 10%
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+from parques_server_improved import ParquesGame, ParquesServer
+
+DEFAULT_BASELINE = 'bench_baseline.json'
+DEFAULT_SEED = 1234
+
+
+def build_midgame(seed=DEFAULT_SEED, players=4):
+    """Crea una partida a mitad de juego reproducible"""
+    random.seed(seed)
+    game = ParquesGame()
+    for i in range(players):
+        game.add_player(f"127.0.0.1:{5000 + i}", f"Jugador{i + 1}")
+    game.start_game()
+
+    # Repartir las fichas: una en cárcel, una en casa en algunos jugadores y el resto en el tablero
+    for index, player in enumerate(game.players.values()):
+        positions = random.sample([p for p in range(85) if game.board[p]['type'] == 'normal'], 3)
+        player['pieces'][0]['position'] = 'jail'
+        for piece, position in zip(player['pieces'][1:], positions):
+            piece['position'] = position
+        if index % 2:
+            player['pieces'][3]['position'] = 'home'
+            player['finished_pieces'] = 1
+        player['in_jail'] = 1
+
+    # Log lleno, como en una partida larga
+    for i in range(100):
+        game.add_log(f"Evento de relleno {i}")
+    game.commit()  # Publicar el estado preparado, como al terminar una acción
+    random.seed(seed)
+    return game
+
+
+def bench_move_piece(game):
+    """move_piece que captura una ficha rival (recorre a todos los rivales)"""
+    player_id = game.turn_order[0]
+    piece = game.players[player_id]['pieces'][1]
+    rival = game.players[game.turn_order[1]]
+    rival_piece = rival['pieces'][1]
+
+    # Colocar la ficha rival en una casilla normal a 7 pasos
+    start = 40
+    while game.board[start + 7]['type'] != 'normal':
+        start += 1
+    piece['position'] = start
+    rival_piece['position'] = start + 7
+
+    def op():
+        game.move_piece(player_id, 1, 7)
+        piece['position'] = start
+        rival_piece['position'] = start + 7
+        rival['in_jail'] -= 1
+    return op
+
+
+def bench_send_to_jail(game):
+    """send_to_jail de una ficha rival y restauración de su posición"""
+    player_id = game.turn_order[1]
+    player = game.players[player_id]
+    piece = player['pieces'][2]
+    position = piece['position']
+
+    def op():
+        game.send_to_jail(player_id, position)
+        piece['position'] = position
+        player['in_jail'] -= 1
+    return op
+
+
+def bench_state_json(game):
+    """get_game_state seguido de json.dumps, como en cada respuesta"""
+    def op():
+        json.dumps(game.get_game_state())
+    return op
+
+
+def bench_add_log(game):
+    """add_log con el log ya en su tamaño máximo"""
+    def op():
+        game.add_log("Jugador1 tiró 3 y 4 (Total: 7)")
+    return op
+
+
+def bench_next_turn(game):
+    """next_turn rotando entre los cuatro jugadores"""
+    def op():
+        game.next_turn()
+    return op
+
+
+def _server_with(game):
+    server = ParquesServer('127.0.0.1', 0)
+    server.socket.close()  # Solo se usa para despachar mensajes
+    server.game = game
+    for player_id, player in game.players.items():
+        server.clients[player_id] = {'name': player['name']}
+    return server
+
+
+def bench_dispatch_get_state(game):
+    """process_message con get_state (lock, despacho y métricas)"""
+    server = _server_with(game)
+    player_id = game.turn_order[0]
+    message = {'action': 'get_state'}
+
+    def op():
+        server.process_message(player_id, message)
+    return op
+
+
+def bench_dispatch_rejected(game):
+    """process_message con roll_dice fuera de turno (solo despacho y validación)"""
+    server = _server_with(game)
+    player_id = game.turn_order[1]
+    message = {'action': 'roll_dice'}
+
+    def op():
+        server.process_message(player_id, message)
+    return op
+
+
+BENCHMARKS = {
+    'move_piece': bench_move_piece,
+    'send_to_jail': bench_send_to_jail,
+    'get_game_state+json': bench_state_json,
+    'add_log_full': bench_add_log,
+    'next_turn': bench_next_turn,
+    'process_message_get_state': bench_dispatch_get_state,
+    'process_message_rejected': bench_dispatch_rejected,
+}
+
+
+def run_benchmark(factory, seed, repeat):
+    """Devuelve el mejor tiempo por operación en microsegundos"""
+    game = build_midgame(seed)
+    timer = timeit.Timer(factory(game))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e6
+
+
+def machine_description():
+    """Máquina en la que se midió: las líneas base solo se comparan en la misma"""
+    return f"{platform.node()} {platform.platform()} {platform.processor() or platform.machine()}"
+
+
+def load_baseline(path):
+    """Resultados de la línea base; sin ella no hay con qué comparar y se termina con error
+
+    Las líneas base dependen de la máquina, así que no se guardan en el
+    repositorio: cada quien crea la suya con --save antes de sus cambios.
+    """
+    if not os.path.exists(path):
+        print(f"❌ No hay línea base en {path}. Créala en esta máquina, antes de tus cambios, con:")
+        print(f"    python {os.path.basename(sys.argv[0])} --save")
+        sys.exit(2)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    print(f"Línea base de {data.get('machine', 'una máquina sin registrar')} (Python {data.get('python')})")
+    if data.get('machine') != machine_description():
+        print("⚠️ La línea base se midió en otra máquina: los cambios no son comparables")
+    return data.get('results', {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks del motor de Parqués")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Archivo de línea base")
+    parser.add_argument('--save', action='store_true', help="Guardar los resultados como línea base")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Regresión tolerada respecto a la línea base (0.25 = 25%%)")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por benchmark")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--filter', default=None, help="Ejecutar solo los benchmarks que contengan este texto")
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save:
+        baseline = load_baseline(args.baseline)
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<28}{'µs/op':>10}{'base':>10}{'cambio':>10}")
+
+    for name, factory in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+
+        # El juego imprime cada entrada del log; no medir la consola
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            value = run_benchmark(factory, args.seed, args.repeat)
+        results[name] = round(value, 3)
+
+        line = f"{name:<28}{value:>10.2f}"
+        if name in baseline:
+            change = (value - baseline[name]) / baseline[name]
+            line += f"{baseline[name]:>10.2f}{change * 100:>+9.1f}%"
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  ⚠️ REGRESIÓN"
+        print(line)
+
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_description(), 'seed': args.seed, 'python': sys.version.split()[0], 'results': results},
+                      f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.baseline}")
+
+    if regressions:
+        print(f"❌ Regresiones por encima del {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
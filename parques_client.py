@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente de Parqués sin Interfaz
+Protocolo del servidor (JSON sobre TCP, sin delimitadores) en dos variantes:
+ParquesClient con sockets bloqueantes y AsyncParquesClient con asyncio. Lo
+usan el cliente gráfico, los bots y las pruebas de carga e integración; no
+importa pygame (ni asyncio hasta crear un AsyncParquesClient), así que
+carga en milisegundos y cientos de clientes caben en un solo proceso.
+
+Uso:
+    client = ParquesClient('localhost', 12345)
+    client.connect()
+    client.join('Ana')
+    client.get_state()
+    print(client.game_state['current_turn'])
+"""
+
+import codecs
+import json
+import socket
+import threading
+import time
+
+from parques_client_state import GameStateStore, thaw
+
+DEFAULT_HOST = 'localhost'
+DEFAULT_PORT = 12345
+DEFAULT_TIMEOUT = 5.0
+
+
+class ResponseReader:
+    """Separa las respuestas JSON que llegan pegadas o partidas en el flujo TCP"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.decoder = json.JSONDecoder()
+        # Un carácter UTF-8 puede quedar partido entre dos lecturas
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    def feed(self, raw):
+        self.buffer += self.utf8.decode(raw)
+
+    def clear(self):
+        self.buffer = ""
+        self.utf8.reset()
+
+    def next_response(self):
+        """La siguiente respuesta completa, o None si aún faltan datos
+
+        Lo que haya antes del primer '{' se descarta. Un JSON mal formado (y no
+        solo incompleto) lanza ValueError.
+        """
+        start = self.buffer.find('{')
+        if start < 0:
+            self.buffer = ""
+            return None
+        text = self.buffer[start:]
+        try:
+            response, end = self.decoder.raw_decode(text)
+        except json.JSONDecodeError as e:
+            if "Expecting" in str(e) or "Unterminated" in str(e):
+                self.buffer = text
+                return None
+            self.buffer = ""
+            raise ValueError(f"Error de formato JSON: {e}")
+        self.buffer = text[end:]
+        return response
+
+
+def error_response(message, network=False):
+    """Respuesta de error; network marca los fallos de la conexión (el servidor no respondió)"""
+    response = {'status': 'error', 'message': message}
+    if network:
+        response['network_error'] = True
+    return response
+
+
+def apply_events(state, events):
+    """Estado que resulta de aplicar a state los cambios de cada versión enviados al reanudar
+
+    Cada cambio es ['set', ruta, valor] o ['del', ruta]. Aplicar un cambio que
+    ya estaba aplicado no falla, así que no importa si el cliente ya había
+    visto parte de esas versiones.
+    """
+    state = thaw(state) if state is not None else {}
+    for event in events:
+        for change in event['changes']:
+            operation, path = change[0], change[1]
+            if not path:
+                if operation == 'set':
+                    state = thaw(change[2])
+                continue
+            parent = state
+            for key in path[:-1]:
+                try:
+                    parent = parent[key]
+                except (KeyError, IndexError, TypeError):
+                    parent = None
+                    break
+            if parent is None:
+                continue
+            key = path[-1]
+            if operation == 'set':
+                if isinstance(parent, list) and key >= len(parent):
+                    continue
+                parent[key] = thaw(change[2])
+            elif isinstance(parent, dict):
+                parent.pop(key, None)
+        state['version'] = event['version']
+    return state
+
+
+class ClientSession:
+    """Estado de una sesión de jugador compartido por los clientes síncrono y asyncio
+
+    Las respuestas del servidor pasan por aquí para actualizar el jugador y el
+    almacén de estado; los errores se devuelven como respuestas con status
+    'error', igual que los del servidor.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=DEFAULT_TIMEOUT,
+                 state_store=None, profiler=None, log=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connected = False
+        self.reader = ResponseReader()
+
+        self.player_id = None
+        self.player_name = None
+        self.player_color = None
+        self.can_start = False
+        self.session_token = None  # Para reanudar la partida tras una caída de la conexión
+        self.room = None  # Sala en la que se unió
+        self.state_store = state_store or GameStateStore()
+
+        # profiler: record_rtt(acción, segundos, error) y record_bytes(received, sent), como ClientProfiler
+        self.profiler = profiler
+        self.log = log or (lambda message: None)
+
+    @property
+    def game_state(self):
+        return self.state_store.state
+
+    @property
+    def state_version(self):
+        """Última versión del estado conocida (la que se indica al reanudar)"""
+        state = self.state_store.latest()
+        return state.get('version') if state else None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    # Mensajes del protocolo
+
+    @staticmethod
+    def join_message(name, room=None):
+        """Sin sala se entra a la principal del servidor"""
+        message = {'action': 'join', 'name': name}
+        if room:
+            message['room'] = room
+        return message
+
+    @staticmethod
+    def move_message(piece_id, steps):
+        return {'action': 'move_piece', 'piece_id': piece_id, 'steps': steps}
+
+    def resume_message(self):
+        return {'action': 'resume', 'session_token': self.session_token, 'version': self.state_version}
+
+    # Respuestas
+
+    def record(self, message, start, response):
+        if self.profiler:
+            self.profiler.record_rtt(message.get('action'), time.perf_counter() - start,
+                                     error=response.get('status') == 'error')
+
+    def encode(self, message):
+        data = json.dumps(message).encode('utf-8')
+        if self.profiler:
+            self.profiler.record_bytes(sent=len(data))
+        return data
+
+    def decode(self, raw):
+        if self.profiler:
+            self.profiler.record_bytes(received=len(raw))
+        self.reader.feed(raw)
+
+    def failed(self, error):
+        """Convierte una excepción de red en una respuesta de error
+
+        Tras un error a mitad de petición la respuesta puede seguir en camino
+        (o llegar partida), y se leería como la de la petición siguiente: la
+        conexión deja de usarse y quien llama la cierra. Reanudar la sesión
+        abre una nueva.
+        """
+        self.connected = False
+        self.reader.clear()
+        if isinstance(error, socket.timeout):
+            self.log("Error: Tiempo de espera agotado al comunicarse con el servidor")
+            return error_response('Tiempo de espera agotado', network=True)
+        if isinstance(error, (ConnectionError, EOFError)):
+            self.log("Error: Conexión cerrada por el servidor")
+            return error_response('Conexión perdida', network=True)
+        if isinstance(error, ValueError):
+            self.log(str(error))
+            return error_response(str(error), network=True)
+        self.log(f"Error enviando mensaje: {error}")
+        return error_response(f'Error de comunicación: {error}', network=True)
+
+    def apply_join(self, name, response):
+        if response.get('status') == 'success':
+            self.player_name = name
+            self.player_id = response.get('player_id')
+            self.player_color = response.get('color')
+            self.can_start = response.get('can_start', False)
+            self.session_token = response.get('session_token')
+            self.room = response.get('room')
+        return response
+
+    def apply_resume(self, response, background=False):
+        """Recupera el jugador y pone el estado al día con los cambios perdidos"""
+        if response.get('status') != 'success':
+            return response
+        self.player_id = response.get('player_id')
+        self.player_name = response.get('name')
+        self.player_color = response.get('color')
+        self.can_start = response.get('can_start', False)
+        if 'events' in response:
+            state = apply_events(self.state_store.latest(), response['events'])
+            response = dict(response, game_state=state)
+        return self.apply_state(response, background)
+
+    def apply_state(self, response, background=False):
+        """Guarda el game_state de una respuesta; en segundo plano solo se publica"""
+        if response.get('status') in ('success', 'update') and 'game_state' in response:
+            if background:
+                self.state_store.publish(response['game_state'])
+            else:
+                self.state_store.update(response['game_state'])
+            if 'can_start' in response:
+                self.can_start = response.get('can_start', False)
+        return response
+
+
+class ParquesClient(ClientSession):
+    """Cliente con sockets bloqueantes; una petición a la vez por conexión"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.socket = None
+        self.lock = threading.Lock()  # El thread de actualización comparte la conexión
+
+    def connect(self):
+        """Abre la conexión; los errores de red se propagan como OSError"""
+        self.socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.reader.clear()
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+        if self.socket:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+
+    def request(self, message):
+        """Envía un mensaje y devuelve su respuesta (o una respuesta de error)"""
+        if not (self.connected and self.socket):
+            return error_response('No conectado al servidor', network=True)
+
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                self.socket.sendall(self.encode(message))
+                while True:
+                    response = self.reader.next_response()
+                    if response is not None:
+                        break
+                    raw = self.socket.recv(65536)
+                    if not raw:
+                        raise ConnectionError("Conexión cerrada por el servidor")
+                    self.decode(raw)
+            except Exception as e:
+                response = self.failed(e)
+                self.close()
+            self.record(message, start, response)
+        return response
+
+    def join(self, name, room=None):
+        return self.apply_join(name, self.request(self.join_message(name, room)))
+
+    def start_game(self):
+        return self.apply_state(self.request({'action': 'start_game'}))
+
+    def roll_dice(self):
+        return self.request({'action': 'roll_dice'})
+
+    def move_piece(self, piece_id, steps):
+        return self.apply_state(self.request(self.move_message(piece_id, steps)))
+
+    def get_state(self, background=False):
+        return self.apply_state(self.request({'action': 'get_state'}), background)
+
+    def resume(self, background=False):
+        """Abre una conexión nueva y reanuda la sesión en ella"""
+        # Otro thread puede estar a mitad de una petición: el socket se cambia con el lock
+        with self.lock:
+            self.close()
+            try:
+                self.connect()
+            except OSError as e:
+                return error_response(f"No se pudo reconectar: {e}", network=True)
+        return self.apply_resume(self.request(self.resume_message()), background)
+
+
+class AsyncParquesClient(ClientSession):
+    """Cliente asyncio: muchos jugadores en un solo thread"""
+
+    def __init__(self, *args, **kwargs):
+        import asyncio  # Solo quien usa la variante asyncio paga su import
+        super().__init__(*args, **kwargs)
+        self.stream_reader = None
+        self.stream_writer = None
+        self.lock = asyncio.Lock()
+
+    async def connect(self):
+        import asyncio
+        self.stream_reader, self.stream_writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        self.reader.clear()
+        self.connected = True
+        return True
+
+    async def close(self):
+        self.connected = False
+        if self.stream_writer:
+            self.stream_writer.close()
+            try:
+                await self.stream_writer.wait_closed()
+            except OSError:
+                pass
+            self.stream_writer = None
+
+    async def request(self, message):
+        import asyncio
+        if not (self.connected and self.stream_writer):
+            return error_response('No conectado al servidor', network=True)
+
+        async with self.lock:
+            start = time.perf_counter()
+            try:
+                self.stream_writer.write(self.encode(message))
+                await self.stream_writer.drain()
+                while True:
+                    response = self.reader.next_response()
+                    if response is not None:
+                        break
+                    raw = await asyncio.wait_for(self.stream_reader.read(65536), self.timeout)
+                    if not raw:
+                        raise ConnectionError("Conexión cerrada por el servidor")
+                    self.decode(raw)
+            except asyncio.TimeoutError:
+                response = self.failed(socket.timeout())
+                await self.close()
+            except Exception as e:
+                response = self.failed(e)
+                await self.close()
+            self.record(message, start, response)
+        return response
+
+    async def join(self, name, room=None):
+        return self.apply_join(name, await self.request(self.join_message(name, room)))
+
+    async def start_game(self):
+        return self.apply_state(await self.request({'action': 'start_game'}))
+
+    async def roll_dice(self):
+        return await self.request({'action': 'roll_dice'})
+
+    async def move_piece(self, piece_id, steps):
+        return self.apply_state(await self.request(self.move_message(piece_id, steps)))
+
+    async def get_state(self, background=False):
+        return self.apply_state(await self.request({'action': 'get_state'}), background)
+
+    async def resume(self, background=False):
+        async with self.lock:
+            await self.close()
+            try:
+                await self.connect()
+            except (OSError, TimeoutError) as e:
+                return error_response(f"No se pudo reconectar: {e}", network=True)
+        return self.apply_resume(await self.request(self.resume_message()), background)
@@ -5,25 +5,30 @@ Cliente Gráfico de Parqués Distribuido
 Sistemas Distribuidos - Proyecto Final
 """
 
+import time
+MODULE_LOAD_START = time.perf_counter()  # Para medir el import en el perfil de arranque
+
+import argparse
 import pygame
-import socket
 import json
 import threading
-import time
 import sys
 import random
 import math
 import os
+from collections import OrderedDict
 from pygame.locals import *
 
-# Inicializar pygame
-pygame.init()
-pygame.font.init()
+from parques_client import ParquesClient
+from parques_client_profiler import ClientProfiler, StartupProfile, profiled
+from parques_client_state import (GameStateStore, GameStarted, TurnChanged, PlayerJoined,
+                                  PlayerLeft, PieceMoved, PieceCaptured)
 
 # Configuración de la pantalla
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 700
 BOARD_SIZE = 600
+BOARD_BORDER = 20  # Borde marrón alrededor del tablero
 
 # Colores
 WHITE = (255, 255, 255)
@@ -46,18 +51,682 @@ COLOR_MAP = {
     'amarillo': YELLOW
 }
 
-# Fuentes
-FONT_SMALL = pygame.font.SysFont('Arial', 14)
-FONT_MEDIUM = pygame.font.SysFont('Arial', 18)
-FONT_LARGE = pygame.font.SysFont('Arial', 24)
-FONT_TITLE = pygame.font.SysFont('Arial', 36, bold=True)
+# Reconexión: espera inicial y máxima entre intentos de reanudar la sesión (segundos)
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 8.0
+
+
+def user_cache_dir():
+    """Carpeta de caché del usuario para el cliente (fuera del árbol del proyecto)"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'parques')
+
+
+# Fuentes (se cargan en load_fonts al crear el cliente)
+FONT_NAME = 'Arial'
+FONT_CACHE_PATH = os.path.join(user_cache_dir(), "font_cache.json")  # Rutas propias de cada máquina
+FONT_SMALL = None
+FONT_MEDIUM = None
+FONT_LARGE = None
+FONT_TITLE = None
+
+
+def init_pygame():
+    """Inicializa solo los módulos de pygame que usa el cliente (el mixer se inicia con los sonidos)"""
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+def resolve_font_paths(name, cache_path=FONT_CACHE_PATH):
+    """Archivos normal y negrita de una fuente del sistema, guardados en disco
+    
+    pygame.font.match_font recorre todas las fuentes instaladas, lo que tarda
+    segundos en algunos Linux. Solo se vuelve a buscar si un archivo guardado
+    ya no existe; borrar la caché fuerza la búsqueda. Una fuente que no se
+    encuentra no se guarda, así que se usa en cuanto se instale. None es la
+    fuente por defecto de pygame.
+    """
+    key = name.lower()
+    cache = {}
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    entry = cache.get(key)
+    if (entry and entry.get('regular')
+            and all(path is None or os.path.exists(path) for path in entry.values())):
+        return entry
+    
+    regular = pygame.font.match_font(name)
+    bold = pygame.font.match_font(name, bold=True)
+    # Sin archivo en negrita match_font devuelve el normal: la negrita se simula
+    entry = {'regular': regular, 'bold': bold if bold != regular else None}
+    if regular is None:
+        return entry
+    cache[key] = entry
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"No se pudo guardar la caché de fuentes: {e}")
+    return entry
+
+
+def load_fonts():
+    """Crea las fuentes globales a partir de las rutas guardadas (sin SysFont)"""
+    global FONT_SMALL, FONT_MEDIUM, FONT_LARGE, FONT_TITLE
+    if FONT_SMALL is not None:
+        return
+    paths = resolve_font_paths(FONT_NAME)
+    FONT_SMALL = pygame.font.Font(paths['regular'], 14)
+    FONT_MEDIUM = pygame.font.Font(paths['regular'], 18)
+    FONT_LARGE = pygame.font.Font(paths['regular'], 24)
+    FONT_TITLE = pygame.font.Font(paths['bold'] or paths['regular'], 36)
+    if not paths['bold']:
+        FONT_TITLE.set_bold(True)
+
+class TextCache:
+    """Caché LRU de superficies de texto renderizadas por (fuente, texto, color)"""
+    
+    ELLIPSIS = "..."
+    
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.fitted = OrderedDict()  # (fuente, texto, ancho) -> texto truncado
+        self.ellipsis_widths = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, font, text, color):
+        """Devuelve la superficie del texto, renderizándola solo la primera vez"""
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+    
+    def fit(self, font, text, color, max_width):
+        """Renderiza el texto truncado con "..." para que no supere max_width"""
+        return self.render(font, self.fit_text(font, text, max_width), color)
+    
+    def fit_text(self, font, text, max_width):
+        """Calcula con Font.size el texto más largo que cabe (sin renderizar)"""
+        key = (font, text, max_width)
+        fitted = self.fitted.get(key)
+        if fitted is not None:
+            self.fitted.move_to_end(key)
+            return fitted
+        
+        if font.size(text)[0] <= max_width:
+            fitted = text
+        else:
+            ellipsis_width = self.ellipsis_widths.get(font)
+            if ellipsis_width is None:
+                ellipsis_width = font.size(self.ELLIPSIS)[0]
+                self.ellipsis_widths[font] = ellipsis_width
+            
+            # Búsqueda binaria del prefijo más largo que cabe junto a los puntos suspensivos
+            low, high = 0, len(text)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if font.size(text[:middle])[0] + ellipsis_width <= max_width:
+                    low = middle
+                else:
+                    high = middle - 1
+            fitted = text[:low].rstrip() + self.ELLIPSIS
+        
+        self.fitted[key] = fitted
+        if len(self.fitted) > self.max_entries:
+            self.fitted.popitem(last=False)
+        return fitted
+
+
+class SurfacePool:
+    """Superficies reutilizables: paneles ya dibujados y superficies de trabajo
+    
+    Los paneles se guardan por clave (tamaño, alpha, estilo...) y las
+    superficies de trabajo se reciclan por tamaño. allocations cuenta cada
+    superficie creada; en modo depuración el bucle principal avisa si un
+    frame crea alguna.
+    """
+    
+    def __init__(self, max_cached=64):
+        self.max_cached = max_cached
+        self.cached = OrderedDict()
+        self.scratch_surfaces = {}
+        self.allocations = 0
+    
+    def new_surface(self, size, flags=pygame.SRCALPHA):
+        self.allocations += 1
+        return pygame.Surface(size, flags)
+    
+    def get(self, key, builder):
+        """Devuelve la superficie guardada para key o la crea con builder()"""
+        surface = self.cached.get(key)
+        if surface is None:
+            surface = builder()
+            self.cached[key] = surface
+            if len(self.cached) > self.max_cached:
+                self.cached.popitem(last=False)
+        else:
+            self.cached.move_to_end(key)
+        return surface
+    
+    def scratch(self, size, clear=True):
+        """Superficie temporal de un tamaño; solo es válida hasta el siguiente uso del mismo tamaño"""
+        surface = self.scratch_surfaces.get(size)
+        if surface is None:
+            surface = self.new_surface(size)
+            self.scratch_surfaces[size] = surface
+        elif clear:
+            surface.fill((0, 0, 0, 0))
+        return surface
+
+
+class RenderScheduler:
+    """Lleva las zonas sucias de la pantalla y decide cuándo hace falta redibujar
+    
+    Si no hay zonas sucias ni animaciones en curso el cliente está ocioso y
+    el bucle principal espera eventos en lugar de dibujar.
+    """
+    
+    def __init__(self, size, active_fps=60, idle_fps=4):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.active_fps = active_fps
+        self.idle_timeout_ms = int(1000 / idle_fps)
+        self.dirty_rects = []
+        self.full_redraw = True
+        self.animating = False
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+    
+    def mark_dirty(self, rect=None):
+        """Marca una zona para redibujar (None = toda la pantalla)"""
+        if rect is None:
+            self.full_redraw = True
+        else:
+            rect = pygame.Rect(rect).clip(self.screen_rect)
+            if rect.width and rect.height:
+                self.dirty_rects.append(rect)
+    
+    def is_idle(self):
+        return not (self.full_redraw or self.dirty_rects or self.animating)
+    
+    def take_dirty(self):
+        """Devuelve las zonas a redibujar en este frame y las limpia"""
+        if self.full_redraw:
+            rects = [self.screen_rect.copy()]
+        else:
+            rects = self.dirty_rects
+        self.full_redraw = False
+        self.dirty_rects = []
+        
+        if rects:
+            self.frames_drawn += 1
+        else:
+            self.frames_skipped += 1
+        return rects
+
+
+class BoardLayout:
+    """Centros en píxeles de las 96 casillas y las 16 plazas de cárcel
+    
+    Se calcula una sola vez para un tamaño y desplazamiento de tablero y lo
+    comparten el dibujado y la detección de clics.
+    """
+    
+    JAIL_CORNERS = {
+        'rojo': (1, 0),      # Esquina superior derecha
+        'verde': (0, 0),     # Esquina superior izquierda
+        'amarillo': (0, 1),  # Esquina inferior izquierda
+        'azul': (1, 1)       # Esquina inferior derecha
+    }
+    TRACK_SQUARES = 72  # Casillas 0-71: recorrido compartido alrededor del tablero
+    # Camino de cada color desde el recorrido hasta el centro (ver compute_square_center)
+    HOME_PATHS = {
+        'verde': range(72, 78),
+        'rojo': range(78, 84),
+        'amarillo': range(84, 90),
+        'azul': range(90, 96)
+    }
+    # Entrada a cada camino: última casilla del lado que llega a la esquina de ese color
+    HOME_ENTRANCES = {'verde': 71, 'rojo': 17, 'azul': 35, 'amarillo': 53}
+    
+    def __init__(self, board_size, board_offset_x, board_offset_y):
+        self.board_size = board_size
+        self.offset_x = board_offset_x
+        self.offset_y = board_offset_y
+        self.key = (board_size, board_offset_x, board_offset_y)
+        self.center = (board_offset_x + board_size // 2, board_offset_y + board_size // 2)
+        self.squares = [self.compute_square_center(position) for position in range(96)]
+        self.jail_slots = {color: self.compute_jail_slots(col, row)
+                           for color, (col, row) in self.JAIL_CORNERS.items()}
+    
+    def compute_jail_slots(self, col, row):
+        """Posiciones de las cuatro fichas dentro de una cárcel"""
+        jail_size = self.board_size // 4
+        center_x = self.offset_x + jail_size // 2 + col * (self.board_size - jail_size)
+        center_y = self.offset_y + jail_size // 2 + row * (self.board_size - jail_size)
+        return [(center_x - 25, center_y - 25), (center_x + 25, center_y - 25),
+                (center_x - 25, center_y + 25), (center_x + 25, center_y + 25)]
+    
+    def compute_square_center(self, server_position):
+        """Traduce una posición del servidor a coordenadas en nuestro tablero"""
+        board_size = self.board_size
+        board_offset_x = self.offset_x
+        board_offset_y = self.offset_y
+        
+        # Tamaño de las casillas y áreas
+        jail_size = board_size // 4
+        square_width = jail_size // 2
+        square_height = square_width // 2
+        
+        # Límites para cada lado del tablero (posiciones del servidor)
+        # Estos valores deberían ajustarse según la numeración real del servidor
+        top_min, top_max = 0, 17
+        right_min, right_max = 18, 35
+        bottom_min, bottom_max = 36, 53
+        left_min, left_max = 54, 71
+        
+        # Parte superior (entre verde y rojo)
+        if top_min <= server_position <= top_max:
+            rel_pos = server_position - top_min
+            x = board_offset_x + jail_size + (rel_pos + 1) * square_width + square_width // 2
+            y = board_offset_y + jail_size // 4
+        
+        # Parte derecha (entre rojo y azul)
+        elif right_min <= server_position <= right_max:
+            rel_pos = server_position - right_min
+            x = board_offset_x + board_size - jail_size // 4
+            y = board_offset_y + jail_size + rel_pos * square_height + square_height // 2
+        
+        # Parte inferior (entre azul y amarillo)
+        elif bottom_min <= server_position <= bottom_max:
+            rel_pos = server_position - bottom_min
+            x = board_offset_x + board_size - jail_size - rel_pos * square_width - square_width // 2
+            y = board_offset_y + board_size - jail_size // 4
+        
+        # Parte izquierda (entre amarillo y verde)
+        elif left_min <= server_position <= left_max:
+            rel_pos = server_position - left_min
+            x = board_offset_x + jail_size // 4
+            y = board_offset_y + board_size - jail_size - rel_pos * square_height - square_height // 2
+        
+        # Caminos hacia el centro (simplificados, ajustar según servidor)
+        elif 72 <= server_position <= 77:  # Camino verde
+            rel_pos = server_position - 72
+            x = board_offset_x + jail_size + square_width // 2
+            y = board_offset_y + jail_size // 2 + rel_pos * square_height + square_height // 2
+        
+        elif 78 <= server_position <= 83:  # Camino rojo
+            rel_pos = server_position - 78
+            x = board_offset_x + board_size - jail_size - rel_pos * square_width - square_width // 2
+            y = board_offset_y + jail_size + square_height // 2
+        
+        elif 84 <= server_position <= 89:  # Camino amarillo
+            rel_pos = server_position - 84
+            x = board_offset_x + jail_size + rel_pos * square_width + square_width // 2
+            y = board_offset_y + board_size - jail_size - square_height // 2
+        
+        else:  # Camino azul (90-95)
+            rel_pos = server_position - 90
+            x = board_offset_x + board_size - jail_size - square_width // 2
+            y = board_offset_y + board_size - jail_size - rel_pos * square_height - square_height // 2
+        
+        return (x, y)
+    
+    def square_center(self, server_position):
+        """Centro de una casilla; el centro del tablero si la posición no existe"""
+        if isinstance(server_position, int) and 0 <= server_position < len(self.squares):
+            return self.squares[server_position]
+        print(f"Posición desconocida: {server_position}")
+        return self.center
+    
+    def home_path(self, color, server_position):
+        """Centros por los que pasa una ficha que llega a casa desde server_position
+        
+        Sigue el recorrido hasta la entrada de su color, su camino y el centro.
+        """
+        path = self.HOME_PATHS.get(color)
+        if path is None or not isinstance(server_position, int):
+            return [self.square_center(server_position), self.center]
+        
+        if server_position in path:
+            squares = list(range(server_position, path.stop))
+        elif 0 <= server_position < self.TRACK_SQUARES:
+            steps = (self.HOME_ENTRANCES[color] - server_position) % self.TRACK_SQUARES
+            squares = [(server_position + step) % self.TRACK_SQUARES for step in range(steps + 1)]
+            squares += list(path)
+        else:
+            # En el camino de otro color: se salta directamente al suyo
+            squares = [server_position] + list(path)
+        return [self.square_center(square) for square in squares] + [self.center]
+    
+    def jail_slot(self, color, index):
+        """Posición de una ficha en la cárcel de su color"""
+        slots = self.jail_slots.get(color)
+        if slots and 0 <= index < len(slots):
+            return slots[index]
+        # Posición por defecto si algo falla
+        return self.center
+
+
+class PieceTween:
+    """Recorrido animado de una ficha entre varios puntos de pantalla"""
+    __slots__ = ('points', 'start', 'duration', 'kind', 'color', 'hop_height')
+    
+    def __init__(self, points, start, duration, kind, color, hop_height=0):
+        self.points = points
+        self.start = start
+        self.duration = max(1, duration)
+        self.kind = kind  # 'move', 'exit', 'capture' o 'home'
+        self.color = color
+        self.hop_height = hop_height
+    
+    def finished(self, now):
+        return now >= self.start + self.duration
+    
+    def position(self, now):
+        """Posición en el instante now: cada tramo dura lo mismo, con suavizado y un pequeño salto"""
+        t = (now - self.start) / self.duration
+        if t <= 0:
+            return self.points[0]
+        if t >= 1:
+            return self.points[-1]
+        
+        segments = len(self.points) - 1
+        progress = t * segments
+        index = min(int(progress), segments - 1)
+        local = progress - index
+        eased = local * local * (3 - 2 * local)
+        (x0, y0), (x1, y1) = self.points[index], self.points[index + 1]
+        hop = math.sin(math.pi * local) * self.hop_height
+        return (x0 + (x1 - x0) * eased, y0 + (y1 - y0) * eased - hop)
+    
+    def bounds(self):
+        """Zona de pantalla que recorre la ficha (incluye el salto y la sombra)"""
+        xs = [x for x, _ in self.points]
+        ys = [y for _, y in self.points]
+        margin = 40 if self.kind == 'capture' else 28  # El destello de la captura es más grande
+        return pygame.Rect(min(xs) - margin, min(ys) - margin - self.hop_height,
+                           max(xs) - min(xs) + 2 * margin, max(ys) - min(ys) + 2 * margin + self.hop_height)
+
+
+class PieceAnimator:
+    """Anima las fichas entre dos estados del servidor según el tiempo transcurrido
+    
+    Los movimientos siguen el recorrido real casilla por casilla; las fichas
+    capturadas vuelan a la cárcel cuando llega la ficha que las captura.
+    """
+    
+    HOP_MS = 110        # Tiempo por casilla
+    MAX_MOVE_MS = 1500
+    EXIT_MS = 400
+    CAPTURE_MS = 600
+    HOME_MS = 600
+    TRACK_LENGTH = 96
+    
+    def __init__(self):
+        # (jugador, ficha) -> PieceTween; solo lo usa el thread de dibujo: los eventos se
+        # aplican en GameStateStore.swap/update, que también corren en él
+        self.tweens = {}
+    
+    def start(self, events, layout, now):
+        """Crea las animaciones a partir de los eventos PieceMoved de un cambio de estado"""
+        arrivals = {}  # Casilla de llegada -> instante en que llega la ficha que se movió
+        captures = []
+        new_tweens = {}
+        
+        for event in events:
+            if not isinstance(event, PieceMoved):
+                continue
+            old_pos, new_pos = event.old_position, event.new_position
+            color, i = event.color, event.piece_id
+            key = (event.player_id, i)
+            # Si ya se estaba animando, seguir desde donde va
+            current = self.tweens.get(key)
+            origin = current.position(now) if current else None
+            
+            if isinstance(old_pos, int) and isinstance(new_pos, int):
+                steps = (new_pos - old_pos) % self.TRACK_LENGTH
+                points = [layout.square_center((old_pos + step) % self.TRACK_LENGTH)
+                          for step in range(steps + 1)]
+                duration = min(self.HOP_MS * steps, self.MAX_MOVE_MS)
+                tween = PieceTween(points, now, duration, 'move', color, hop_height=8)
+                arrivals[new_pos] = now + duration
+            elif old_pos == 'jail' and isinstance(new_pos, int):
+                points = [layout.jail_slot(color, i), layout.square_center(new_pos)]
+                tween = PieceTween(points, now, self.EXIT_MS, 'exit', color, hop_height=20)
+            elif isinstance(old_pos, int) and new_pos == 'jail':
+                captures.append((key, old_pos, color, i))
+                continue
+            elif isinstance(old_pos, int) and new_pos == 'home':
+                # Hasta la entrada de su color, por su camino y al centro
+                points = layout.home_path(color, old_pos)
+                duration = min(max(self.HOP_MS * (len(points) - 1), self.HOME_MS), self.MAX_MOVE_MS)
+                tween = PieceTween(points, now, duration, 'home', color, hop_height=8)
+            else:
+                continue
+            
+            if origin:
+                tween.points[0] = origin
+            new_tweens[key] = tween
+        
+        # La ficha capturada espera a que llegue la que la captura
+        for key, old_pos, color, i in captures:
+            start = arrivals.get(old_pos, now)
+            points = [layout.square_center(old_pos), layout.jail_slot(color, i)]
+            new_tweens[key] = PieceTween(points, start, self.CAPTURE_MS, 'capture', color, hop_height=40)
+        
+        self.tweens.update(new_tweens)
+    
+    def update(self, now):
+        """Quita las animaciones terminadas; devuelve True si terminó alguna"""
+        done = [key for key, tween in self.tweens.items() if tween.finished(now)]
+        for key in done:
+            del self.tweens[key]
+        return bool(done)
+    
+    def active(self):
+        """Animaciones en curso {(jugador, ficha): PieceTween}"""
+        return self.tweens
+
+
+class DiceAtlas:
+    """Las seis caras del dado pre-renderizadas en varios ángulos de giro
+    
+    Cada cuadro guarda la superficie y el desplazamiento desde el centro del
+    dado hasta su esquina, así un dado girando cuesta un solo blit.
+    """
+    
+    PIPS = {
+        1: [(0.5, 0.5)],
+        2: [(0.25, 0.25), (0.75, 0.75)],
+        3: [(0.25, 0.25), (0.5, 0.5), (0.75, 0.75)],
+        4: [(0.25, 0.25), (0.75, 0.25), (0.25, 0.75), (0.75, 0.75)],
+        5: [(0.25, 0.25), (0.75, 0.25), (0.5, 0.5), (0.25, 0.75), (0.75, 0.75)],
+        6: [(0.25, 0.25), (0.75, 0.25), (0.25, 0.5), (0.75, 0.5), (0.25, 0.75), (0.75, 0.75)]
+    }
+    
+    def __init__(self, sizes, angle_steps=24):
+        self.angle_steps = angle_steps
+        self.frames = {}  # (tamaño, valor) -> [(superficie, desplazamiento)] por ángulo
+        for size in sizes:
+            self.build_size(size)
+    
+    def build_size(self, size):
+        for value in self.PIPS:
+            face = self.render_face(size, value)
+            frames = []
+            for step in range(self.angle_steps):
+                angle = step * 360 / self.angle_steps
+                surface = pygame.transform.rotate(face, angle) if step else face
+                rect = surface.get_rect(center=(0, 0))
+                frames.append((surface.convert_alpha(), rect.topleft))
+            self.frames[(size, value)] = frames
+    
+    def render_face(self, size, value):
+        """Dibuja una cara sin girar"""
+        # Colores del dado
+        die_color = (230, 230, 230)  # Blanco ligeramente grisáceo
+        dot_color = (30, 30, 30)     # Negro suave
+        
+        die_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        
+        # Fondo del dado (con sombra)
+        pygame.draw.rect(die_surface, (30, 30, 40, 100), (4, 4, size, size), 0, 10)  # Sombra
+        pygame.draw.rect(die_surface, die_color, (0, 0, size, size), 0, 10)  # Dado
+        
+        # Efecto de borde
+        pygame.draw.rect(die_surface, (200, 200, 200), (0, 0, size, size), 2, 10)
+        
+        # Efecto de luz en la esquina
+        pygame.draw.circle(die_surface, (255, 255, 255, 100), (size//4, size//4), size//10)
+        
+        # Dibujar puntos según el valor con efecto 3D
+        dot_radius = size // 10
+        for px, py in self.PIPS[value]:
+            dot_x = int(px * size)
+            dot_y = int(py * size)
+            pygame.draw.circle(die_surface, (10, 10, 10), (dot_x + 1, dot_y + 1), dot_radius)  # Sombra
+            pygame.draw.circle(die_surface, dot_color, (dot_x, dot_y), dot_radius)  # Punto
+        
+        return die_surface
+    
+    def frame(self, size, value, angle=0):
+        """Cuadro más cercano al ángulo pedido (los tamaños nuevos se renderizan al primer uso)"""
+        if (size, value) not in self.frames:
+            self.build_size(size)
+        step = int(round(angle * self.angle_steps / 360)) % self.angle_steps
+        return self.frames[(size, value)][step]
+
+
+class HitTarget:
+    """Zona clicable: su rectángulo, qué es y la zona a redibujar al pasar el ratón"""
+    __slots__ = ('rect', 'kind', 'data', 'damage_rect')
+    
+    def __init__(self, rect, kind, data=None, damage_rect=None):
+        self.rect = rect
+        self.kind = kind  # 'control', 'piece' o 'square'
+        self.data = data
+        self.damage_rect = damage_rect or rect
+    
+    def key(self):
+        return (self.kind, self.data)
+
+
+class HitGrid:
+    """Índice espacial de las zonas clicables sobre una rejilla uniforme
+    
+    Cada celda guarda las zonas que la tocan en orden de inserción; la última
+    insertada queda encima. Un clic o un movimiento del ratón solo revisa las
+    pocas zonas de su celda.
+    """
+    
+    def __init__(self, size, cell_size=32):
+        self.cell_size = cell_size
+        self.cols = size[0] // cell_size + 1
+        self.rows = size[1] // cell_size + 1
+        self.clear()
+    
+    def clear(self):
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.count = 0
+    
+    def insert(self, rect, kind, data=None, damage_rect=None):
+        target = HitTarget(pygame.Rect(rect), kind, data, damage_rect)
+        rect = target.rect
+        first_col = max(0, rect.left // self.cell_size)
+        last_col = min(self.cols - 1, (rect.right - 1) // self.cell_size)
+        first_row = max(0, rect.top // self.cell_size)
+        last_row = min(self.rows - 1, (rect.bottom - 1) // self.cell_size)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                self.cells[row * self.cols + col].append(target)
+        self.count += 1
+        return target
+    
+    def hit(self, pos, kind=None):
+        """Devuelve la zona más alta bajo pos (opcionalmente solo de un tipo) o None"""
+        col = pos[0] // self.cell_size
+        row = pos[1] // self.cell_size
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        for target in reversed(self.cells[row * self.cols + col]):
+            if (kind is None or target.kind == kind) and target.rect.collidepoint(pos):
+                return target
+        return None
+
 
 class ParquesClientGUI:
-    def __init__(self, server_host='localhost', server_port=12345):
-        self.server_host = server_host
-        self.server_port = server_port
-        self.socket = None
-        self.connected = False
+    def __init__(self, server_host='localhost', server_port=12345, debug=False, startup_profile=None):
+        self.debug = debug  # Avisar de superficies creadas durante el dibujado
+        
+        # Fases del arranque; --startup-profile las imprime tras el primer frame
+        self.startup = startup_profile or StartupProfile()
+        self.startup.record('import', MODULE_LOADED - MODULE_LOAD_START)
+        with self.startup.phase('pygame'):
+            init_pygame()
+            # Crear el reloj inicia también el temporizador de SDL (pygame.time.get_ticks)
+            self.clock = pygame.time.Clock()
+        with self.startup.phase('fuentes'):
+            load_fonts()
+        
+        self.surface_pool = SurfacePool()
+        
+        # Tiempos por frame y fase, RTT por acción y tráfico (F3 muestra el panel, F4 exporta)
+        self.profiler = ClientProfiler()
+        self.show_stats_overlay = False
+        self.stats_overlay_rect = pygame.Rect(10, 10, 320, 300)
+        self.stats_overlay_updated = 0.0
+        self.stats_fps = 0.0
+        
+        # Capas del tablero: estática (una vez por tamaño), fichas y selección
+        self.board_layers_key = None
+        self.board_static_layer = None
+        self.pieces_layer = None
+        self.board_composite = None
+        self.overlay_layer = None
+        self.overlay_rect = None  # Zona de la capa de selección con contenido
+        self.board_layout = None
+        self.pieces_layer_dirty = True
+        self.overlay_layer_dirty = True
+        self._selected_piece = None
+        self._hovered_piece = None
+        
+        # Fichas en movimiento: se dibujan fuera de la capa de fichas mientras duran
+        self.piece_animator = PieceAnimator()
+        self.animated_pieces = frozenset()
+        
+        # Estado recibido del servidor; solo sus cambios generan log, sonidos y redibujado
+        self.state_store = GameStateStore()
+        self.state_store.subscribe(self.on_state_changed)
+        
+        # Índice de zonas clicables; se reconstruye al cambiar la pantalla o las fichas
+        self.hit_grid = HitGrid((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.hit_grid_key = None
+        self.hit_grid_dirty = True
+        
+        # Protocolo con el servidor; comparte el almacén de estado y registra RTT y bytes
+        self.client = ParquesClient(server_host, server_port, state_store=self.state_store,
+                                    profiler=self.profiler, log=self.add_log)
         self.player_id = None
         self.player_name = None
         self.player_color = None
@@ -72,6 +741,9 @@ class ParquesClientGUI:
         self.status_message = "Conectándose al servidor..."
         self.selected_piece = None
         self.log_messages = []
+        self.text_cache = TextCache()
+        self.log_render_key = None  # Mensajes y geometría del último log dibujado
+        self.log_render_blits = []
         self.show_help_screen = False
         
         # UI State
@@ -82,13 +754,28 @@ class ParquesClientGUI:
         self.animation_offset = 0
         self.animation_timer = 0
         
+        # Fondo precalculado (se reconstruye si cambia el tamaño de la ventana o animated_background)
+        self.background_frames = []
+        self.background_key = None  # (tamaño, animado) con que se construyeron los cuadros
+        self.animated_background = False  # Alternar entre varios cuadros de ruido precalculados
+        self.background_noise_frames = 4
+        self.background_frame_ms = 250
+        
         # Thread para recibir actualizaciones del servidor
         self.update_thread = None
         self.running = True
         
         # Inicializar pantalla
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Parqués Distribuido")
+        with self.startup.phase('ventana'):
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Parqués Distribuido")
+        
+        # Redibujado por eventos: zonas sucias y frames ociosos
+        self.render_scheduler = RenderScheduler(self.screen.get_size())
+        self.state_version = 0  # Aumenta cada vez que cambia el estado recibido
+        self.last_ui_signature = None
+        self.hovered_target = None
+        self.cursor_phase = None
         
         # Definir colores del mapa con los valores exactos de la imagen
         global COLOR_MAP
@@ -106,13 +793,108 @@ class ParquesClientGUI:
         YELLOW = COLOR_MAP['amarillo']
         BLUE = COLOR_MAP['azul']
         
-        # Cargar sonidos
+        # Atlas de sprites de fichas (depende de COLOR_MAP y de la pantalla ya creada)
+        with self.startup.phase('sprites de fichas'):
+            self.piece_sprites = self.build_piece_sprites()
+        
+        # Dados del juego (70 px) y decorativos de la pantalla de conexión
+        with self.startup.phase('atlas de dados'):
+            self.dice_atlas = DiceAtlas((70, 60, 50))
+        decor = random.Random(2024)  # Siempre los mismos valores y ángulos, sin parpadeo
+        self.decorative_dice = [
+            (x, y, size, decor.randint(1, 6), decor.uniform(0, 180))
+            for x, y, size in ((100, 100, 60), (SCREEN_WIDTH - 160, 100, 60),
+                               (150, SCREEN_HEIGHT - 150, 50), (SCREEN_WIDTH - 200, SCREEN_HEIGHT - 150, 50))
+        ]
+        
+        # Cargar sonidos en segundo plano; play_sound ignora los que aún no están
         self.sound_dice = None
         self.sound_move = None
         self.sound_capture = None
         self.sound_win = None
         
-        self.load_sounds()
+        self.sound_thread = threading.Thread(target=self.load_sounds_in_background, name="sonidos")
+        self.sound_thread.daemon = True
+        self.sound_thread.start()
+    
+    @property
+    def game_state(self):
+        return self.state_store.state
+    
+    @game_state.setter
+    def game_state(self, state):
+        """Aplica el estado ya mismo (thread principal); si no cambió no se hace nada más"""
+        self.state_store.update(state)
+    
+    def on_state_changed(self, events, old_state, new_state):
+        """Invalida lo que depende del estado y reacciona a los eventos del cambio"""
+        self.state_version += 1
+        
+        # Las capas del tablero solo dependen de los jugadores y sus fichas
+        board_events = [event for event in events
+                        if isinstance(event, (PieceMoved, PlayerJoined, PlayerLeft))]
+        if board_events or old_state is None or new_state is None:
+            self.pieces_layer_dirty = True
+            self.overlay_layer_dirty = True
+            self.hit_grid_dirty = True
+            self._hovered_piece = None
+        if board_events:
+            self.piece_animator.start(board_events, self.get_board_layout(), pygame.time.get_ticks())
+        
+        self.handle_state_events(events)
+    
+    def handle_state_events(self, events):
+        """Mensajes y sonidos de los cambios del juego (una vez por cambio, no por consulta)"""
+        moved = False
+        for event in events:
+            if isinstance(event, TurnChanged):
+                self.my_turn = event.current == self.player_id
+                if self.my_turn:
+                    self.add_log(f"🎯 ¡ES TU TURNO, {self.player_name}!")
+                else:
+                    self.add_log(f"⏳ Turno de: {self.get_player_name(event.current)}")
+            elif isinstance(event, GameStarted):
+                self.add_log("¡El juego ha comenzado!")
+                if self.current_screen == "lobby":
+                    self.current_screen = "game"
+            elif isinstance(event, PlayerJoined):
+                self.add_log(f"👋 {event.name} se unió al juego ({event.color})")
+            elif isinstance(event, PlayerLeft):
+                self.add_log(f"🚪 {event.name} salió del juego")
+            elif isinstance(event, PieceCaptured):
+                self.add_log(f"💥 {self.get_player_name(event.by_player_id)} capturó una ficha de "
+                             f"{self.get_player_name(event.player_id)}")
+                self.play_sound(self.sound_capture)
+            elif isinstance(event, PieceMoved) and event.new_position != 'jail':
+                moved = True
+        
+        if moved:
+            self.play_sound(self.sound_move)
+    
+    @property
+    def selected_piece(self):
+        return self._selected_piece
+    
+    @selected_piece.setter
+    def selected_piece(self, piece):
+        if piece != self._selected_piece:
+            self._selected_piece = piece
+            self.overlay_layer_dirty = True
+    
+    @property
+    def hovered_piece(self):
+        return self._hovered_piece
+    
+    @hovered_piece.setter
+    def hovered_piece(self, piece):
+        if piece != self._hovered_piece:
+            self._hovered_piece = piece
+            self.overlay_layer_dirty = True
+    
+    def load_sounds_in_background(self):
+        """Inicia el mixer y carga los sonidos sin retrasar la primera ventana"""
+        with self.startup.phase('sonidos'):
+            self.load_sounds()
     
     def load_sounds(self):
         """Carga los archivos de sonido de manera robusta"""
@@ -169,98 +951,27 @@ class ParquesClientGUI:
             except Exception as e:
                 print(f"Error reproduciendo sonido: {e}")
     
+    @property
+    def connected(self):
+        return self.client.connected
+    
     def connect_to_server(self):
         """Conecta al servidor"""
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.server_host, self.server_port))
-            self.connected = True
-            self.status_message = f"Conectado al servidor {self.server_host}:{self.server_port}"
-            self.add_log(f"Conectado al servidor {self.server_host}:{self.server_port}")
+            self.client.connect()
+            self.status_message = f"Conectado al servidor {self.client.address}"
+            self.add_log(f"Conectado al servidor {self.client.address}")
             return True
         except Exception as e:
             self.status_message = f"Error conectando al servidor: {e}"
             self.add_log(f"Error conectando al servidor: {e}")
             return False
     
-    def send_message(self, message):
-        """Envía un mensaje al servidor"""
-        try:
-            if self.connected and self.socket:
-                # Enviar mensaje al servidor
-                data = json.dumps(message)
-                self.socket.send(data.encode('utf-8'))
-                
-                # Recibir respuesta completa (puede requerir múltiples lecturas)
-                response_data = ""
-                self.socket.settimeout(5.0)  # 5 segundos de timeout
-                
-                # Leer hasta encontrar un JSON completo
-                buffer = ""
-                json_depth = 0
-                in_string = False
-                escape_next = False
-                
-                while True:
-                    chunk = self.socket.recv(4096).decode('utf-8')
-                    if not chunk:
-                        break
-                    
-                    buffer += chunk
-                    
-                    # Intentar encontrar un JSON completo
-                    try:
-                        response = json.loads(buffer)
-                        # Si llegamos aquí, el JSON es válido
-                        return response
-                    except json.JSONDecodeError as e:
-                        # Si el error no es por estar incompleto, buscar el primer JSON válido en el buffer
-                        if "Expecting value" in str(e) and buffer.strip():
-                            # Intenta encontrar donde comienza un JSON válido
-                            for i in range(len(buffer)):
-                                if buffer[i] in ['{', '[']:
-                                    try:
-                                        response = json.loads(buffer[i:])
-                                        return response
-                                    except:
-                                        pass
-                        
-                        # Continuar recibiendo datos si el JSON está incompleto
-                        if "Expecting" in str(e) or "Unterminated" in str(e):
-                            continue
-                        else:
-                            # Error de formato, no solo incompleto
-                            self.add_log(f"Error decodificando JSON: {str(e)}")
-                            self.add_log(f"Datos recibidos: {buffer[:100]}...")
-                            return {'status': 'error', 'message': f'Error de formato JSON: {str(e)}'}
-                
-                # Si llegamos aquí, no pudimos obtener un JSON válido
-                self.add_log("Error: No se pudo obtener una respuesta JSON válida")
-                return {'status': 'error', 'message': 'No se pudo obtener una respuesta JSON válida'}
-                
-        except socket.timeout:
-            self.add_log("Error: Tiempo de espera agotado al comunicarse con el servidor")
-            return {'status': 'error', 'message': 'Tiempo de espera agotado'}
-        except ConnectionResetError:
-            self.add_log("Error: Conexión cerrada por el servidor")
-            self.connected = False
-            return {'status': 'error', 'message': 'Conexión perdida'}
-        except Exception as e:
-            self.add_log(f"Error enviando mensaje: {e}")
-            return {'status': 'error', 'message': f'Error de comunicación: {str(e)}'}
-        
-        return {'status': 'error', 'message': 'Error desconocido en la comunicación'}
-    
     def join_game(self, name):
         """Únete al juego"""
-        message = {
-            'action': 'join',
-            'name': name
-        }
-        
-        response = self.send_message(message)
+        response = self.client.join(name)
         
-        if response and response.get('status') == 'success':
+        if response.get('status') == 'success':
             self.player_name = name
             self.player_id = response.get('player_id')
             self.player_color = response.get('color')
@@ -291,13 +1002,10 @@ class ParquesClientGUI:
     
     def start_game(self):
         """Inicia el juego"""
-        message = {'action': 'start_game'}
-        response = self.send_message(message)
+        response = self.client.start_game()
         
-        if response and response.get('status') == 'success':
-            self.add_log("¡El juego ha comenzado!")
-            self.game_state = response.get('game_state')
-            self.update_turn_status()
+        if response.get('status') == 'success':
+            # El cambio de estado (ya aplicado) anuncia el inicio y el primer turno
             self.current_screen = "game"
             return True
         else:
@@ -315,10 +1023,9 @@ class ParquesClientGUI:
         self.dice_animation_start = pygame.time.get_ticks()
         self.play_sound(self.sound_dice)
         
-        message = {'action': 'roll_dice'}
-        response = self.send_message(message)
+        response = self.client.roll_dice()
         
-        if response and response.get('status') == 'success':
+        if response.get('status') == 'success':
             self.dice_values = (response.get('dice1'), response.get('dice2'))
             is_pair = response.get('is_pair')
             total = response.get('total')
@@ -343,31 +1050,20 @@ class ParquesClientGUI:
             
             if response.get('turn_ended'):
                 self.add_log("Tu turno ha terminado")
+                # El cambio de turno llega con el siguiente estado del servidor
                 self.my_turn = False
-                next_player = response.get('next_player')
-                if next_player:
-                    self.update_current_player(next_player)
             
         else:
             self.add_log(f"Error lanzando dados: {response.get('message', 'Error desconocido')}")
     
     def move_piece(self, piece_id, steps):
         """Mueve una ficha"""
-        message = {
-            'action': 'move_piece',
-            'piece_id': piece_id,
-            'steps': steps
-        }
-        
-        response = self.send_message(message)
+        response = self.client.move_piece(piece_id, steps)
         
-        if response and response.get('status') == 'success':
+        if response.get('status') == 'success':
             self.add_log(f"✅ {response.get('message')}")
             
-            self.play_sound(self.sound_move)
-                
-            # Actualizar estado del juego
-            self.game_state = response.get('game_state')
+            # El estado nuevo ya está aplicado (suena el movimiento al aplicarse)
             
             # Verificar si hay ganador
             if response.get('game_ended'):
@@ -380,53 +1076,30 @@ class ParquesClientGUI:
                         self.add_log(f"🏆 {winner['name']} ha ganado el juego")
                     return
             
-            # Cambiar turno
-            next_player = response.get('next_player')
-            if next_player:
-                self.update_current_player(next_player)
+            # El estado de la respuesta ya trae el turno siguiente
+            if response.get('next_player'):
                 self.my_turn = False
             
         else:
             self.add_log(f"❌ Error moviendo ficha: {response.get('message')}")
     
-    def get_game_state(self):
-        """Obtiene el estado actual del juego"""
-        message = {'action': 'get_state'}
-        response = self.send_message(message)
+    def get_game_state(self, background=False):
+        """Obtiene el estado actual del juego
         
-        if response and response.get('status') in ['success', 'update']:
-            # Actualizar el estado del juego
-            self.game_state = response.get('game_state')
-            
+        Desde el thread de actualización (background) el estado solo se publica:
+        el bucle principal lo adopta al empezar el siguiente frame.
+        """
+        # Si nada cambió no hay eventos ni redibujado
+        response = self.client.get_state(background)
+        
+        if response.get('status') in ['success', 'update']:
             # Actualizar bandera de can_start si está presente
             if 'can_start' in response:
                 self.can_start_game = response.get('can_start', False)
                 
-            # Actualizar estado del turno si el juego ha comenzado
-            if self.game_state and self.game_state.get('game_started'):
-                self.update_turn_status()
-                
             return True
         return False
     
-    def update_turn_status(self):
-        """Actualiza el estado del turno"""
-        if self.game_state:
-            current_turn = self.game_state.get('current_turn')
-            self.my_turn = (current_turn == self.player_id)
-            
-            if self.my_turn:
-                self.add_log(f"🎯 ¡ES TU TURNO, {self.player_name}!")
-            else:
-                current_player_name = self.get_player_name(current_turn)
-                self.add_log(f"⏳ Turno de: {current_player_name}")
-    
-    def update_current_player(self, player_id):
-        """Actualiza el jugador actual"""
-        if self.game_state:
-            self.game_state['current_turn'] = player_id
-            self.update_turn_status()
-    
     def get_player_name(self, player_id):
         """Obtiene el nombre de un jugador por su ID"""
         if self.game_state and player_id in self.game_state.get('players', {}):
@@ -434,10 +1107,36 @@ class ParquesClientGUI:
         return "Desconocido"
     
     def update_game_state_loop(self):
-        """Loop para actualizar el estado del juego periódicamente"""
-        while self.running and self.connected:
+        """Loop para actualizar el estado del juego periódicamente
+        
+        Si se cae la conexión reanuda la sesión, con esperas crecientes y
+        aleatorias para que un corte de red no reconecte a todos a la vez.
+        """
+        retry_delay = RECONNECT_MIN_DELAY
+        while self.running:
+            if not self.connected:
+                if not self.client.session_token:
+                    break
+                time.sleep(retry_delay * random.uniform(0.5, 1.5))
+                if not self.running:
+                    break
+                response = self.client.resume(background=True)
+                if response.get('status') == 'success':
+                    self.add_log("🔄 Conexión recuperada, partida reanudada")
+                    retry_delay = RECONNECT_MIN_DELAY
+                elif response.get('network_error'):
+                    # Sin red o sin respuesta a tiempo: el asiento puede seguir guardado
+                    self.client.close()
+                    retry_delay = min(retry_delay * 2, RECONNECT_MAX_DELAY)
+                else:
+                    # El servidor respondió que ya no guarda el asiento
+                    self.add_log(f"❌ No se pudo reanudar la partida: {response.get('message')}")
+                    self.client.close()
+                    break
+                continue
+            
             if self.current_screen in ["lobby", "game"]:
-                self.get_game_state()
+                self.get_game_state(background=True)
             time.sleep(0.5)  # Actualizar cada 0.5 segundos en lugar de 1 segundo
     
     def add_log(self, message):
@@ -449,13 +1148,32 @@ class ParquesClientGUI:
             self.log_messages.pop(0)
         print(message)  # También imprimir en consola para debug
     
-    def handle_events(self):
+    def handle_events(self, events=None):
         """Maneja los eventos de pygame con soporte mejorado para UI"""
-        for event in pygame.event.get():
+        if events is None:
+            events = pygame.event.get()
+        
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
                 return False
             
+            # Cualquier entrada puede cambiar la pantalla; el movimiento del ratón solo el hover
+            if event.type == pygame.MOUSEMOTION:
+                self.update_hover(event.pos)
+            elif event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                                pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED):
+                self.render_scheduler.mark_dirty()
+            
+            # Panel de rendimiento y exportación, en cualquier pantalla
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_stats_overlay = not self.show_stats_overlay
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                json_path, csv_path = self.profiler.export()
+                self.add_log(f"Rendimiento exportado a {json_path} y {csv_path}")
+                continue
+            
             # Conectar pantalla
             if self.current_screen == "connect":
                 if event.type == pygame.KEYDOWN:
@@ -471,14 +1189,14 @@ class ParquesClientGUI:
                 
                 # Clic en botón de conexión
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 390, 200, 50)
-                    if button_rect.collidepoint(event.pos) and self.name_input.strip():
+                    target = self.hit_test(event.pos)
+                    control = target.data if target and target.kind == 'control' else None
+                    if control == 'connect_button' and self.name_input.strip():
                         if self.connect_to_server():
                             self.join_game(self.name_input.strip())
                             
                     # Clic en campo de texto para activarlo
-                    input_rect = pygame.Rect(SCREEN_WIDTH // 2 - 150, 320, 300, 40)
-                    self.input_active = input_rect.collidepoint(event.pos)
+                    self.input_active = control == 'name_input'
             
             # Lobby pantalla
             elif self.current_screen == "lobby":
@@ -488,8 +1206,8 @@ class ParquesClientGUI:
                         
                 # Clic en botón de inicio
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 480, 200, 60)
-                    if button_rect.collidepoint(event.pos) and self.can_start_game:
+                    target = self.hit_test(event.pos)
+                    if target and target.data == 'start_button' and self.can_start_game:
                         self.start_game()
                         
             # Juego pantalla
@@ -524,18 +1242,18 @@ class ParquesClientGUI:
                 # Seleccionar ficha y mover con el mouse
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:  # Botón izquierdo
-                        mouse_pos = pygame.mouse.get_pos()
+                        mouse_pos = event.pos
+                        target = self.hit_test(mouse_pos)
+                        control = target.data if target and target.kind == 'control' else None
                         
                         # Si la ayuda está visible, verificar clic en botón cerrar
                         if self.show_help_screen:
-                            close_rect = pygame.Rect(SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2 + 190, 140, 40)
-                            if close_rect.collidepoint(mouse_pos):
+                            if control == 'help_close':
                                 self.show_help_screen = False
                             continue  # No procesar más clics si la ayuda está visible
                         
                         # Botón de dados
-                        dice_button_rect = pygame.Rect(680, 500, 180, 45)
-                        if dice_button_rect.collidepoint(mouse_pos) and self.my_turn and not self.dice_rolling:
+                        if control == 'dice_button' and self.my_turn and not self.dice_rolling:
                             self.roll_dice()
                             continue
                             
@@ -557,74 +1275,49 @@ class ParquesClientGUI:
         if not player:
             return
             
-        pieces = player['pieces']
-        board_offset_x = (SCREEN_WIDTH - BOARD_SIZE) // 2
-        board_offset_y = (SCREEN_HEIGHT - BOARD_SIZE) // 2
-        
-        # Comprobar cada ficha
-        for i, piece in enumerate(pieces):
-            piece_pos = piece['position']
-            
-            if piece_pos == 'jail':
-                # Posición en la cárcel según el color
-                jail_pos = self.get_jail_position(player['color'], i)
-                piece_rect = pygame.Rect(jail_pos[0] - 18, jail_pos[1] - 18, 36, 36)
-                
-                if piece_rect.collidepoint(mouse_pos):
-                    if self.selected_piece == i:
-                        # Intentar sacar de la cárcel si es par
-                        if self.dice_values[0] == self.dice_values[1]:
-                            self.move_piece(i, 0)  # 0 porque es salida de cárcel
-                        else:
-                            self.add_log("Necesitas sacar pares para salir de la cárcel")
+        # Solo cuentan las fichas propias, aunque una rival comparta la casilla
+        target = self.hit_test(mouse_pos, kind='piece', player_id=self.player_id)
+        if target:
+            i = target.data[1]
+            if player['pieces'][i]['position'] == 'jail':
+                if self.selected_piece == i:
+                    # Intentar sacar de la cárcel si es par
+                    if self.dice_values[0] == self.dice_values[1]:
+                        self.move_piece(i, 0)  # 0 porque es salida de cárcel
                     else:
-                        self.selected_piece = i
-                        self.add_log(f"Ficha {i+1} seleccionada")
-                    return
-                    
-            elif piece_pos == 'home':
-                # No se puede seleccionar una ficha que ya está en casa
-                pass
-                
+                        self.add_log("Necesitas sacar pares para salir de la cárcel")
+                else:
+                    self.selected_piece = i
+                    self.add_log(f"Ficha {i+1} seleccionada")
+            elif self.selected_piece == i:
+                # Mover la ficha
+                total_steps = self.dice_values[0] + self.dice_values[1]
+                self.move_piece(i, total_steps)
+                self.selected_piece = None
             else:
-                # Ficha en el tablero
-                try:
-                    piece_pos = int(piece_pos)
-                    x, y = self.translate_server_position_to_board(piece_pos, board_offset_x, board_offset_y)
-                    
-                    piece_rect = pygame.Rect(x - 15, y - 15, 30, 30)
-                    
-                    if piece_rect.collidepoint(mouse_pos):
-                        if self.selected_piece == i:
-                            # Mover la ficha
-                            total_steps = self.dice_values[0] + self.dice_values[1]
-                            self.move_piece(i, total_steps)
-                            self.selected_piece = None
-                        else:
-                            self.selected_piece = i
-                            self.add_log(f"Ficha {i+1} seleccionada")
-                        return
-                except (ValueError, TypeError) as e:
-                    print(f"Error al manejar posición de ficha: {e}")
+                self.selected_piece = i
+                self.add_log(f"Ficha {i+1} seleccionada")
+            return
         
         # Si hizo clic fuera de cualquier ficha, deseleccionar
         self.selected_piece = None
     
+    @profiled()
     def draw_connect_screen(self):
         """Dibuja la pantalla de conexión con estilo moderno"""
         # Fondo con gradiente
         self.draw_gradient_background()
         
         # Logo y título con efecto de sombra
-        title_shadow = FONT_TITLE.render("PARQUÉS DISTRIBUIDO", True, (0, 0, 0, 150))
-        title = FONT_TITLE.render("PARQUÉS DISTRIBUIDO", True, (255, 255, 255))
+        title_shadow = self.text_cache.render(FONT_TITLE, "PARQUÉS DISTRIBUIDO", (0, 0, 0, 150))
+        title = self.text_cache.render(FONT_TITLE, "PARQUÉS DISTRIBUIDO", (255, 255, 255))
         
         # Dibujar sombra y luego el título
         self.screen.blit(title_shadow, (SCREEN_WIDTH // 2 - title.get_width() // 2 + 3, 103))
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 100))
         
         # Subtítulo
-        subtitle = FONT_LARGE.render("Sistemas Distribuidos - Proyecto Final", True, (180, 180, 200))
+        subtitle = self.text_cache.render(FONT_LARGE, "Sistemas Distribuidos - Proyecto Final", (180, 180, 200))
         self.screen.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 160))
         
         # Panel para la entrada de nombre
@@ -632,11 +1325,11 @@ class ParquesClientGUI:
         self.draw_glass_panel(login_panel, alpha=180)
         
         # Título del panel
-        panel_title = FONT_LARGE.render("INICIAR SESIÓN", True, WHITE)
+        panel_title = self.text_cache.render(FONT_LARGE, "INICIAR SESIÓN", WHITE)
         self.screen.blit(panel_title, (SCREEN_WIDTH // 2 - panel_title.get_width() // 2, 240))
         
         # Campo de nombre con efecto moderno
-        name_prompt = FONT_MEDIUM.render("Ingresa tu nombre:", True, WHITE)
+        name_prompt = self.text_cache.render(FONT_MEDIUM, "Ingresa tu nombre:", WHITE)
         self.screen.blit(name_prompt, (SCREEN_WIDTH // 2 - 150, 290))
         
         # Campo de texto con efecto de focus
@@ -654,7 +1347,7 @@ class ParquesClientGUI:
                          (input_rect.x, input_rect.y, input_rect.width, input_rect.height), 2, 5)
         
         # Texto del nombre
-        name_text = FONT_MEDIUM.render(self.name_input, True, WHITE)
+        name_text = self.text_cache.render(FONT_MEDIUM, self.name_input, WHITE)
         self.screen.blit(name_text, (input_rect.x + 10, input_rect.y + 10))
         
         # Cursor de texto parpadeante
@@ -680,25 +1373,25 @@ class ParquesClientGUI:
         pygame.draw.rect(self.screen, button_color, 
                          (button_rect.x, button_rect.y, button_rect.width, button_rect.height), 0, 10)
         
-        button_text = FONT_MEDIUM.render("CONECTAR", True, WHITE)
+        button_text = self.text_cache.render(FONT_MEDIUM, "CONECTAR", WHITE)
         self.screen.blit(button_text, (SCREEN_WIDTH // 2 - button_text.get_width() // 2, button_rect.y + 15))
         
         # Estado de conexión
         status_panel = pygame.Rect(SCREEN_WIDTH // 2 - 350, 500, 700, 50)
         self.draw_glass_panel(status_panel, alpha=150)
         
-        status_text = FONT_MEDIUM.render(self.status_message, True, CYAN if "Conectado" in self.status_message else GRAY)
+        status_text = self.text_cache.render(FONT_MEDIUM, self.status_message, CYAN if "Conectado" in self.status_message else GRAY)
         self.screen.blit(status_text, (SCREEN_WIDTH // 2 - status_text.get_width() // 2, 515))
         
         # Instrucciones
         inst_panel = pygame.Rect(SCREEN_WIDTH // 2 - 300, 580, 600, 80)
         self.draw_glass_panel(inst_panel, alpha=120)
         
-        inst1 = FONT_MEDIUM.render("Escribe tu nombre y presiona ENTER para conectar", True, WHITE)
+        inst1 = self.text_cache.render(FONT_MEDIUM, "Escribe tu nombre y presiona ENTER para conectar", WHITE)
         self.screen.blit(inst1, (SCREEN_WIDTH // 2 - inst1.get_width() // 2, 600))
         
         # Versión
-        version_text = FONT_SMALL.render("v1.0 - 2025", True, GRAY)
+        version_text = self.text_cache.render(FONT_SMALL, "v1.0 - 2025", GRAY)
         self.screen.blit(version_text, (SCREEN_WIDTH - version_text.get_width() - 10, SCREEN_HEIGHT - 30))
         
         # Dibujar dados decorativos
@@ -706,78 +1399,92 @@ class ParquesClientGUI:
     
     def draw_decorative_dice(self):
         """Dibuja dados decorativos en la pantalla de conexión"""
-        # Posiciones para dados decorativos
-        dice_positions = [
-            (100, 100, 60, random.randint(1, 6), random.uniform(0, 0.5)),
-            (SCREEN_WIDTH - 160, 100, 60, random.randint(1, 6), random.uniform(0, 0.5)),
-            (150, SCREEN_HEIGHT - 150, 50, random.randint(1, 6), random.uniform(0, 0.5)),
-            (SCREEN_WIDTH - 200, SCREEN_HEIGHT - 150, 50, random.randint(1, 6), random.uniform(0, 0.5))
-        ]
-        
-        # Dibujar cada dado con un ángulo aleatorio
-        for x, y, size, value, anim in dice_positions:
-            self.draw_single_die(x, y, size, value, anim)
+        # Valores y ángulos fijos elegidos al iniciar
+        for x, y, size, value, angle in self.decorative_dice:
+            self.draw_single_die(x, y, size, value, angle)
     
+    @profiled()
     def draw_gradient_background(self):
-        """Dibuja un fondo con gradiente"""
-        # Crear superficie para el gradiente
-        gradient = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        """Dibuja el fondo con gradiente a partir de las superficies precalculadas"""
+        size = self.screen.get_size()
+        if self.background_key != (size, self.animated_background):
+            self.build_background(size)
+        
+        if self.animated_background and len(self.background_frames) > 1:
+            index = (pygame.time.get_ticks() // self.background_frame_ms) % len(self.background_frames)
+        else:
+            index = 0
+        
+        self.screen.blit(self.background_frames[index], (0, 0))
+    
+    def build_background(self, size):
+        """Renderiza una vez el gradiente y los cuadros de ruido para el tamaño dado"""
+        width, height = size
         
         # Colores del gradiente
         color1 = (20, 20, 35)  # Azul oscuro
         color2 = (60, 30, 80)  # Púrpura oscuro
         
-        # Dibujar gradiente
-        for y in range(SCREEN_HEIGHT):
-            # Calcular proporción de mezcla
-            ratio = y / SCREEN_HEIGHT
-            
-            # Interpolar colores
+        gradient = self.surface_pool.new_surface(size, 0)
+        for y in range(height):
+            # Interpolar colores según la altura
+            ratio = y / height
             r = color1[0] * (1 - ratio) + color2[0] * ratio
             g = color1[1] * (1 - ratio) + color2[1] * ratio
             b = color1[2] * (1 - ratio) + color2[2] * ratio
-            
-            # Dibujar línea de color
-            pygame.draw.line(gradient, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-        
-        # Añadir un poco de "ruido" para textura
-        for i in range(200):
-            x = random.randint(0, SCREEN_WIDTH - 1)
-            y = random.randint(0, SCREEN_HEIGHT - 1)
-            radius = random.randint(1, 3)
-            alpha = random.randint(10, 30)
-            pygame.draw.circle(gradient, (255, 255, 255, alpha), (x, y), radius)
-        
-        # Dibujar el gradiente en la pantalla
-        self.screen.blit(gradient, (0, 0))
-        
-    def draw_glass_panel(self, rect, alpha=150):
-        """Dibuja un panel con efecto de vidrio (glassmorphism)"""
+            pygame.draw.line(gradient, (r, g, b), (0, y), (width, y))
+        
+        # Añadir "ruido" para textura; con semilla fija para que no parpadee
+        frame_count = self.background_noise_frames if self.animated_background else 1
+        rng = random.Random(width * 10000 + height)
+        self.background_frames = []
+        for _ in range(frame_count):
+            noise = self.surface_pool.new_surface(size)
+            for i in range(200):
+                x = rng.randint(0, width - 1)
+                y = rng.randint(0, height - 1)
+                radius = rng.randint(1, 3)
+                alpha = rng.randint(10, 30)
+                pygame.draw.circle(noise, (255, 255, 255, alpha), (x, y), radius)
+            
+            frame = gradient.copy()
+            frame.blit(noise, (0, 0))
+            self.background_frames.append(frame.convert())
+        
+        self.background_key = (size, self.animated_background)
+        
+    def draw_glass_panel(self, rect, alpha=150, style='glass'):
+        """Dibuja un panel con efecto de vidrio (glassmorphism) desde la caché"""
+        key = ('panel', rect.width, rect.height, alpha, style)
+        panel = self.surface_pool.get(key, lambda: self.build_glass_panel(rect.width, rect.height, alpha))
+        self.screen.blit(panel, (rect.x, rect.y))
+    
+    def build_glass_panel(self, width, height, alpha):
+        """Renderiza un panel de vidrio de un tamaño y transparencia"""
         # Crear superficie con transparencia
-        panel = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
+        panel = self.surface_pool.new_surface((width, height))
         
         # Color base del panel (semi-transparente)
         panel_color = (60, 60, 80, alpha)
-        pygame.draw.rect(panel, panel_color, (0, 0, rect.width, rect.height), 0, 10)
+        pygame.draw.rect(panel, panel_color, (0, 0, width, height), 0, 10)
         
         # Añadir borde brillante en la parte superior e izquierda (efecto de luz)
         highlight_color = (255, 255, 255, 30)
-        pygame.draw.rect(panel, highlight_color, (0, 0, rect.width, rect.height), 2, 10)
+        pygame.draw.rect(panel, highlight_color, (0, 0, width, height), 2, 10)
         
         # Añadir un poco de "brillo" en la esquina superior izquierda
         pygame.draw.circle(panel, (255, 255, 255, 15), (15, 15), 20)
-        
-        # Dibujar el panel en la pantalla
-        self.screen.blit(panel, (rect.x, rect.y))
+        return panel
     
+    @profiled()
     def draw_lobby_screen(self):
         """Dibuja la pantalla de lobby con estilo moderno"""
         # Fondo con gradiente
         self.draw_gradient_background()
         
         # Título con efecto de profundidad
-        title_shadow = FONT_TITLE.render("SALA DE ESPERA", True, BLACK)
-        title = FONT_TITLE.render("SALA DE ESPERA", True, WHITE)
+        title_shadow = self.text_cache.render(FONT_TITLE, "SALA DE ESPERA", BLACK)
+        title = self.text_cache.render(FONT_TITLE, "SALA DE ESPERA", WHITE)
         self.screen.blit(title_shadow, (SCREEN_WIDTH // 2 - title.get_width() // 2 + 2, 52))
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
         
@@ -786,10 +1493,10 @@ class ParquesClientGUI:
         self.draw_glass_panel(player_panel)
         
         # Información del jugador
-        player_info = FONT_LARGE.render(f"Nombre: {self.player_name}", True, WHITE)
+        player_info = self.text_cache.render(FONT_LARGE, f"Nombre: {self.player_name}", WHITE)
         self.screen.blit(player_info, (SCREEN_WIDTH // 2 - player_info.get_width() // 2, 130))
         
-        color_text = FONT_MEDIUM.render(f"Color asignado: ", True, WHITE)
+        color_text = self.text_cache.render(FONT_MEDIUM, f"Color asignado: ", WHITE)
         self.screen.blit(color_text, (SCREEN_WIDTH // 2 - 150, 170))
         
         # Rectángulo de color con efecto 3D
@@ -806,7 +1513,7 @@ class ParquesClientGUI:
             players_panel = pygame.Rect(SCREEN_WIDTH // 2 - 250, 220, 500, 220)
             self.draw_glass_panel(players_panel)
             
-            players_title = FONT_LARGE.render("Jugadores conectados:", True, WHITE)
+            players_title = self.text_cache.render(FONT_LARGE, "Jugadores conectados:", WHITE)
             self.screen.blit(players_title, (SCREEN_WIDTH // 2 - players_title.get_width() // 2, 230))
             
             # Línea separadora
@@ -854,7 +1561,7 @@ class ParquesClientGUI:
         pygame.draw.rect(self.screen, button_color, 
                         (button_rect.x, button_rect.y, button_rect.width, button_rect.height), 0, 10)
         
-        start_text = FONT_LARGE.render("INICIAR JUEGO", True, WHITE)
+        start_text = self.text_cache.render(FONT_LARGE, "INICIAR JUEGO", WHITE)
         self.screen.blit(start_text, (SCREEN_WIDTH // 2 - start_text.get_width() // 2, 500))
         
         # Mensajes del sistema
@@ -864,14 +1571,21 @@ class ParquesClientGUI:
         
         # Instrucción
         if self.can_start_game:
-            inst = FONT_MEDIUM.render("Presiona ENTER para iniciar el juego", True, CYAN)
+            inst = self.text_cache.render(FONT_MEDIUM, "Presiona ENTER para iniciar el juego", CYAN)
             self.screen.blit(inst, (SCREEN_WIDTH // 2 - inst.get_width() // 2, 700))
         else:
-            inst = FONT_MEDIUM.render("Esperando a que se conecten más jugadores...", True, GRAY)
+            inst = self.text_cache.render(FONT_MEDIUM, "Esperando a que se conecten más jugadores...", GRAY)
             self.screen.blit(inst, (SCREEN_WIDTH // 2 - inst.get_width() // 2, 700))
             
     def draw_player_card(self, x, y, width, height, player_name, color, index):
-        """Dibuja una tarjeta de jugador en el lobby"""
+        """Dibuja una tarjeta de jugador en el lobby (se renderiza una vez por jugador)"""
+        key = ('card', width, height, player_name, color, index)
+        card_surface = self.surface_pool.get(
+            key, lambda: self.build_player_card(width, height, player_name, color, index))
+        self.screen.blit(card_surface, (x, y))
+    
+    def build_player_card(self, width, height, player_name, color, index):
+        """Renderiza la tarjeta de un jugador"""
         # Fondo de la tarjeta
         card_color = (50, 50, 70, 200)
         if color:  # Si hay un color asignado (jugador real)
@@ -880,7 +1594,7 @@ class ParquesClientGUI:
             card_color = (*self.darken_color(color_value, 0.3), 150)
         
         # Dibujar tarjeta
-        card_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        card_surface = self.surface_pool.new_surface((width, height))
         pygame.draw.rect(card_surface, card_color, (0, 0, width, height), 0, 10)
         
         # Borde
@@ -888,12 +1602,12 @@ class ParquesClientGUI:
         pygame.draw.rect(card_surface, border_color, (0, 0, width, height), 2, 10)
         
         # Número de jugador
-        num_text = FONT_MEDIUM.render(f"Jugador {index + 1}", True, WHITE)
+        num_text = self.text_cache.render(FONT_MEDIUM, f"Jugador {index + 1}", WHITE)
         card_surface.blit(num_text, (10, 10))
         
         # Nombre del jugador
         name_color = WHITE if color else GRAY
-        name_text = FONT_LARGE.render(player_name, True, name_color)
+        name_text = self.text_cache.render(FONT_LARGE, player_name, name_color)
         card_surface.blit(name_text, (20, 35))
         
         # Mostrar color si está asignado
@@ -901,9 +1615,9 @@ class ParquesClientGUI:
             color_value = COLOR_MAP.get(color, WHITE)
             pygame.draw.rect(card_surface, color_value, (width - 50, 10, 30, 30), 0, 5)
         
-        # Dibujar la tarjeta en la pantalla
-        self.screen.blit(card_surface, (x, y))
+        return card_surface
     
+    @profiled()
     def draw_game_screen(self):
         """Dibuja la pantalla de juego con el tablero estilo clásico"""
         # Fondo con color sólido
@@ -917,17 +1631,17 @@ class ParquesClientGUI:
         self.draw_glass_panel(panel_rect)
         
         # Título del panel
-        title = FONT_LARGE.render("PARQUÉS", True, WHITE)
+        title = self.text_cache.render(FONT_LARGE, "PARQUÉS", WHITE)
         self.screen.blit(title, (765 - title.get_width() // 2, 35))
         
         # Información del jugador con diseño moderno
         player_panel = pygame.Rect(660, 70, 210, 70)
         self.draw_glass_panel(player_panel, alpha=180)
         
-        player_text = FONT_MEDIUM.render(f"{self.player_name}", True, WHITE)
+        player_text = self.text_cache.render(FONT_MEDIUM, f"{self.player_name}", WHITE)
         self.screen.blit(player_text, (765 - player_text.get_width() // 2, 80))
         
-        color_text = FONT_SMALL.render(f"Color: ", True, WHITE)
+        color_text = self.text_cache.render(FONT_SMALL, f"Color: ", WHITE)
         self.screen.blit(color_text, (670, 110))
         
         color_value = COLOR_MAP.get(self.player_color, WHITE)
@@ -942,10 +1656,10 @@ class ParquesClientGUI:
             turn_panel = pygame.Rect(660, 150, 210, 90)
             self.draw_glass_panel(turn_panel, alpha=180)
             
-            turn_text = FONT_MEDIUM.render("TURNO ACTUAL:", True, WHITE)
+            turn_text = self.text_cache.render(FONT_MEDIUM, "TURNO ACTUAL:", WHITE)
             self.screen.blit(turn_text, (765 - turn_text.get_width() // 2, 160))
             
-            player_turn_text = FONT_MEDIUM.render(current_player_name, True, WHITE)
+            player_turn_text = self.text_cache.render(FONT_MEDIUM, current_player_name, WHITE)
             self.screen.blit(player_turn_text, (765 - player_turn_text.get_width() // 2, 190))
             
             # Color del jugador actual
@@ -955,7 +1669,7 @@ class ParquesClientGUI:
             # Indicador de mi turno con animación pulsante
             if self.my_turn:
                 pulse_size = (math.sin(pygame.time.get_ticks() * 0.005) + 1) * 5
-                my_turn_text = FONT_MEDIUM.render("¡ES TU TURNO!", True, GREEN)
+                my_turn_text = self.text_cache.render(FONT_MEDIUM, "¡ES TU TURNO!", GREEN)
                 text_width = my_turn_text.get_width()
                 self.screen.blit(my_turn_text, (765 - text_width // 2, 240))
                 
@@ -980,7 +1694,7 @@ class ParquesClientGUI:
         pygame.draw.rect(self.screen, dice_button_color, 
                         (dice_button_rect.x, dice_button_rect.y, dice_button_rect.width, dice_button_rect.height), 0, 10)
         
-        dice_button_text = FONT_MEDIUM.render("TIRAR DADOS", True, WHITE)
+        dice_button_text = self.text_cache.render(FONT_MEDIUM, "TIRAR DADOS", WHITE)
         self.screen.blit(dice_button_text, (680 + 90 - dice_button_text.get_width() // 2, 510))
         
         # Estadísticas de juego
@@ -988,13 +1702,13 @@ class ParquesClientGUI:
             stats_panel = pygame.Rect(660, 390, 210, 100)
             self.draw_glass_panel(stats_panel, alpha=180)
             
-            stats_title = FONT_SMALL.render("ESTADÍSTICAS", True, WHITE)
+            stats_title = self.text_cache.render(FONT_SMALL, "ESTADÍSTICAS", WHITE)
             self.screen.blit(stats_title, (765 - stats_title.get_width() // 2, 400))
             
             player = self.game_state['players'][self.player_id]
             
             # Fichas en cárcel
-            jail_text = FONT_SMALL.render(f"En cárcel: {player['in_jail']}/4", True, WHITE)
+            jail_text = self.text_cache.render(FONT_SMALL, f"En cárcel: {player['in_jail']}/4", WHITE)
             self.screen.blit(jail_text, (670, 425))
             
             # Barra de progreso para fichas en cárcel
@@ -1003,7 +1717,7 @@ class ParquesClientGUI:
             pygame.draw.rect(self.screen, RED, (670, 445, int(190 * jail_percent), 10), 0, 5)
             
             # Fichas en casa
-            home_text = FONT_SMALL.render(f"En casa: {player['finished_pieces']}/4", True, WHITE)
+            home_text = self.text_cache.render(FONT_SMALL, f"En casa: {player['finished_pieces']}/4", WHITE)
             self.screen.blit(home_text, (670, 465))
             
             # Barra de progreso para fichas en casa
@@ -1017,30 +1731,87 @@ class ParquesClientGUI:
         self.draw_log_messages(670, 570, 190, 90)
         
         # Ayuda
-        help_text = FONT_SMALL.render("Presiona H para ayuda", True, GRAY)
+        help_text = self.text_cache.render(FONT_SMALL, "Presiona H para ayuda", GRAY)
         self.screen.blit(help_text, (765 - help_text.get_width() // 2, 680))
         
         # Pantalla de ayuda
         if self.show_help_screen:
             self.draw_help_screen()
     
+    @profiled()
     def draw_board(self, board_offset_x=0, board_offset_y=0):
-        """Dibuja el tablero de juego al estilo clásico como en la imagen de referencia"""
+        """Dibuja el tablero componiendo sus capas: estática, fichas y selección"""
         # Tamaño y posición del tablero
         if board_offset_x == 0 and board_offset_y == 0:
             board_offset_x = (SCREEN_WIDTH - BOARD_SIZE) // 2
             board_offset_y = (SCREEN_HEIGHT - BOARD_SIZE) // 2
-
+        
+        key = (BOARD_SIZE, board_offset_x, board_offset_y)
+        if self.board_layers_key != key:
+            self.build_board_layers(key)
+        
+        # Las fichas que empiezan o terminan de moverse cambian la capa de fichas
+        now = pygame.time.get_ticks()
+        self.piece_animator.update(now)
+        tweens = self.piece_animator.active()
+        if frozenset(tweens) != self.animated_pieces:
+            self.animated_pieces = frozenset(tweens)
+            self.pieces_layer_dirty = True
+        
+        if self.pieces_layer_dirty:
+            self.pieces_layer.fill((0, 0, 0, 0))
+            self.draw_pieces(board_offset_x, board_offset_y)
+            # Combinar la capa estática con las fichas para blitear una sola superficie por frame
+            self.board_composite.blit(self.board_static_layer, (0, 0))
+            self.board_composite.blit(self.pieces_layer, (0, 0))
+            self.pieces_layer_dirty = False
+        
+        if self.overlay_layer_dirty:
+            self.overlay_layer.fill((0, 0, 0, 0))
+            self.overlay_rect = self.draw_board_overlay(board_offset_x, board_offset_y)
+            self.overlay_layer_dirty = False
+        
+        origin_x = board_offset_x - BOARD_BORDER
+        origin_y = board_offset_y - BOARD_BORDER
+        self.screen.blit(self.board_composite, (origin_x, origin_y))
+        
+        if tweens:
+            self.draw_moving_pieces(tweens, now)
+        
+        # La capa de selección solo se copia en la zona que tiene contenido
+        if self.overlay_rect:
+            self.screen.blit(self.overlay_layer,
+                             (origin_x + self.overlay_rect.x, origin_y + self.overlay_rect.y),
+                             self.overlay_rect)
+    
+    def build_board_layers(self, key):
+        """Crea las capas del tablero y renderiza la parte estática una sola vez"""
+        layer_size = (BOARD_SIZE + 2 * BOARD_BORDER, BOARD_SIZE + 2 * BOARD_BORDER)
+        
+        static_layer = self.surface_pool.new_surface(layer_size)
+        self.draw_board_static(static_layer, BOARD_BORDER, BOARD_BORDER)
+        self.board_static_layer = static_layer.convert_alpha()
+        
+        self.pieces_layer = self.surface_pool.new_surface(layer_size)
+        self.board_composite = self.surface_pool.new_surface(layer_size).convert_alpha()
+        self.overlay_layer = self.surface_pool.new_surface(layer_size)
+        self.overlay_rect = None
+        self.pieces_layer_dirty = True
+        self.overlay_layer_dirty = True
+        self.board_layers_key = key
+    
+    def draw_board_static(self, surface, board_offset_x, board_offset_y):
+        """Dibuja la parte fija del tablero al estilo clásico como en la imagen de referencia"""
         # Dibujar el borde exterior del tablero (marrón)
         border_color = (139, 69, 19)  # Marrón
-        border_width = 20
-        pygame.draw.rect(self.screen, border_color, 
+        border_width = BOARD_BORDER
+        pygame.draw.rect(surface, border_color, 
                          (board_offset_x - border_width, board_offset_y - border_width, 
                           BOARD_SIZE + 2*border_width, BOARD_SIZE + 2*border_width), 0, 15)
 
         # Fondo del tablero (beige claro)
         board_color = (245, 222, 179)  # Beige
-        pygame.draw.rect(self.screen, board_color, 
+        pygame.draw.rect(surface, board_color, 
                          (board_offset_x, board_offset_y, BOARD_SIZE, BOARD_SIZE), 0, 10)
 
         # Dibujar las cárceles en las esquinas
@@ -1059,13 +1830,13 @@ class ParquesClientGUI:
 
             # Color base de la cárcel
             color_value = COLOR_MAP.get(color, WHITE)
-            pygame.draw.rect(self.screen, color_value, (jail_x, jail_y, jail_size, jail_size), 0, 0)
+            pygame.draw.rect(surface, color_value, (jail_x, jail_y, jail_size, jail_size), 0, 0)
 
             # Área de las fichas (más oscura)
             inner_margin = jail_size // 10
             inner_size = jail_size - 2 * inner_margin
             inner_color = self.darken_color(color_value, 0.8)
-            pygame.draw.rect(self.screen, inner_color, 
+            pygame.draw.rect(surface, inner_color, 
                              (jail_x + inner_margin, jail_y + inner_margin, 
                               inner_size, inner_size), 0, 0)
 
@@ -1080,36 +1851,33 @@ class ParquesClientGUI:
 
         # Puntos para los triángulos, creando la cruz de colores
         # Triángulo superior izquierdo (verde)
-        pygame.draw.polygon(self.screen, COLOR_MAP['verde'],
+        pygame.draw.polygon(surface, COLOR_MAP['verde'],
                            [(center_x - half_cross, center_y - half_cross),  # Esquina superior izquierda
                             (center_x, center_y),                           # Centro
                             (center_x - half_cross, center_y)])             # Punto medio izquierdo
 
         # Triángulo superior derecho (rojo)
-        pygame.draw.polygon(self.screen, COLOR_MAP['rojo'],
+        pygame.draw.polygon(surface, COLOR_MAP['rojo'],
                            [(center_x + half_cross, center_y - half_cross),  # Esquina superior derecha
                             (center_x, center_y),                           # Centro
                             (center_x + half_cross, center_y)])             # Punto medio derecho
 
         # Triángulo inferior izquierdo (amarillo)
-        pygame.draw.polygon(self.screen, COLOR_MAP['amarillo'],
+        pygame.draw.polygon(surface, COLOR_MAP['amarillo'],
                            [(center_x - half_cross, center_y + half_cross),  # Esquina inferior izquierda
                             (center_x, center_y),                           # Centro
                             (center_x - half_cross, center_y)])             # Punto medio izquierdo
 
         # Triángulo inferior derecho (azul)
-        pygame.draw.polygon(self.screen, COLOR_MAP['azul'],
+        pygame.draw.polygon(surface, COLOR_MAP['azul'],
                            [(center_x + half_cross, center_y + half_cross),  # Esquina inferior derecha
                             (center_x, center_y),                           # Centro
                             (center_x + half_cross, center_y)])             # Punto medio derecho
 
         # Dibujar las casillas del tablero
-        self.draw_board_squares(board_offset_x, board_offset_y)
+        self.draw_board_squares(surface, board_offset_x, board_offset_y)
 
-        # Dibujar las fichas
-        self.draw_pieces(board_offset_x, board_offset_y)
-    
-    def draw_board_squares(self, board_offset_x, board_offset_y):
+    def draw_board_squares(self, surface, board_offset_x, board_offset_y):
         """Dibuja las casillas del tablero como en la imagen de referencia"""
         # Calcular dimensiones
         jail_size = BOARD_SIZE // 4
@@ -1129,198 +1897,247 @@ class ParquesClientGUI:
             x = board_offset_x + jail_size + i * square_width
             y = board_offset_y
             color = segment_colors['verde'] if 2 <= i <= 6 else (255, 255, 255)
-            pygame.draw.rect(self.screen, color, (x, y, square_width, jail_size // 2), 0)
+            pygame.draw.rect(surface, color, (x, y, square_width, jail_size // 2), 0)
 
         # Dibujar casillas horizontales inferiores (entre amarillo y azul)
         for i in range(1, 7):
             x = board_offset_x + jail_size + i * square_width
             y = board_offset_y + BOARD_SIZE - jail_size // 2
             color = segment_colors['azul'] if 2 <= i <= 6 else (255, 255, 255)
-            pygame.draw.rect(self.screen, color, (x, y, square_width, jail_size // 2), 0)
+            pygame.draw.rect(surface, color, (x, y, square_width, jail_size // 2), 0)
 
         # Dibujar casillas verticales izquierdas (entre verde y amarillo)
         for i in range(1, 7):
             x = board_offset_x
             y = board_offset_y + jail_size + i * square_height
             color = segment_colors['amarillo'] if 2 <= i <= 6 else (255, 255, 255)
-            pygame.draw.rect(self.screen, color, (x, y, jail_size // 2, square_height), 0)
+            pygame.draw.rect(surface, color, (x, y, jail_size // 2, square_height), 0)
 
         # Dibujar casillas verticales derechas (entre rojo y azul)
         for i in range(1, 7):
             x = board_offset_x + BOARD_SIZE - jail_size // 2
             y = board_offset_y + jail_size + i * square_height
             color = segment_colors['rojo'] if 2 <= i <= 6 else (255, 255, 255)
-            pygame.draw.rect(self.screen, color, (x, y, jail_size // 2, square_height), 0)
+            pygame.draw.rect(surface, color, (x, y, jail_size // 2, square_height), 0)
 
+    def build_piece_sprites(self):
+        """Renderiza una vez las fichas de cada color en todas sus variantes
+        
+        Devuelve {color: {variante: (superficie, desplazamiento)}} donde el
+        desplazamiento lleva del centro de la ficha a la esquina del sprite.
+        Variantes: 'board', 'board_selected', 'board_hover' y las mismas de 'jail'.
+        """
+        # (radio de la base, radio del anillo blanco, radio del interior)
+        sizes = {'board': (15, 8, 5), 'jail': (18, 10, 6)}
+        shadow_offset = 3
+        sprites = {}
+        
+        for color, base_color in COLOR_MAP.items():
+            shadow_color = self.darken_color(base_color, 0.5)
+            sprites[color] = {}
+            
+            for size_name, (radius, ring_radius, core_radius) in sizes.items():
+                selection_radius = radius + 3
+                center = selection_radius + 1
+                side = 2 * center + shadow_offset
+                
+                for state in (None, 'selected', 'hover'):
+                    sprite = pygame.Surface((side, side), pygame.SRCALPHA)
+                    # Sombra, base, anillo blanco e interior del color
+                    pygame.draw.circle(sprite, shadow_color, (center + shadow_offset, center + shadow_offset), radius)
+                    pygame.draw.circle(sprite, base_color, (center, center), radius)
+                    pygame.draw.circle(sprite, (255, 255, 255), (center, center), ring_radius)
+                    pygame.draw.circle(sprite, base_color, (center, center), core_radius)
+                    if state == 'selected':
+                        pygame.draw.circle(sprite, WHITE, (center, center), selection_radius, 2)
+                    elif state == 'hover':
+                        pygame.draw.circle(sprite, (255, 255, 255, 140), (center, center), selection_radius, 2)
+                    
+                    variant = f"{size_name}_{state}" if state else size_name
+                    sprites[color][variant] = (sprite.convert_alpha(), (-center, -center))
+        
+        return sprites
+    
+    @profiled()
     def draw_pieces(self, board_offset_x, board_offset_y):
-        """Dibuja las fichas en el tablero con estilo 3D con anillos blancos"""
+        """Dibuja las fichas en la capa de fichas con un solo lote de blits del atlas"""
         if not self.game_state:
             return
-            
+        
+        # Las posiciones se calculan en pantalla; la capa empieza en el borde del tablero
+        origin_x = board_offset_x - BOARD_BORDER
+        origin_y = board_offset_y - BOARD_BORDER
+        layout = self.get_board_layout(board_offset_x, board_offset_y)
         players = self.game_state.get('players', {})
+        batch = []
         
         for player_id, player_info in players.items():
             color = player_info['color']
-            pieces = player_info['pieces']
+            sprites = self.piece_sprites.get(color)
+            if not sprites:
+                continue
             
-            for i, piece in enumerate(pieces):
+            for i, piece in enumerate(player_info['pieces']):
                 position = piece['position']
-                base_color = COLOR_MAP.get(color, WHITE)
                 
-                if position == 'jail':
+                if (player_id, i) in self.animated_pieces:
+                    # Se dibuja aparte mientras se mueve
+                    continue
+                elif position == 'jail':
                     # Obtener posición en la cárcel
-                    jail_pos = self.get_jail_position(color, i)
-                    
-                    # Dibujar ficha con efecto 3D y anillo blanco
-                    # Sombra
-                    pygame.draw.circle(self.screen, self.darken_color(base_color, 0.5), 
-                                     (jail_pos[0] + 3, jail_pos[1] + 3), 18)
-                    # Base de la ficha
-                    pygame.draw.circle(self.screen, base_color, jail_pos, 18)
-                    # Anillo blanco
-                    pygame.draw.circle(self.screen, (255, 255, 255), jail_pos, 10)
-                    # Interior del color
-                    pygame.draw.circle(self.screen, base_color, jail_pos, 6)
-                
+                    x, y = layout.jail_slot(color, i)
+                    sprite, (dx, dy) = sprites['jail']
                 elif position == 'home':
                     # No dibujamos las fichas que ya llegaron a casa
                     continue
                 else:
-                    # Dibujar en el tablero
+                    # Convertir la posición del servidor al formato de nuestro tablero
                     try:
-                        # Convertir la posición del servidor al formato de nuestro tablero
-                        board_pos = int(position)
-                        x, y = self.translate_server_position_to_board(board_pos, board_offset_x, board_offset_y)
-                        
-                        # Sombra
-                        pygame.draw.circle(self.screen, self.darken_color(base_color, 0.5), 
-                                         (x + 3, y + 3), 15)
-                        # Base de la ficha
-                        pygame.draw.circle(self.screen, base_color, (x, y), 15)
-                        # Anillo blanco
-                        pygame.draw.circle(self.screen, (255, 255, 255), (x, y), 8)
-                        # Interior del color
-                        pygame.draw.circle(self.screen, base_color, (x, y), 5)
-                        
-                        # Resaltar si está seleccionada
-                        if player_id == self.player_id and self.selected_piece == i:
-                            pygame.draw.circle(self.screen, WHITE, (x, y), 18, 2)
-                    except (ValueError, TypeError) as e:
-                        pass
+                        x, y = layout.square_center(int(position))
+                    except (ValueError, TypeError):
+                        continue
+                    sprite, (dx, dy) = sprites['board']
+                
+                batch.append((sprite, (x - origin_x + dx, y - origin_y + dy)))
+        
+        self.pieces_layer.blits(batch, doreturn=False)
+    
+    def draw_moving_pieces(self, tweens, now):
+        """Dibuja sobre el tablero las fichas que se están animando"""
+        batch = []
+        for tween in tweens.values():
+            sprites = self.piece_sprites.get(tween.color)
+            if not sprites:
+                continue
+            
+            # Destello en la casilla de la captura
+            elapsed = now - tween.start
+            if tween.kind == 'capture' and 0 <= elapsed < 300:
+                x, y = tween.points[0]
+                radius = 12 + elapsed // 12
+                pygame.draw.circle(self.screen, WHITE, (int(x), int(y)), radius, 3)
+            
+            x, y = tween.position(now)
+            sprite, (dx, dy) = sprites['board']
+            batch.append((sprite, (int(x) + dx, int(y) + dy)))
+        
+        self.screen.blits(batch, doreturn=False)
     
+    @profiled()
+    def draw_board_overlay(self, board_offset_x, board_offset_y):
+        """Dibuja en la capa superior el resaltado de la ficha bajo el ratón y de la seleccionada
+        
+        Devuelve el rectángulo de la capa que quedó con contenido (o None).
+        """
+        if not self.game_state:
+            return None
+        
+        player = self.game_state.get('players', {}).get(self.player_id)
+        if not player:
+            return None
+        
+        sprites = self.piece_sprites.get(player['color'])
+        if not sprites:
+            return None
+        
+        layout = self.get_board_layout(board_offset_x, board_offset_y)
+        drawn = None
+        for piece_index, state in ((self.hovered_piece, 'hover'), (self.selected_piece, 'selected')):
+            if piece_index is None or piece_index >= len(player['pieces']):
+                continue
+            if state == 'hover' and piece_index == self.selected_piece:
+                continue  # La selección ya la resalta
+            
+            position = player['pieces'][piece_index]['position']
+            if position == 'home':
+                continue
+            if position == 'jail':
+                x, y = layout.jail_slot(player['color'], piece_index)
+                sprite, (dx, dy) = sprites[f'jail_{state}']
+            else:
+                try:
+                    x, y = layout.square_center(int(position))
+                except (ValueError, TypeError):
+                    continue
+                sprite, (dx, dy) = sprites[f'board_{state}']
+            
+            x, y = x - board_offset_x + BOARD_BORDER, y - board_offset_y + BOARD_BORDER
+            rect = self.overlay_layer.blit(sprite, (x + dx, y + dy))
+            drawn = rect if drawn is None else drawn.union(rect)
+        
+        return drawn
+    
+    @profiled()
     def draw_dice(self, x, y, size):
-        """Dibuja los dados con efectos visuales mejorados"""
+        """Dibuja los dados; la animación depende solo del tiempo transcurrido"""
         # Animar si están rodando
         if self.dice_rolling:
-            current_time = pygame.time.get_ticks()
-            elapsed = current_time - self.dice_animation_start
+            elapsed = pygame.time.get_ticks() - self.dice_animation_start
             
             if elapsed < self.dice_animation_duration:
-                # Durante la animación mostrar valores aleatorios y rotación
+                # Durante la animación mostrar caras cambiantes y rotación
                 animation_progress = elapsed / self.dice_animation_duration
                 shake_amount = (1 - animation_progress) * 10  # Disminuye con el tiempo
                 
-                # Posiciones con "sacudida" aleatoria
-                shake_x1 = x + random.uniform(-shake_amount, shake_amount)
-                shake_y1 = y + random.uniform(-shake_amount, shake_amount)
-                shake_x2 = x + size + 20 + random.uniform(-shake_amount, shake_amount)
-                shake_y2 = y + random.uniform(-shake_amount, shake_amount)
-                
-                temp_dice1 = random.randint(1, 6)
-                temp_dice2 = random.randint(1, 6)
+                # "Sacudida" y caras deterministas para el instante actual
+                shake_x = shake_amount * math.sin(elapsed * 0.07)
+                shake_y = shake_amount * math.cos(elapsed * 0.09)
+                slot = elapsed // 80  # Una cara nueva cada 80 ms
+                temp_dice1 = (self.dice_animation_start + slot * 5) % 6 + 1
+                temp_dice2 = (self.dice_animation_start + slot * 7 + 3) % 6 + 1
+                angle = animation_progress * 360
                 
-                self.draw_single_die(shake_x1, shake_y1, size, temp_dice1, animation_progress)
-                self.draw_single_die(shake_x2, shake_y2, size, temp_dice2, animation_progress)
-            else:
-                # Finalizar animación
-                self.dice_rolling = False
-                
-                self.draw_single_die(x, y, size, self.dice_values[0], 0)
-                self.draw_single_die(x + size + 20, y, size, self.dice_values[1], 0)
-        else:
-            # Dibujar dados con valores actuales
-            self.draw_single_die(x, y, size, self.dice_values[0], 0)
-            self.draw_single_die(x + size + 20, y, size, self.dice_values[1], 0)
-    
-    def draw_single_die(self, x, y, size, value, animation_progress=0):
-        """Dibuja un dado individual con efectos visuales mejorados"""
-        # Calcular rotación para la animación
-        rotation_angle = animation_progress * 360  # Grados de rotación
-        
-        # Colores del dado
-        die_color = (230, 230, 230)  # Blanco ligeramente grisáceo
-        dot_color = (30, 30, 30)     # Negro suave
-        
-        # Crear superficie para el dado
-        die_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        
-        # Fondo del dado (con sombra)
-        pygame.draw.rect(die_surface, (30, 30, 40, 100), (4, 4, size, size), 0, 10)  # Sombra
-        pygame.draw.rect(die_surface, die_color, (0, 0, size, size), 0, 10)  # Dado
-        
-        # Efecto de borde
-        pygame.draw.rect(die_surface, (200, 200, 200), (0, 0, size, size), 2, 10)
-        
-        # Efecto de luz en la esquina
-        pygame.draw.circle(die_surface, (255, 255, 255, 100), (size//4, size//4), size//10)
-        
-        # Dibujar puntos según el valor
-        dot_radius = size // 10
-        positions = []
-        
-        if value == 1:
-            positions = [(0.5, 0.5)]
-        elif value == 2:
-            positions = [(0.25, 0.25), (0.75, 0.75)]
-        elif value == 3:
-            positions = [(0.25, 0.25), (0.5, 0.5), (0.75, 0.75)]
-        elif value == 4:
-            positions = [(0.25, 0.25), (0.75, 0.25), (0.25, 0.75), (0.75, 0.75)]
-        elif value == 5:
-            positions = [(0.25, 0.25), (0.75, 0.25), (0.5, 0.5), (0.25, 0.75), (0.75, 0.75)]
-        elif value == 6:
-            positions = [(0.25, 0.25), (0.75, 0.25), (0.25, 0.5), (0.75, 0.5), (0.25, 0.75), (0.75, 0.75)]
-        
-        for px, py in positions:
-            dot_x = int(px * size)
-            dot_y = int(py * size)
+                self.draw_single_die(x + shake_x, y + shake_y, size, temp_dice1, angle)
+                self.draw_single_die(x + size + 20 - shake_y, y + shake_x, size, temp_dice2, -angle)
+                return
             
-            # Dibujar punto con efecto 3D
-            pygame.draw.circle(die_surface, (10, 10, 10), (dot_x + 1, dot_y + 1), dot_radius)  # Sombra
-            pygame.draw.circle(die_surface, dot_color, (dot_x, dot_y), dot_radius)  # Punto
+            # Finalizar animación
+            self.dice_rolling = False
         
-        # Aplicar rotación si está en animación
-        if animation_progress > 0:
-            die_surface = pygame.transform.rotate(die_surface, rotation_angle)
-            # Recalcular tamaño después de rotación
-            new_rect = die_surface.get_rect(center=(x + size//2, y + size//2))
-            self.screen.blit(die_surface, new_rect.topleft)
-        else:
-            # Sin rotación
-            self.screen.blit(die_surface, (x, y))
+        # Dibujar dados con valores actuales
+        self.draw_single_die(x, y, size, self.dice_values[0])
+        self.draw_single_die(x + size + 20, y, size, self.dice_values[1])
     
+    def draw_single_die(self, x, y, size, value, angle=0):
+        """Dibuja un dado copiando su cuadro del atlas, centrado en el mismo sitio que sin girar"""
+        surface, (dx, dy) = self.dice_atlas.frame(size, value, angle)
+        self.screen.blit(surface, (int(x) + size // 2 + dx, int(y) + size // 2 + dy))
+    
+    @profiled()
     def draw_log_messages(self, x, y, width, height):
         """Dibuja los mensajes del log con estilo moderno"""
         # Título
-        log_title = FONT_SMALL.render("MENSAJES", True, WHITE)
+        log_title = self.text_cache.render(FONT_SMALL, "MENSAJES", WHITE)
         self.screen.blit(log_title, (x + width//2 - log_title.get_width()//2, y))
         
         # Línea separadora
         pygame.draw.line(self.screen, (100, 100, 120, 128), 
                          (x, y + 20), (x + width, y + 20), 1)
         
-        # Mensajes
+        # Si el log no cambió, reutilizar las superficies y posiciones del frame anterior
+        messages = tuple(self.log_messages[-5:])  # Mostrar solo los últimos 5 mensajes
+        key = (messages, x, y, width, height)
+        if key != self.log_render_key:
+            self.log_render_blits = self.layout_log_messages(messages, x, y, width, height)
+            self.log_render_key = key
+        
+        self.screen.blits(self.log_render_blits, doreturn=False)
+    
+    def layout_log_messages(self, messages, x, y, width, height):
+        """Calcula las superficies y posiciones de los mensajes del log"""
+        blits = []
         msg_y = y + 25
-        for msg in self.log_messages[-5:]:  # Mostrar solo los últimos 5 mensajes
+        for msg in messages:
             # Detectar tipos de mensajes especiales para colorear
+            lower_msg = msg.lower()
             text_color = WHITE
-            if "tu turno" in msg.lower() or "¡es tu turno" in msg.lower():
+            if "tu turno" in lower_msg or "¡es tu turno" in lower_msg:
                 text_color = GREEN
-            elif "capturó" in msg.lower():
+            elif "capturó" in lower_msg:
                 text_color = ORANGE
-            elif "error" in msg.lower():
+            elif "error" in lower_msg:
                 text_color = RED
-            elif "ganado" in msg.lower() or "victoria" in msg.lower():
+            elif "ganado" in lower_msg or "victoria" in lower_msg:
                 text_color = YELLOW
                 
             # Extraer timestamp si existe
@@ -1329,44 +2146,24 @@ class ParquesClientGUI:
                 timestamp = msg[:timestamp_end]
                 message = msg[timestamp_end:].strip()
                 
-                # Timestamp en gris
-                time_surface = FONT_SMALL.render(timestamp, True, GRAY)
-                self.screen.blit(time_surface, (x, msg_y))
-                
-                # Mensaje con color según tipo
-                message_surface = FONT_SMALL.render(message, True, text_color)
-                
-                # Verificar si el mensaje es demasiado largo
-                if message_surface.get_width() > width - 5:
-                    # Truncar y añadir "..."
-                    truncated_len = 20  # Longitud máxima aproximada
-                    if len(message) > truncated_len:
-                        message = message[:truncated_len] + "..."
-                    message_surface = FONT_SMALL.render(message, True, text_color)
-                
-                self.screen.blit(message_surface, (x, msg_y + 15))
+                # Timestamp en gris y mensaje con color según tipo (truncado si no cabe)
+                blits.append((self.text_cache.render(FONT_SMALL, timestamp, GRAY), (x, msg_y)))
+                blits.append((self.text_cache.fit(FONT_SMALL, message, text_color, width - 5), (x, msg_y + 15)))
                 msg_y += 35
             else:
-                # Si no tiene timestamp, mostrar el mensaje completo
-                text_surface = FONT_SMALL.render(msg, True, text_color)
-                
-                # Truncar si es necesario
-                if text_surface.get_width() > width - 10:
-                    truncated_len = 25
-                    if len(msg) > truncated_len:
-                        msg = msg[:truncated_len] + "..."
-                    text_surface = FONT_SMALL.render(msg, True, text_color)
-                
-                self.screen.blit(text_surface, (x, msg_y))
+                # Si no tiene timestamp, mostrar el mensaje completo (truncado si no cabe)
+                blits.append((self.text_cache.fit(FONT_SMALL, msg, text_color, width - 10), (x, msg_y)))
                 msg_y += 20
             
             if msg_y > y + height - 10:
                 break
+        return blits
     
+    @profiled()
     def draw_help_screen(self):
         """Dibuja la pantalla de ayuda adaptada al nuevo diseño del tablero"""
         # Fondo semitransparente
-        help_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        help_surface = self.surface_pool.scratch((SCREEN_WIDTH, SCREEN_HEIGHT), clear=False)
         help_surface.fill((0, 0, 20, 230))  # Azul muy oscuro semi-transparente
         self.screen.blit(help_surface, (0, 0))
         
@@ -1379,7 +2176,7 @@ class ParquesClientGUI:
         pygame.draw.rect(self.screen, (80, 60, 120), title_rect, 0, 10)
         pygame.draw.rect(self.screen, (120, 100, 180), title_rect, 2, 10)
         
-        help_title = FONT_LARGE.render("CÓMO JUGAR AL PARQUÉS", True, WHITE)
+        help_title = self.text_cache.render(FONT_LARGE, "CÓMO JUGAR AL PARQUÉS", WHITE)
         self.screen.blit(help_title, (SCREEN_WIDTH // 2 - help_title.get_width() // 2, help_rect.y + 30))
         
         # Instrucciones con iconos y mejor formato
@@ -1397,17 +2194,17 @@ class ParquesClientGUI:
         y_offset = help_rect.y + 90
         for icon, text in instructions:
             # Icono
-            icon_text = FONT_LARGE.render(icon, True, WHITE)
+            icon_text = self.text_cache.render(FONT_LARGE, icon, WHITE)
             self.screen.blit(icon_text, (help_rect.x + 40, y_offset))
             
             # Texto de instrucción
-            instr_text = FONT_MEDIUM.render(text, True, WHITE)
+            instr_text = self.text_cache.render(FONT_MEDIUM, text, WHITE)
             self.screen.blit(instr_text, (help_rect.x + 80, y_offset + 5))
             
             y_offset += 35
         
         # Sección de controles
-        controls_title = FONT_MEDIUM.render("CONTROLES:", True, YELLOW)
+        controls_title = self.text_cache.render(FONT_MEDIUM, "CONTROLES:", YELLOW)
         self.screen.blit(controls_title, (help_rect.x + 40, y_offset + 20))
         
         controls = [
@@ -1419,16 +2216,16 @@ class ParquesClientGUI:
         
         y_offset += 50
         for icon_text, control_text in controls:
-            icon_surface = FONT_MEDIUM.render(icon_text, True, CYAN)
+            icon_surface = self.text_cache.render(FONT_MEDIUM, icon_text, CYAN)
             self.screen.blit(icon_surface, (help_rect.x + 40, y_offset))
             
-            text_surface = FONT_MEDIUM.render(control_text, True, WHITE)
+            text_surface = self.text_cache.render(FONT_MEDIUM, control_text, WHITE)
             self.screen.blit(text_surface, (help_rect.x + 240, y_offset))
             
             y_offset += 30
         
         # Explicación del tablero
-        board_title = FONT_MEDIUM.render("TABLERO:", True, YELLOW)
+        board_title = self.text_cache.render(FONT_MEDIUM, "TABLERO:", YELLOW)
         self.screen.blit(board_title, (help_rect.x + 40, y_offset + 20))
         
         board_info = [
@@ -1441,7 +2238,7 @@ class ParquesClientGUI:
         
         y_offset += 50
         for info in board_info:
-            info_text = FONT_SMALL.render(info, True, WHITE)
+            info_text = self.text_cache.render(FONT_SMALL, info, WHITE)
             self.screen.blit(info_text, (help_rect.x + 40, y_offset))
             y_offset += 25
         
@@ -1456,7 +2253,7 @@ class ParquesClientGUI:
         pygame.draw.rect(self.screen, button_color, close_rect, 0, 10)
         pygame.draw.rect(self.screen, (150, 120, 200), close_rect, 2, 10)
         
-        close_text = FONT_MEDIUM.render("CERRAR (H)", True, WHITE)
+        close_text = self.text_cache.render(FONT_MEDIUM, "CERRAR (H)", WHITE)
         self.screen.blit(close_text, (SCREEN_WIDTH // 2 - close_text.get_width() // 2, close_rect.y + 10))
     
     def draw_star(self, x, y, size, color):
@@ -1473,114 +2270,24 @@ class ParquesClientGUI:
         
         pygame.draw.polygon(self.screen, color, points)
     
+    def get_board_layout(self, board_offset_x=None, board_offset_y=None):
+        """Devuelve las posiciones precalculadas, reconstruyéndolas solo si cambia la geometría"""
+        if board_offset_x is None or board_offset_y is None:
+            board_offset_x = (SCREEN_WIDTH - BOARD_SIZE) // 2
+            board_offset_y = (SCREEN_HEIGHT - BOARD_SIZE) // 2
+        
+        key = (BOARD_SIZE, board_offset_x, board_offset_y)
+        if self.board_layout is None or self.board_layout.key != key:
+            self.board_layout = BoardLayout(BOARD_SIZE, board_offset_x, board_offset_y)
+        return self.board_layout
+    
     def get_jail_position(self, color, index):
         """Obtiene la posición de una ficha en la cárcel"""
-        board_offset_x = (SCREEN_WIDTH - BOARD_SIZE) // 2
-        board_offset_y = (SCREEN_HEIGHT - BOARD_SIZE) // 2
-        jail_size = BOARD_SIZE // 4
-        
-        # Calcular posiciones para cada color
-        positions = {
-            'rojo': [(board_offset_x + BOARD_SIZE - jail_size//2 - 25, board_offset_y + jail_size//2 - 25),
-                     (board_offset_x + BOARD_SIZE - jail_size//2 + 25, board_offset_y + jail_size//2 - 25),
-                     (board_offset_x + BOARD_SIZE - jail_size//2 - 25, board_offset_y + jail_size//2 + 25),
-                     (board_offset_x + BOARD_SIZE - jail_size//2 + 25, board_offset_y + jail_size//2 + 25)],
-            'verde': [(board_offset_x + jail_size//2 - 25, board_offset_y + jail_size//2 - 25),
-                      (board_offset_x + jail_size//2 + 25, board_offset_y + jail_size//2 - 25),
-                      (board_offset_x + jail_size//2 - 25, board_offset_y + jail_size//2 + 25),
-                      (board_offset_x + jail_size//2 + 25, board_offset_y + jail_size//2 + 25)],
-            'amarillo': [(board_offset_x + jail_size//2 - 25, board_offset_y + BOARD_SIZE - jail_size//2 - 25),
-                         (board_offset_x + jail_size//2 + 25, board_offset_y + BOARD_SIZE - jail_size//2 - 25),
-                         (board_offset_x + jail_size//2 - 25, board_offset_y + BOARD_SIZE - jail_size//2 + 25),
-                         (board_offset_x + jail_size//2 + 25, board_offset_y + BOARD_SIZE - jail_size//2 + 25)],
-            'azul': [(board_offset_x + BOARD_SIZE - jail_size//2 - 25, board_offset_y + BOARD_SIZE - jail_size//2 - 25),
-                    (board_offset_x + BOARD_SIZE - jail_size//2 + 25, board_offset_y + BOARD_SIZE - jail_size//2 - 25),
-                    (board_offset_x + BOARD_SIZE - jail_size//2 - 25, board_offset_y + BOARD_SIZE - jail_size//2 + 25),
-                    (board_offset_x + BOARD_SIZE - jail_size//2 + 25, board_offset_y + BOARD_SIZE - jail_size//2 + 25)]
-        }
-        
-        if color in positions and index < len(positions[color]):
-            return positions[color][index]
-        
-        # Posición por defecto si algo falla
-        return (board_offset_x + BOARD_SIZE//2, board_offset_y + BOARD_SIZE//2)
+        return self.get_board_layout().jail_slot(color, index)
     
     def translate_server_position_to_board(self, server_position, board_offset_x, board_offset_y):
         """Traduce una posición del servidor a coordenadas en nuestro tablero"""
-        # Tamaño de las casillas y áreas
-        jail_size = BOARD_SIZE // 4
-        square_width = jail_size // 2
-        square_height = square_width // 2
-        
-        # Límites para cada lado del tablero (posiciones del servidor)
-        # Estos valores deberían ajustarse según la numeración real del servidor
-        top_min, top_max = 0, 17
-        right_min, right_max = 18, 35
-        bottom_min, bottom_max = 36, 53
-        left_min, left_max = 54, 71
-        
-        # Mapear la posición del servidor a nuestro tablero
-        x, y = 0, 0
-        
-        try:
-            # Parte superior (entre verde y rojo)
-            if top_min <= server_position <= top_max:
-                rel_pos = server_position - top_min
-                x = board_offset_x + jail_size + (rel_pos + 1) * square_width + square_width // 2
-                y = board_offset_y + jail_size // 4
-            
-            # Parte derecha (entre rojo y azul)
-            elif right_min <= server_position <= right_max:
-                rel_pos = server_position - right_min
-                x = board_offset_x + BOARD_SIZE - jail_size // 4
-                y = board_offset_y + jail_size + rel_pos * square_height + square_height // 2
-            
-            # Parte inferior (entre azul y amarillo)
-            elif bottom_min <= server_position <= bottom_max:
-                rel_pos = server_position - bottom_min
-                x = board_offset_x + BOARD_SIZE - jail_size - rel_pos * square_width - square_width // 2
-                y = board_offset_y + BOARD_SIZE - jail_size // 4
-            
-            # Parte izquierda (entre amarillo y verde)
-            elif left_min <= server_position <= left_max:
-                rel_pos = server_position - left_min
-                x = board_offset_x + jail_size // 4
-                y = board_offset_y + BOARD_SIZE - jail_size - rel_pos * square_height - square_height // 2
-            
-            # Caminos hacia el centro (simplificados, ajustar según servidor)
-            elif 72 <= server_position <= 77:  # Camino verde
-                rel_pos = server_position - 72
-                x = board_offset_x + jail_size + square_width // 2
-                y = board_offset_y + jail_size // 2 + rel_pos * square_height + square_height // 2
-            
-            elif 78 <= server_position <= 83:  # Camino rojo
-                rel_pos = server_position - 78
-                x = board_offset_x + BOARD_SIZE - jail_size - rel_pos * square_width - square_width // 2
-                y = board_offset_y + jail_size + square_height // 2
-            
-            elif 84 <= server_position <= 89:  # Camino amarillo
-                rel_pos = server_position - 84
-                x = board_offset_x + jail_size + rel_pos * square_width + square_width // 2
-                y = board_offset_y + BOARD_SIZE - jail_size - square_height // 2
-            
-            elif 90 <= server_position <= 95:  # Camino azul
-                rel_pos = server_position - 90
-                x = board_offset_x + BOARD_SIZE - jail_size - square_width // 2
-                y = board_offset_y + BOARD_SIZE - jail_size - rel_pos * square_height - square_height // 2
-            
-            # Si no se encuentra en ningún rango conocido, mostrar en el centro
-            else:
-                x = board_offset_x + BOARD_SIZE // 2
-                y = board_offset_y + BOARD_SIZE // 2
-                print(f"Posición desconocida: {server_position}")
-                
-        except Exception as e:
-            print(f"Error mapeando posición {server_position}: {e}")
-            # Posición por defecto en caso de error
-            x = board_offset_x + BOARD_SIZE // 2
-            y = board_offset_y + BOARD_SIZE // 2
-            
-        return (x, y)
+        return self.get_board_layout(board_offset_x, board_offset_y).square_center(server_position)
     
     def lighten_color(self, color, factor=1.5):
         """Aclara un color multiplicando sus componentes por un factor"""
@@ -1604,6 +2311,162 @@ class ParquesClientGUI:
             if random.random() < 0.02:  # Ocasionalmente añadir un efecto de destello
                 self.add_highlight_effect()
     
+    def hit_test(self, pos, kind=None, player_id=None):
+        """Zona más alta bajo el ratón en la pantalla actual (o None)
+        
+        Con player_id solo se consideran las fichas de ese jugador.
+        """
+        grid = self.get_hit_grid()
+        if player_id is None:
+            return grid.hit(pos, kind)
+        target = grid.hit(pos, kind)
+        # Las fichas propias se insertan al final, así que quedan encima de las rivales
+        if target and target.kind == 'piece' and target.data[0] == player_id:
+            return target
+        return None
+    
+    def get_hit_grid(self):
+        """Devuelve el índice de zonas clicables, reconstruyéndolo solo si cambió algo"""
+        layout = self.get_board_layout()
+        key = (self.current_screen, self.show_help_screen, layout.key)
+        if self.hit_grid_dirty or key != self.hit_grid_key:
+            self.build_hit_grid(layout)
+            self.hit_grid_key = key
+            self.hit_grid_dirty = False
+        return self.hit_grid
+    
+    def build_hit_grid(self, layout):
+        """Inserta las zonas de la pantalla actual de abajo hacia arriba
+        
+        damage_rect es la zona a redibujar al entrar o salir el ratón
+        (incluye la sombra del botón o el anillo de la ficha).
+        """
+        grid = self.hit_grid
+        grid.clear()
+        
+        if self.current_screen == "connect":
+            grid.insert((SCREEN_WIDTH // 2 - 150, 320, 300, 40), 'control', 'name_input')
+            grid.insert((SCREEN_WIDTH // 2 - 100, 390, 200, 50), 'control', 'connect_button',
+                        pygame.Rect(SCREEN_WIDTH // 2 - 100, 390, 200, 53))
+        
+        elif self.current_screen == "lobby":
+            grid.insert((SCREEN_WIDTH // 2 - 100, 480, 200, 60), 'control', 'start_button',
+                        pygame.Rect(SCREEN_WIDTH // 2 - 100, 480, 200, 63))
+        
+        elif self.current_screen == "game":
+            if self.show_help_screen:
+                # La ayuda tapa el tablero: solo responde el botón cerrar
+                grid.insert((SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2 + 190, 140, 40), 'control', 'help_close')
+                return
+            
+            # Casillas del recorrido
+            cell = BOARD_SIZE // 16
+            for position, (x, y) in enumerate(layout.squares):
+                grid.insert((x - cell // 2, y - cell // 2, cell, cell), 'square', position)
+            
+            # Fichas: primero las rivales y al final las propias
+            players = self.game_state.get('players', {}) if self.game_state else {}
+            ordered = sorted(players.items(), key=lambda item: item[0] == self.player_id)
+            for player_id, player_info in ordered:
+                for i, piece in enumerate(player_info['pieces']):
+                    position = piece['position']
+                    if position == 'home':
+                        continue
+                    if position == 'jail':
+                        x, y = layout.jail_slot(player_info['color'], i)
+                        half = 18
+                    else:
+                        try:
+                            x, y = layout.square_center(int(position))
+                        except (ValueError, TypeError):
+                            continue
+                        half = 15
+                    rect = pygame.Rect(x - half, y - half, 2 * half, 2 * half)
+                    # Anillo de resaltado y sombra
+                    grid.insert(rect, 'piece', (player_id, i), rect.inflate(12, 12).move(1, 1))
+            
+            grid.insert((680, 500, 180, 45), 'control', 'dice_button', pygame.Rect(680, 500, 180, 50))
+    
+    def update_hover(self, mouse_pos):
+        """Redibuja solo los controles o fichas que el ratón acaba de tocar o abandonar"""
+        hovered = self.hit_test(mouse_pos)
+        if hovered and hovered.kind == 'square':
+            hovered = None  # Las casillas no tienen resaltado
+        
+        old_key = self.hovered_target.key() if self.hovered_target else None
+        new_key = hovered.key() if hovered else None
+        if new_key != old_key:
+            if self.hovered_target:
+                self.render_scheduler.mark_dirty(self.hovered_target.damage_rect)
+            if hovered:
+                self.render_scheduler.mark_dirty(hovered.damage_rect)
+            self.hovered_target = hovered
+        
+        # Resaltar la ficha propia que se puede seleccionar
+        piece = None
+        if (hovered and hovered.kind == 'piece' and hovered.data[0] == self.player_id
+                and self.my_turn and not self.dice_rolling):
+            piece = hovered.data[1]
+        self.hovered_piece = piece
+    
+    def ui_signature(self):
+        """Resumen barato del estado que se ve en pantalla; si cambia, se redibuja todo"""
+        return (self.current_screen, self.state_version, self.can_start_game, self.my_turn,
+                self.dice_values, self.dice_rolling, self.status_message, self.name_input,
+                self.input_active, self.show_help_screen, self.selected_piece, self.show_stats_overlay,
+                self.player_name, self.player_color,
+                len(self.log_messages), self.log_messages[-1] if self.log_messages else None)
+    
+    def schedule_redraw(self):
+        """Marca las zonas sucias de este frame según el estado y las animaciones"""
+        scheduler = self.render_scheduler
+        
+        signature = self.ui_signature()
+        if signature != self.last_ui_signature:
+            scheduler.mark_dirty()
+            self.last_ui_signature = signature
+            self.hovered_target = None  # Los controles pueden haber cambiado
+        
+        animating = False
+        
+        # Cursor parpadeante del campo de nombre
+        if self.current_screen == "connect" and self.input_active:
+            phase = int(time.time() * 2) % 2
+            if phase != self.cursor_phase:
+                scheduler.mark_dirty((SCREEN_WIDTH // 2 - 150, 320, 300, 40))
+                self.cursor_phase = phase
+        
+        if self.current_screen == "game":
+            # Fichas en movimiento
+            for tween in self.piece_animator.active().values():
+                scheduler.mark_dirty(tween.bounds())
+                animating = True
+            # Dados rodando (incluye la sacudida y la rotación)
+            if self.dice_rolling:
+                scheduler.mark_dirty((680, 270, 200, 140))
+                animating = True
+            # Indicador pulsante de "¡ES TU TURNO!"
+            if self.my_turn and not self.show_help_screen:
+                scheduler.mark_dirty((660, 232, 210, 36))
+                animating = True
+        
+        # El panel de rendimiento se actualiza cuatro veces por segundo
+        if self.show_stats_overlay and time.time() - self.stats_overlay_updated >= 0.25:
+            scheduler.mark_dirty(self.stats_overlay_rect)
+        
+        if self.animated_background and self.current_screen in ("connect", "lobby"):
+            scheduler.mark_dirty()
+            animating = True
+        
+        scheduler.animating = animating
+    
+    def wait_for_events(self, timeout_ms):
+        """Bloquea hasta que llegue un evento o pase el tiempo indicado (sin consumir CPU)"""
+        event = pygame.event.wait(timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    
     def add_highlight_effect(self):
         """Añade un efecto de destello visual en el turno del jugador"""
         # Esta función es un placeholder para futuras mejoras visuales
@@ -1612,56 +2475,132 @@ class ParquesClientGUI:
     def disconnect(self):
         """Desconecta del servidor"""
         self.running = False
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-        self.connected = False
+        self.client.close()
         print("Desconectado del servidor")
     
+    def count_allocations(self):
+        """Superficies creadas hasta ahora por el pool y por la caché de textos"""
+        return self.surface_pool.allocations + self.text_cache.misses
+    
+    def draw_stats_overlay(self):
+        """Panel de rendimiento: frames, fases, RTT por acción y tráfico"""
+        summary = self.profiler.summary()
+        panel = self.surface_pool.scratch(self.stats_overlay_rect.size, clear=False)
+        panel.fill((10, 10, 25, 215))
+        pygame.draw.rect(panel, (120, 120, 160), panel.get_rect(), 1)
+        
+        lines = []
+        frame = summary['frame_ms']
+        lines.append((f"FPS {self.stats_fps:.1f}   frame {frame['mean']:.1f} ms  "
+                      f"p95 {frame['p95']:.1f}  p99 {frame['p99']:.1f}", WHITE))
+        lines.append((f"Frames lentos (>{self.profiler.slow_frame_ms:.0f} ms): {summary['slow_frames']}", GRAY))
+        
+        y = 8
+        for text, color in lines:
+            panel.blit(self.text_cache.render(FONT_SMALL, text, color), (8, y))
+            y += 18
+        
+        # Histograma de tiempos de frame
+        histogram = summary['histogram']
+        most = max((count for _, count in histogram), default=0) or 1
+        for label, count in histogram:
+            panel.blit(self.text_cache.render(FONT_SMALL, f"{label} ms", GRAY), (8, y))
+            pygame.draw.rect(panel, GREEN if label.startswith('≤') else ORANGE,
+                             (80, y + 3, int(150 * count / most), 10))
+            panel.blit(self.text_cache.render(FONT_SMALL, str(count), GRAY), (240, y))
+            y += 15
+        
+        # Fases más costosas
+        y += 4
+        phases = sorted(summary['phases_ms'].items(), key=lambda item: item[1]['mean'], reverse=True)
+        for name, data in phases[:4]:
+            panel.blit(self.text_cache.render(
+                FONT_SMALL, f"{name}: {data['mean']:.2f} ms (p95 {data['p95']:.2f})", CYAN), (8, y))
+            y += 16
+        
+        # Red
+        y += 4
+        for action, data in sorted(summary['rtt_ms'].items(), key=lambda item: str(item[0]))[:3]:
+            panel.blit(self.text_cache.render(
+                FONT_SMALL, f"RTT {action}: {data['mean']:.1f} ms (p95 {data['p95']:.1f})", YELLOW), (8, y))
+            y += 16
+        panel.blit(self.text_cache.render(
+            FONT_SMALL, f"Recibido: {summary['bytes_per_second'] / 1024:.2f} KB/s   F4 exporta", GRAY), (8, y))
+        
+        self.screen.blit(panel, self.stats_overlay_rect.topleft)
+        self.stats_overlay_updated = time.time()
+    
     def run(self):
         """Ejecuta el bucle principal del juego"""
-        clock = pygame.time.Clock()
-        fps_display = False  # Para mostrar/ocultar FPS (útil para debugging)
+        clock = self.clock
+        scheduler = self.render_scheduler
+        profiler = self.profiler
         
         while self.running:
-            # Tiempo al inicio del frame
-            frame_start = time.time()
+            # Sin nada que animar, esperar eventos en lugar de dibujar a 60 FPS
+            if scheduler.is_idle():
+                events = self.wait_for_events(scheduler.idle_timeout_ms)
+            else:
+                events = pygame.event.get()
+            
+            # El tiempo del frame no incluye la espera de eventos ni la del reloj
+            profiler.begin_frame()
+            
+            # Adoptar el último estado publicado por la red: todo el frame ve el mismo snapshot
+            self.state_store.swap()
             
             # Manejar eventos
-            if not self.handle_events():
+            phase_start = time.perf_counter()
+            if not self.handle_events(events):
                 break
+            profiler.add('events', time.perf_counter() - phase_start)
                 
-            # Actualizar animaciones
+            # Actualizar animaciones y decidir qué zonas redibujar
+            phase_start = time.perf_counter()
             self.update_animation()
+            self.schedule_redraw()
+            dirty_rects = scheduler.take_dirty()
+            profiler.add('update', time.perf_counter() - phase_start)
             
-            # Dibujar pantalla actual
-            if self.current_screen == "connect":
-                self.draw_connect_screen()
-            elif self.current_screen == "lobby":
-                self.draw_lobby_screen()
-            elif self.current_screen == "game":
-                self.draw_game_screen()
-            
-            # Mostrar FPS para debugging (opcional)
-            if fps_display:
-                fps = clock.get_fps()
-                fps_text = FONT_SMALL.render(f"FPS: {fps:.1f}", True, WHITE)
-                self.screen.blit(fps_text, (10, 10))
-            
-            # Actualizar pantalla
-            pygame.display.flip()
-            
-            # Controlar FPS
-            clock.tick(60)
+            if dirty_rects:
+                allocations_before = self.count_allocations()
+                
+                # Recortar el dibujo a las zonas sucias
+                self.screen.set_clip(dirty_rects[0].unionall(dirty_rects[1:]))
+                
+                # Dibujar pantalla actual
+                if self.current_screen == "connect":
+                    self.draw_connect_screen()
+                elif self.current_screen == "lobby":
+                    self.draw_lobby_screen()
+                elif self.current_screen == "game":
+                    self.draw_game_screen()
+                
+                if self.debug:
+                    allocated = self.count_allocations() - allocations_before
+                    if allocated:
+                        print(f"[debug] {allocated} superficies creadas en el frame ({self.current_screen})")
+                
+                # Panel de rendimiento (F3)
+                if self.show_stats_overlay:
+                    self.stats_fps = clock.get_fps()
+                    self.draw_stats_overlay()
+                
+                self.screen.set_clip(None)
+                
+                # Enviar solo las zonas modificadas
+                phase_start = time.perf_counter()
+                pygame.display.update(dirty_rects)
+                profiler.add('flip', time.perf_counter() - phase_start)
+                
+                if not self.startup.reported:
+                    self.startup.report()
             
-            # Calcular tiempo real del frame
-            frame_time = time.time() - frame_start
+            profiler.end_frame(drawn=bool(dirty_rects))
             
-            # Mostrar mensajes de advertencia si el rendimiento es bajo
-            if frame_time > 0.05:  # Más de 50 ms por frame (menos de 20 FPS)
-                print(f"¡Advertencia: Frame lento! {frame_time*1000:.1f} ms")
+            # Controlar FPS mientras haya trabajo
+            if not scheduler.is_idle():
+                clock.tick(scheduler.active_fps)
         
         # Limpiar recursos
         self.disconnect()
@@ -1669,6 +2608,11 @@ class ParquesClientGUI:
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Cliente gráfico de Parqués")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Imprimir la duración de cada fase del arranque tras el primer frame")
+    args = parser.parse_args()
+    
     print("🎮 Cliente Gráfico de Parqués - Sistemas Distribuidos")
     print("="*60)
     print("Versión Tablero Clásico")
@@ -1692,8 +2636,13 @@ def main():
     print("✨ Disfruta del auténtico estilo visual del Parqués tradicional ✨")
     
     # Iniciar cliente
-    client = ParquesClientGUI(server_host, server_port)
+    # PARQUES_DEBUG=1 avisa de las superficies creadas en cada frame
+    startup_profile = StartupProfile(enabled=args.startup_profile)
+    client = ParquesClientGUI(server_host, server_port, debug=os.environ.get('PARQUES_DEBUG') == '1',
+                              startup_profile=startup_profile)
     client.run()
 
+MODULE_LOADED = time.perf_counter()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfilado del Cliente de Parqués
+Tiempos por frame y por fase de dibujado, tiempo de ida y vuelta (RTT) de
+cada acción contra el servidor y bytes recibidos por segundo, con
+exportación a CSV y JSON para adjuntar a los reportes de lentitud; y las
+fases del arranque del cliente (--startup-profile).
+"""
+
+import contextlib
+import csv
+import functools
+import json
+import math
+import threading
+import time
+from collections import deque
+
+# Límites del histograma de tiempo de frame (ms)
+FRAME_BUCKETS_MS = (4, 8, 16.7, 33.3, 50, 100)
+
+
+def percentile(sorted_values, pct):
+    """Percentil por rango más cercano de una lista ya ordenada: el valor en la posición ⌈pct·n/100⌉"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100.0) - 1))
+    return sorted_values[index]
+
+
+def profiled(phase=None):
+    """Decorador para métodos del cliente: suma su duración a la fase del frame actual
+
+    Sin nombre de fase se usa el nombre del método.
+    """
+    def decorator(func):
+        name = phase or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self.profiler.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class ClientProfiler:
+    """Guarda los últimos frames dibujados y las últimas respuestas del servidor"""
+
+    def __init__(self, frame_window=600, rtt_window=200, slow_frame_ms=50.0):
+        self.frames = deque(maxlen=frame_window)  # (instante, total ms, {fase: ms})
+        self.frame_start = None
+        self.current = {}
+        self.slow_frame_ms = slow_frame_ms
+        self.slow_frames = 0
+
+        self.rtt_window = rtt_window
+        self.rtt = {}  # acción -> deque de ms
+        self.rtt_errors = {}
+        self.received = deque()  # (instante, bytes) del último intervalo
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()  # El RTT llega también desde el thread de actualización
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.current = {}
+
+    def add(self, phase, seconds):
+        """Suma tiempo a una fase del frame actual"""
+        self.current[phase] = self.current.get(phase, 0.0) + seconds
+
+    def end_frame(self, drawn=True):
+        """Cierra el frame; los frames que no dibujaron nada no se guardan"""
+        if self.frame_start is None:
+            return None
+        total_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_start = None
+        if not drawn:
+            return None
+        phases = {name: seconds * 1000 for name, seconds in self.current.items()}
+        self.frames.append((time.time(), total_ms, phases))
+        if total_ms > self.slow_frame_ms:
+            self.slow_frames += 1
+        return total_ms
+
+    def record_rtt(self, action, seconds, error=False):
+        with self.lock:
+            if action not in self.rtt:
+                self.rtt[action] = deque(maxlen=self.rtt_window)
+                self.rtt_errors[action] = 0
+            self.rtt[action].append(seconds * 1000)
+            if error:
+                self.rtt_errors[action] += 1
+
+    def record_bytes(self, received=0, sent=0):
+        with self.lock:
+            if received:
+                self.bytes_received += received
+                self.received.append((time.time(), received))
+            self.bytes_sent += sent
+
+    def bytes_per_second(self, window=5.0):
+        """Bytes recibidos por segundo en los últimos segundos"""
+        now = time.time()
+        with self.lock:
+            while self.received and self.received[0][0] < now - window:
+                self.received.popleft()
+            total = sum(size for _, size in self.received)
+        return total / window
+
+    def frame_histogram(self):
+        """[(etiqueta, cantidad)] de los frames guardados según FRAME_BUCKETS_MS"""
+        counts = [0] * (len(FRAME_BUCKETS_MS) + 1)
+        for _, total_ms, _ in self.frames:
+            for i, bound in enumerate(FRAME_BUCKETS_MS):
+                if total_ms <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"≤{bound:g}" for bound in FRAME_BUCKETS_MS] + [f">{FRAME_BUCKETS_MS[-1]:g}"]
+        return list(zip(labels, counts))
+
+    def summary(self):
+        """Resumen de frames, fases, RTT por acción y tráfico"""
+        frames = list(self.frames)
+        totals = sorted(total for _, total, _ in frames)
+        phase_values = {}
+        for _, _, phases in frames:
+            for name, value in phases.items():
+                phase_values.setdefault(name, []).append(value)
+
+        result = {
+            'frames': len(totals),
+            'slow_frames': self.slow_frames,
+            'frame_ms': {
+                'mean': round(sum(totals) / len(totals), 3) if totals else 0.0,
+                'p50': round(percentile(totals, 50), 3),
+                'p95': round(percentile(totals, 95), 3),
+                'p99': round(percentile(totals, 99), 3),
+                'max': round(totals[-1], 3) if totals else 0.0
+            },
+            'histogram': self.frame_histogram(),
+            'phases_ms': {},
+            'rtt_ms': {},
+            'bytes_received': self.bytes_received,
+            'bytes_sent': self.bytes_sent,
+            'bytes_per_second': round(self.bytes_per_second(), 1)
+        }
+
+        for name, values in phase_values.items():
+            values.sort()
+            # La media es por frame dibujado, aunque la fase no se ejecute en todos
+            result['phases_ms'][name] = {
+                'mean': round(sum(values) / len(totals), 3),
+                'p95': round(percentile(values, 95), 3),
+                'max': round(values[-1], 3)
+            }
+
+        with self.lock:
+            rtt = {action: sorted(values) for action, values in self.rtt.items()}
+            errors = dict(self.rtt_errors)
+        for action, values in rtt.items():
+            result['rtt_ms'][action] = {
+                'count': len(values),
+                'errors': errors.get(action, 0),
+                'mean': round(sum(values) / len(values), 3) if values else 0.0,
+                'p50': round(percentile(values, 50), 3),
+                'p95': round(percentile(values, 95), 3),
+                'max': round(values[-1], 3) if values else 0.0
+            }
+        return result
+
+    def export(self, prefix='parques_client_stats'):
+        """Escribe el resumen en JSON y los frames en CSV; devuelve las dos rutas"""
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        json_path = f"{prefix}_{stamp}.json"
+        csv_path = f"{prefix}_{stamp}.csv"
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+
+        frames = list(self.frames)
+        phase_names = sorted({name for _, _, phases in frames for name in phases})
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'frame_ms'] + phase_names)
+            for timestamp, total_ms, phases in frames:
+                writer.writerow([f"{timestamp:.3f}", f"{total_ms:.3f}"] +
+                                [f"{phases.get(name, 0.0):.3f}" for name in phase_names])
+
+        return json_path, csv_path
+
+
+class StartupProfile:
+    """Duración de cada fase del arranque del cliente, en el orden en que terminan
+
+    Las fases en segundo plano (sonidos) pueden terminar después del primer
+    frame; si el informe ya se imprimió, se imprimen al terminar.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled  # Imprimir el informe (--startup-profile)
+        self.start = time.perf_counter()
+        self.phases = []  # (fase, ms, en segundo plano)
+        self.reported = False
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        background = threading.current_thread() is not threading.main_thread()
+        with self.lock:
+            self.phases.append((name, seconds * 1000, background))
+            late = self.reported
+        if late and self.enabled:
+            print(f"⏱️ Arranque: {name} terminó en segundo plano en {seconds * 1000:.1f} ms")
+
+    def report(self, title="primer frame"):
+        """Imprime las fases y el tiempo total desde que empezó el arranque (una sola vez)"""
+        with self.lock:
+            if self.reported:
+                return
+            self.reported = True
+            phases = list(self.phases)
+        if not self.enabled:
+            return
+        total_ms = (time.perf_counter() - self.start) * 1000
+        print("⏱️ Perfil de arranque")
+        for name, ms, background in phases:
+            suffix = "  (segundo plano)" if background else ""
+            print(f"   {name:<26}{ms:>9.1f} ms{suffix}")
+        print(f"   {'total hasta ' + title:<26}{total_ms:>9.1f} ms")
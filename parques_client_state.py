@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estado del Cliente de Parqués
+Guarda el último estado recibido del servidor como un snapshot inmutable,
+lo compara con el nuevo y genera eventos tipados solo con lo que cambió
+(turno, fichas, jugadores).
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+# Eventos de cambio de estado
+GameStarted = namedtuple('GameStarted', 'turn_order')
+TurnChanged = namedtuple('TurnChanged', 'previous current')
+PlayerJoined = namedtuple('PlayerJoined', 'player_id name color')
+PlayerLeft = namedtuple('PlayerLeft', 'player_id name color')
+# Cualquier cambio de posición de una ficha: casilla, 'jail' o 'home'
+PieceMoved = namedtuple('PieceMoved', 'player_id piece_id color old_position new_position')
+# Además de PieceMoved, cuando una ficha vuelve a la cárcel desde el tablero
+PieceCaptured = namedtuple('PieceCaptured', 'player_id piece_id color position by_player_id')
+
+
+def freeze(value):
+    """Copia inmutable de un valor decodificado de JSON: dicts de solo lectura y tuplas"""
+    if isinstance(value, MappingProxyType):
+        return value  # Ya es un snapshot
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Copia modificable de un snapshot: dicts y listas normales"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def diff_states(old, new):
+    """Lista de eventos que llevan del estado old al estado new
+
+    Con old en None (primer estado recibido) los jugadores ya presentes no
+    cuentan como recién llegados; solo se informa el turno si hay partida.
+    """
+    if not new:
+        return []
+
+    events = []
+    new_players = new.get('players', {})
+
+    if old is None:
+        if new.get('game_started'):
+            events.append(GameStarted(tuple(new.get('turn_order', ()))))
+            if new.get('current_turn'):
+                events.append(TurnChanged(None, new['current_turn']))
+        return events
+
+    old_players = old.get('players', {})
+
+    for player_id, player in new_players.items():
+        if player_id not in old_players:
+            events.append(PlayerJoined(player_id, player['name'], player['color']))
+    for player_id, player in old_players.items():
+        if player_id not in new_players:
+            events.append(PlayerLeft(player_id, player['name'], player['color']))
+
+    if new.get('game_started') and not old.get('game_started'):
+        events.append(GameStarted(tuple(new.get('turn_order', ()))))
+
+    # Fichas: quién llegó a cada casilla, para atribuir las capturas
+    moves = []
+    arrivals = {}
+    for player_id, player in new_players.items():
+        old_player = old_players.get(player_id)
+        if not old_player or old_player['pieces'] == player['pieces']:
+            continue
+        for piece_id, piece in enumerate(player['pieces']):
+            if piece_id >= len(old_player['pieces']):
+                continue
+            old_position = old_player['pieces'][piece_id]['position']
+            new_position = piece['position']
+            if old_position != new_position:
+                moves.append(PieceMoved(player_id, piece_id, player['color'], old_position, new_position))
+                arrivals[new_position] = player_id
+
+    for move in moves:
+        events.append(move)
+        if move.new_position == 'jail' and isinstance(move.old_position, int):
+            events.append(PieceCaptured(move.player_id, move.piece_id, move.color, move.old_position,
+                                        arrivals.get(move.old_position)))
+
+    if old.get('current_turn') != new.get('current_turn') and new.get('current_turn'):
+        events.append(TurnChanged(old.get('current_turn'), new['current_turn']))
+
+    return events
+
+
+def is_newer(state, other):
+    """Indica si state es de una versión del servidor posterior a la de other"""
+    if not state or not other:
+        return False
+    version, other_version = state.get('version'), other.get('version')
+    return isinstance(version, int) and isinstance(other_version, int) and version > other_version
+
+
+class GameStateStore:
+    """Snapshots del juego con doble búfer entre el thread de red y el de dibujo
+
+    El thread de red congela cada estado y lo deja en pending con una sola
+    asignación (publish). El thread de dibujo adopta el último snapshot al
+    empezar cada frame (swap), así todo el frame ve el mismo estado sin
+    locks ni copias defensivas. Los oyentes se llaman desde quien aplica el
+    cambio: swap o update.
+    """
+
+    def __init__(self):
+        self.state = None    # Snapshot que ve la interfaz
+        self.pending = None  # Último snapshot publicado por el thread de red
+        self.version = 0     # Aumenta cada vez que el estado cambia
+        self.listeners = []
+
+    def subscribe(self, listener):
+        """listener(eventos, estado_anterior, estado_nuevo) se llama en cada cambio"""
+        self.listeners.append(listener)
+
+    def publish(self, new_state):
+        """Thread de red: congela el estado y lo publica para el siguiente frame"""
+        self.pending = freeze(new_state)
+
+    def swap(self):
+        """Thread de dibujo: adopta el último snapshot publicado, si hay uno nuevo
+
+        No se borra pending: si el thread de red publica otro entre la lectura
+        y este frame, se adopta en el siguiente sin perder actualizaciones.
+        """
+        pending = self.pending
+        if pending is None or pending is self.state:
+            return []
+        return self.update(pending)
+
+    def latest(self):
+        """El estado más reciente conocido, aunque aún no se haya adoptado"""
+        pending = self.pending
+        return pending if pending is not None else self.state
+
+    def update(self, new_state):
+        """Aplica un estado ya mismo y devuelve los eventos; un estado igual no genera nada"""
+        snapshot = freeze(new_state)
+        # Reemplaza la publicación pendiente salvo que el thread de red ya haya dejado una más nueva
+        if not is_newer(self.pending, snapshot):
+            self.pending = snapshot
+        old_state = self.state
+        if snapshot == old_state:
+            self.state = snapshot  # Igual que el anterior: swap ya no vuelve a compararlo
+            return []
+
+        events = diff_states(old_state, snapshot)
+        self.state = snapshot
+        self.version += 1
+        for listener in self.listeners:
+            listener(events, old_state, snapshot)
+        return events
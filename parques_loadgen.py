@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de Carga para Parqués
+Lanza jugadores simulados contra un ParquesServer real y mide throughput,
+latencias por acción (p50/p95/p99), errores y CPU del servidor. Todas las
+partidas corren a la vez en el mismo servidor, cada una en su sala, para
+medir la contención del servidor y no la de varios procesos.
+
+Uso:
+    python parques_loadgen.py --players 8 --games 2 --duration 30
+    python parques_loadgen.py --output run2.json --compare run1.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+
+from parques_client import ParquesClient
+from parques_client_profiler import percentile
+
+DEFAULT_PORT = 23500
+
+
+def run_server(conn, host, port, games):
+    """Proceso hijo: ejecuta el ParquesServer de todas las partidas hasta recibir 'stop'"""
+    # El servidor imprime cada evento del juego; no ensuciar la salida
+    sys.stdout = open(os.devnull, 'w')
+
+    from parques_server_improved import ParquesServer
+
+    # Una sala por partida además de la principal
+    server = ParquesServer(host, port, max_rooms=max(64, games + 1))
+    thread = threading.Thread(target=server.start_server)
+    thread.daemon = True
+    thread.start()
+
+    time.sleep(0.5)  # Dar tiempo a que escuche
+    conn.send('ready')
+
+    conn.recv()  # Esperar 'stop'
+    cpu = os.times()
+    server.running = False
+    conn.send({'user': cpu.user, 'system': cpu.system})
+
+
+class BotPlayer(threading.Thread):
+    """Jugador simulado que habla el protocolo real del servidor"""
+
+    def __init__(self, name, host, port, room, players_in_game, is_host, think_time, deadline, stats):
+        super().__init__()
+        self.daemon = True
+        self.name = name
+        self.room = room  # Sala de su partida en el servidor
+        self.host = host
+        self.port = port
+        self.players_in_game = players_in_game
+        self.is_host = is_host  # El anfitrión inicia la partida
+        self.think_time = think_time  # (mínimo, máximo) en segundos
+        self.deadline = deadline
+        self.stats = stats
+        # El bot usa request directamente: decide con la última respuesta, no con el almacén de estado
+        self.client = ParquesClient(host, port, timeout=10)
+        self.player_id = None
+
+    def request(self, message):
+        """Envía un mensaje y espera su respuesta completa midiendo la latencia"""
+        action = message['action']
+        start = time.perf_counter()
+        response = self.client.request(message)
+        self.stats.record(action, time.perf_counter() - start,
+                          error=response.get('message') if response.get('status') == 'error' else None)
+        if not self.client.connected:
+            raise ConnectionError(response.get('message'))
+        return response
+
+    def think(self):
+        time.sleep(random.uniform(*self.think_time))
+
+    def run(self):
+        try:
+            self.client.connect()
+            response = self.request(self.client.join_message(self.name, self.room))
+            if response.get('status') != 'success':
+                return
+            self.player_id = response['player_id']
+            self.play()
+        except Exception:
+            pass  # El error ya quedó registrado en las estadísticas
+        finally:
+            self.client.close()
+
+    def play(self):
+        started = False
+        while time.time() < self.deadline:
+            self.think()
+            response = self.request({'action': 'get_state'})
+            state = response.get('game_state') or {}
+
+            if not state.get('game_started'):
+                if self.is_host and not started and response.get('players_count', 0) >= self.players_in_game:
+                    started = self.request({'action': 'start_game'}).get('status') == 'success'
+                continue
+
+            players = state.get('players', {})
+            if any(p['finished_pieces'] >= 4 for p in players.values()):
+                return  # La partida terminó
+
+            if state.get('current_turn') == self.player_id:
+                self.take_turn(players.get(self.player_id))
+
+    def take_turn(self, player):
+        """Tira los dados y mueve una ficha mientras siga siendo su turno"""
+        while time.time() < self.deadline:
+            roll = self.request({'action': 'roll_dice'})
+            if roll.get('status') != 'success' or roll.get('turn_ended'):
+                return
+            if roll.get('can_move'):
+                movable = [i for i, piece in enumerate(player['pieces'])
+                           if piece['position'] not in ('jail', 'home')] if player else []
+                # El estado puede estar desactualizado: probar con la primera ficha que tenga sentido
+                for piece_id in movable or range(4):
+                    self.think()
+                    move = self.request({'action': 'move_piece', 'piece_id': piece_id, 'steps': roll['total']})
+                    if move.get('status') == 'success':
+                        return
+                return
+            if not roll.get('extra_turn'):
+                return
+            self.think()
+
+
+class LoadStats:
+    """Latencias y errores por acción compartidos por todos los bots"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+
+    def record(self, action, duration, error=None):
+        with self.lock:
+            self.latencies.setdefault(action, []).append(duration)
+            if error:
+                self.errors[action] = self.errors.get(action, 0) + 1
+                self.error_samples.setdefault(action, error)
+
+    def summary(self):
+        actions = {}
+        with self.lock:
+            for action, values in self.latencies.items():
+                values = sorted(values)
+                actions[action] = {
+                    'count': len(values),
+                    'errors': self.errors.get(action, 0),
+                    'mean_ms': round(sum(values) / len(values) * 1000, 3),
+                    'p50_ms': round(percentile(values, 50) * 1000, 3),
+                    'p95_ms': round(percentile(values, 95) * 1000, 3),
+                    'p99_ms': round(percentile(values, 99) * 1000, 3),
+                    'max_ms': round(values[-1] * 1000, 3)
+                }
+        return actions
+
+
+def run_load(players, games, duration, think_min, think_max, host, port, external):
+    """Ejecuta una prueba de carga y devuelve los resultados"""
+    if players < 2 * games or players > 4 * games:
+        raise ValueError("Cada partida necesita entre 2 y 4 jugadores")
+
+    server_process = None
+    parent_conn = None
+    if not external:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        server_process = multiprocessing.Process(target=run_server, args=(child_conn, host, port, games))
+        server_process.start()
+        parent_conn.recv()  # 'ready'
+
+    stats = LoadStats()
+    start = time.time()
+    deadline = start + duration
+
+    # Repartir los jugadores entre las partidas: una sala por partida en el mismo servidor
+    bots = []
+    per_game = [players // games + (1 if i < players % games else 0) for i in range(games)]
+    for game_index, count in enumerate(per_game):
+        for i in range(count):
+            bots.append(BotPlayer(f"Bot{game_index}_{i}", host, port, f"partida-{game_index}", count,
+                                  i == 0, (think_min, think_max), deadline, stats))
+
+    for bot in bots:
+        bot.start()
+        time.sleep(0.01)  # Que el anfitrión se una primero
+    for bot in bots:
+        bot.join(duration + 15)
+    elapsed = time.time() - start
+
+    server_cpu = None
+    if server_process:
+        parent_conn.send('stop')
+        server_cpu = parent_conn.recv()
+        server_process.join(5)
+
+    actions = stats.summary()
+    total_requests = sum(a['count'] for a in actions.values())
+    total_errors = sum(a['errors'] for a in actions.values())
+    results = {
+        'config': {
+            'players': players, 'games': games, 'duration_s': duration,
+            'think_ms': [think_min * 1000, think_max * 1000], 'external_server': external
+        },
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'elapsed_s': round(elapsed, 3),
+        'requests': total_requests,
+        'errors': total_errors,
+        'throughput_rps': round(total_requests / elapsed, 2) if elapsed else 0,
+        'error_samples': stats.error_samples,
+        'actions': actions
+    }
+    if server_cpu:
+        cpu_seconds = server_cpu['user'] + server_cpu['system']
+        results['server_cpu_s'] = round(cpu_seconds, 3)
+        results['server_cpu_percent'] = round(cpu_seconds / elapsed * 100, 1)
+    return results
+
+
+def print_results(results, previous=None):
+    """Muestra los resultados y, si hay una ejecución previa, la diferencia"""
+    print("=" * 60)
+    print(f"Peticiones: {results['requests']}  Errores: {results['errors']}  "
+          f"Throughput: {results['throughput_rps']} req/s")
+    if 'server_cpu_s' in results:
+        print(f"CPU del servidor: {results['server_cpu_s']} s ({results['server_cpu_percent']}%)")
+    print(f"{'acción':<12}{'n':>8}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for action, data in sorted(results['actions'].items()):
+        line = (f"{action:<12}{data['count']:>8}{data['errors']:>6}"
+                f"{data['p50_ms']:>10.2f}{data['p95_ms']:>10.2f}{data['p99_ms']:>10.2f}")
+        if previous and action in previous.get('actions', {}):
+            old = previous['actions'][action]['p95_ms']
+            if old:
+                line += f"   p95 {((data['p95_ms'] - old) / old) * 100:+.1f}%"
+        print(line)
+    if previous:
+        old = previous.get('throughput_rps') or 0
+        if old:
+            print(f"Throughput respecto a la ejecución anterior: "
+                  f"{((results['throughput_rps'] - old) / old) * 100:+.1f}%")
+    for action, sample in results['error_samples'].items():
+        print(f"Ejemplo de error en {action}: {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para el servidor de Parqués")
+    parser.add_argument('--players', type=int, default=8, help="Jugadores simulados en total")
+    parser.add_argument('--games', type=int, default=2, help="Partidas simultáneas (una sala cada una)")
+    parser.add_argument('--duration', type=float, default=30.0, help="Duración en segundos")
+    parser.add_argument('--think-min', type=float, default=50.0, help="Tiempo de pensar mínimo (ms)")
+    parser.add_argument('--think-max', type=float, default=200.0, help="Tiempo de pensar máximo (ms)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Puerto del servidor")
+    parser.add_argument('--external', action='store_true',
+                        help="Usar un servidor ya iniciado en lugar de lanzarlo (sin medir su CPU)")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla para los tiempos de pensar")
+    parser.add_argument('--output', default='loadgen_results.json', help="Archivo JSON de resultados")
+    parser.add_argument('--compare', default=None, help="Resultados previos con los que comparar")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    print("🎲 Generador de Carga para Parqués")
+    print(f"{args.players} jugadores en {args.games} partidas durante {args.duration:.0f} s...")
+
+    results = run_load(args.players, args.games, args.duration,
+                       args.think_min / 1000.0, args.think_max / 1000.0,
+                       args.host, args.port, args.external)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+
+    print_results(results, previous)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
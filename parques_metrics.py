@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas del Servidor de Parqués
+Contadores, gauges e histogramas expuestos en formato de texto de Prometheus
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Buckets por defecto para latencias (segundos)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def format_labels(labelnames, labelvalues, extra=None):
+    """Formatea las etiquetas de una muestra: {a="1",b="2"}"""
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    parts = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def format_value(value):
+    """Formatea un valor numérico como lo espera Prometheus"""
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base para las métricas con etiquetas"""
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+        if not self.labelnames:
+            self.children[()] = self.new_child()
+
+    def new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Devuelve la serie para los valores de etiqueta dados (se crea al vuelo)"""
+        child = self.children.get(values)
+        if child is None:
+            with self.lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = self.new_child()
+                    self.children[values] = child
+        return child
+
+    def remove(self, *values):
+        """Elimina una serie (por ejemplo, de una conexión cerrada)"""
+        with self.lock:
+            self.children.pop(values, None)
+
+    def samples(self):
+        """Genera tuplas (sufijo, etiquetas, valor)"""
+        with self.lock:
+            items = list(self.children.items())
+        for labelvalues, child in items:
+            for suffix, extra, value in child.samples():
+                yield suffix, format_labels(self.labelnames, labelvalues, extra), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {format_value(value)}")
+        return lines
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def samples(self):
+        return [('', None, self.value)]
+
+
+class Counter(Metric):
+    """Contador; la familia y sus muestras se llaman <nombre>_total"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        if not name.endswith('_total'):
+            name += '_total'
+        super().__init__(name, documentation, labelnames)
+
+    def new_child(self):
+        return CounterChild()
+
+    def inc(self, amount=1):
+        self.children[()].inc(amount)
+
+
+class GaugeChild:
+    def __init__(self):
+        self.value = 0
+        self.function = None
+        self.lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Calcula el valor solo al momento de exportar (sin coste en el camino caliente)"""
+        self.function = function
+
+    def samples(self):
+        value = self.function() if self.function else self.value
+        return [('', None, value)]
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def new_child(self):
+        return GaugeChild()
+
+    def set(self, value):
+        self.children[()].set(value)
+
+    def inc(self, amount=1):
+        self.children[()].inc(amount)
+
+    def dec(self, amount=1):
+        self.children[()].dec(amount)
+
+    def set_function(self, function):
+        self.children[()].set_function(function)
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self):
+        with self.lock:
+            counts = list(self.counts)
+            total_sum = self.sum
+        result = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            result.append(('_bucket', ('le', format_value(float(bound))), cumulative))
+        cumulative += counts[-1]
+        result.append(('_bucket', ('le', '+Inf'), cumulative))
+        result.append(('_sum', None, total_sum))
+        result.append(('_count', None, cumulative))
+        return result
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.children[()].observe(value)
+
+
+class MetricsRegistry:
+    """Registro de métricas y colectores que se exportan juntos"""
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []  # Funciones que devuelven líneas ya formateadas
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """Añade una función que genera métricas al momento de exportar"""
+        with self.lock:
+            self.collectors.append(collector)
+
+    def render(self):
+        """Genera el texto completo en formato de exposición de Prometheus"""
+        with self.lock:
+            metrics = list(self.metrics)
+            collectors = list(self.collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f"# Error en colector: {e}")
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(registry, host='127.0.0.1', port=9100, actions=None):
+    """Inicia un servidor HTTP local que expone /metrics en un thread daemon
+
+    actions permite añadir rutas de control, {ruta: función} donde la
+    función devuelve el texto de la respuesta. Solo responden a POST.
+    """
+    actions = actions or {}
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path in ('/', '/metrics'):
+                self.send_text(registry.render())
+            elif path in actions:
+                # Las acciones cambian el estado: un GET (prefetch, scraper) no debe dispararlas
+                self.send_response(405)
+                self.send_header('Allow', 'POST')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            path = self.path.split('?')[0]
+            if path in actions:
+                self.send_text(str(actions[path]()) + "\n")
+            else:
+                self.send_error(404)
+
+        def send_text(self, body):
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # No llenar la consola con cada scrape
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    print(f"Métricas disponibles en http://{host}:{httpd.server_address[1]}/metrics")
+    return httpd
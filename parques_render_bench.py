@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Renderizado del Cliente de Parqués
+Dibuja las pantallas de ParquesClientGUI sin ventana (SDL_VIDEODRIVER=dummy)
+con estados de juego sintéticos o grabados, y compara la media y el p99 de
+cada pantalla y de cada función de dibujado contra una línea base.
+
+La línea base depende de la máquina y no está en el repositorio: se crea
+con --save en la misma máquina, antes de los cambios que se quieren medir.
+Sin ella la comparación termina con error.
+
+Uso:
+    python parques_render_bench.py --save             # Guardar los resultados como línea base
+    python parques_render_bench.py                    # Ejecutar y comparar con la línea base
+    python parques_render_bench.py --states estados.json --frames 500
+"""
+
+import os
+
+# Sin ventana ni audio: debe fijarse antes de importar pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import contextlib
+import copy
+import json
+import sys
+
+from parques_bench import build_midgame, load_baseline, machine_description
+from parques_client_profiler import ClientProfiler, percentile
+
+DEFAULT_BASELINE = 'render_baseline.json'
+DEFAULT_SEED = 1234
+
+
+def synthetic_states(seed, count=20):
+    """Secuencia de estados a mitad de juego en la que una ficha avanza en cada paso"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        game = build_midgame(seed)
+    base = json.loads(json.dumps(game.get_game_state()))
+
+    states = []
+    mover = base['turn_order'][0]
+    start = base['players'][mover]['pieces'][2]['position']
+    for step in range(count):
+        state = copy.deepcopy(base)
+        state['players'][mover]['pieces'][2]['position'] = (start + step) % 68
+        state['current_turn'] = base['turn_order'][step % len(base['turn_order'])]
+        states.append(state)
+    return states
+
+
+def load_states(path):
+    """Lee estados grabados: una lista de game_state o de respuestas de get_state"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [data]
+    return [item.get('game_state', item) for item in data]
+
+
+def lobby_state(state):
+    """El mismo estado antes de empezar la partida"""
+    state = copy.deepcopy(state)
+    state['game_started'] = False
+    return state
+
+
+def prepare(client, scenario, states):
+    """Deja el cliente listo para un escenario y devuelve la función que dibuja un frame"""
+    first = states[0]
+    client.player_id = first['turn_order'][0]
+    client.player_name = first['players'][client.player_id]['name']
+    client.player_color = first['players'][client.player_id]['color']
+    client.show_help_screen = False
+    client.dice_rolling = False
+    client.selected_piece = None
+
+    if scenario == 'connect':
+        client.current_screen = 'connect'
+        client.name_input = 'Jugador1'
+        client.input_active = True
+        return client.draw_connect_screen
+
+    if scenario == 'lobby':
+        client.current_screen = 'lobby'
+        client.game_state = lobby_state(first)
+        client.can_start_game = True
+        return client.draw_lobby_screen
+
+    client.current_screen = 'game'
+    client.game_state = first
+    client.my_turn = True
+    for i in range(8):
+        client.add_log(f"Jugador{i % 4 + 1} tiró {i % 6 + 1} y {(i * 5) % 6 + 1}")
+
+    if scenario == 'game_moving':
+        # Un estado nuevo en cada frame: invalida la capa de fichas
+        frame = [0]
+
+        def draw():
+            frame[0] += 1
+            client.game_state = states[frame[0] % len(states)]
+            client.draw_game_screen()
+        return draw
+
+    if scenario == 'game_dice':
+        import pygame
+
+        def draw():
+            # Reiniciar la tirada para que los dados estén siempre girando
+            if not client.dice_rolling:
+                client.dice_rolling = True
+                client.dice_animation_start = pygame.time.get_ticks()
+            client.draw_game_screen()
+        return draw
+
+    if scenario == 'game_help':
+        client.show_help_screen = True
+
+    client.selected_piece = 2 if scenario == 'game_static' else None
+    return client.draw_game_screen
+
+
+SCENARIOS = ('connect', 'lobby', 'game_static', 'game_moving', 'game_dice', 'game_help')
+
+
+def run_scenario(client, scenario, states, frames, warmup):
+    """Dibuja los frames de un escenario y devuelve sus tiempos por frame y por fase"""
+    import pygame
+
+    draw = prepare(client, scenario, states)
+    # Un perfilador nuevo que guarde todos los frames del escenario
+    profiler = client.profiler = ClientProfiler(frame_window=frames)
+
+    for i in range(warmup + frames):
+        if i == warmup:
+            profiler.frames.clear()  # Los primeros frames llenan las cachés
+        profiler.begin_frame()
+        draw()
+        pygame.display.flip()
+        profiler.end_frame()
+
+    totals = sorted(total for _, total, _ in profiler.frames)
+    phases = {}
+    for _, _, frame_phases in profiler.frames:
+        for name, value in frame_phases.items():
+            phases.setdefault(name, []).append(value)
+
+    result = {'frame': summarize(totals, frames), 'draw': {}}
+    for name, values in sorted(phases.items()):
+        result['draw'][name] = summarize(sorted(values), frames)
+    return result
+
+
+def summarize(sorted_values, frames):
+    """Media por frame y p99 en milisegundos"""
+    return {
+        'mean_ms': round(sum(sorted_values) / frames, 4) if frames else 0.0,
+        'p99_ms': round(percentile(sorted_values, 99), 4)
+    }
+
+
+# Diferencias menores que esto (ms) no cuentan como regresión: son ruido del reloj
+MIN_DELTA_MS = 0.05
+
+
+def compare(label, current, baseline, thresholds):
+    """Formatea una fila y dice si la media o el p99 empeoran más que su umbral"""
+    line = f"{label:<34}{current['mean_ms']:>9.3f}{current['p99_ms']:>9.3f}"
+    regressed = False
+    if baseline:
+        changes = []
+        for key, threshold in zip(('mean_ms', 'p99_ms'), thresholds):
+            change = (current[key] - baseline[key]) / baseline[key] if baseline.get(key) else 0.0
+            changes.append(change)
+            if change > threshold and current[key] - baseline[key] > MIN_DELTA_MS:
+                regressed = True
+        line += f"{changes[0] * 100:>+9.1f}%{changes[1] * 100:>+9.1f}%"
+        if regressed:
+            line += "  ⚠️ REGRESIÓN"
+    return line, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de renderizado del cliente gráfico de Parqués")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Archivo de línea base")
+    parser.add_argument('--save', action='store_true', help="Guardar los resultados como línea base")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Regresión tolerada en la media respecto a la línea base (0.25 = 25%%)")
+    parser.add_argument('--p99-threshold', type=float, default=1.0,
+                        help="Regresión tolerada en el p99, más ruidoso que la media (1.0 = 100%%)")
+    parser.add_argument('--frames', type=int, default=300, help="Frames medidos por escenario")
+    parser.add_argument('--warmup', type=int, default=10, help="Frames previos sin medir")
+    parser.add_argument('--states', default=None,
+                        help="JSON con estados grabados (lista de game_state o respuestas de get_state)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Semilla de los estados sintéticos")
+    parser.add_argument('--filter', default=None, help="Ejecutar solo los escenarios que contengan este texto")
+    parser.add_argument('--draw', action='store_true', help="Mostrar también cada función de dibujado")
+    args = parser.parse_args()
+
+    states = load_states(args.states) if args.states else synthetic_states(args.seed)
+
+    baseline = {}
+    if not args.save:
+        baseline = load_baseline(args.baseline)
+
+    # El cliente imprime al cargar sonidos y al añadir mensajes; no medir la consola
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from parques_client_gui import ParquesClientGUI
+        client = ParquesClientGUI()
+        client.sound_thread.join()  # Los sonidos se cargan en segundo plano
+
+    results = {}
+    regressions = []
+    print(f"{'escenario / función':<34}{'media ms':>9}{'p99 ms':>9}{'media':>10}{'p99':>10}")
+
+    for scenario in SCENARIOS:
+        if args.filter and args.filter not in scenario:
+            continue
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = run_scenario(client, scenario, states, args.frames, args.warmup)
+        results[scenario] = result
+
+        base = baseline.get(scenario, {})
+        thresholds = (args.threshold, args.p99_threshold)
+        line, regressed = compare(scenario, result['frame'], base.get('frame'), thresholds)
+        print(line)
+        if regressed:
+            regressions.append(scenario)
+
+        # Las funciones de dibujado solo se comparan si se piden con --draw
+        if not args.draw:
+            continue
+        for name, data in result['draw'].items():
+            line, regressed = compare(f"  {name}", data, base.get('draw', {}).get(name), thresholds)
+            print(line)
+            if regressed:
+                regressions.append(f"{scenario}/{name}")
+
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine_description(), 'seed': args.seed, 'frames': args.frames, 'python': sys.version.split()[0],
+                       'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.baseline}")
+
+    if regressions:
+        print(f"❌ Regresiones: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,60 @@ Sistemas Distribuidos - Proyecto Final
 """
 
 import socket
+import select
 import threading
 import json
+import copy
+import queue
 import random
+import secrets
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
+from parques_metrics import MetricsRegistry, start_metrics_server
+from parques_trace import Tracer, SamplingProfiler, NULL_TRACE, install_signal_toggles
+
+
+def diff_state(old, new, path=()):
+    """Cambios que llevan de old a new: ['set', ruta, valor] o ['del', ruta]
+
+    Las listas de diccionarios del mismo largo (las fichas) se comparan
+    elemento a elemento; cualquier otro valor distinto se reemplaza entero.
+    Las partes compartidas entre snapshots se saltan sin compararlas, y las
+    claves de las rutas van en texto, como quedan en JSON.
+    """
+    if old is new:
+        return []
+    
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in old:
+            if key not in new:
+                changes.append(['del', list(path) + [str(key)]])
+        for key, value in new.items():
+            if key not in old:
+                changes.append(['set', list(path) + [str(key)], value])
+            elif old[key] is not value and old[key] != value:
+                changes.extend(diff_state(old[key], value, path + (str(key),)))
+        return changes
+    
+    if (isinstance(old, list) and isinstance(new, list) and len(old) == len(new)
+            and all(isinstance(item, dict) for item in new)):
+        changes = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            if old_item != new_item:
+                changes.extend(diff_state(old_item, new_item, path + (index,)))
+        return changes
+    
+    return [['set', list(path), new]]
+
+
 class ParquesGame:
+    # Versiones cuyos cambios se guardan para reanudar sesiones sin el estado completo
+    JOURNAL_SIZE = 256
+    
     def __init__(self):
         self.players = {}  # {player_id: {name, color, pieces, position}}
         self.board = self.init_board()
@@ -26,6 +73,15 @@ class ParquesGame:
         self.last_activity = time.time()
         self.game_log = []
         
+        # Versión del estado, su snapshot inmutable y los cambios de las últimas versiones
+        self.version = 0
+        self.journal = deque(maxlen=self.JOURNAL_SIZE)  # [(versión, cambios)]
+        self.committed_state = None  # Snapshot sin la clave 'version'
+        self.snapshot = None
+        self.board_source = None
+        self.board_snapshot = None
+        self.commit()
+        
     def init_board(self):
         """Inicializa el tablero con 96 casillas"""
         board = {}
@@ -251,169 +307,459 @@ class ParquesGame:
         print(log_entry)
     
     def get_game_state(self):
-        """Obtiene el estado actual del juego"""
-        return {
-            'players': self.players,
+        """Obtiene el último estado publicado como snapshot inmutable
+        
+        Es solo lectura: no copia ni compara nada. Cada acción que cambia el
+        juego lo publica con commit al terminar. El snapshot no se modifica
+        nunca después de publicarse: se puede serializar o enviar fuera del
+        actor mientras el juego sigue cambiando.
+        """
+        return self.snapshot
+    
+    def commit(self):
+        """Publica un snapshot nuevo si el estado cambió desde el último (copy-on-write)
+        
+        Los jugadores, el tablero y las listas que no cambiaron se comparten
+        con el snapshot anterior; solo se copia lo que cambió. Cada snapshot
+        nuevo cierra una versión y guarda sus cambios en el diario.
+        """
+        previous = self.committed_state or {}
+        
+        def reuse(key, live, build):
+            old = previous.get(key)
+            return old if old is not None and old == live else build(live)
+        
+        # El tablero no cambia durante la partida: solo se copia si se reemplaza
+        if self.board is not self.board_source:
+            self.board_source = self.board
+            self.board_snapshot = {square: dict(data) for square, data in self.board.items()}
+        
+        old_players = previous.get('players', {})
+        players = {}
+        for player_id, player in self.players.items():
+            old = old_players.get(player_id)
+            players[player_id] = old if old is not None and old == player else copy.deepcopy(player)
+        # Si ningún jugador cambió se comparte también el diccionario
+        if (old_players and players.keys() == old_players.keys()
+                and all(players[player_id] is old_players[player_id] for player_id in players)):
+            players = old_players
+        
+        state = {
+            'players': players,
             'current_turn': self.current_turn,
             'game_started': self.game_started,
-            'turn_order': self.turn_order,
+            'turn_order': reuse('turn_order', self.turn_order, list),
             'dice_attempts': self.dice_attempts,
-            'board': self.board,
-            'game_log': self.game_log[-10:]  # Últimos 10 mensajes
+            'board': self.board_snapshot,
+            'game_log': reuse('game_log', self.game_log[-10:], list)  # Últimos 10 mensajes
         }
+        
+        if self.committed_state is None:
+            self.committed_state = state
+            self.snapshot = dict(state, version=self.version)
+            return self.version
+        
+        changes = diff_state(self.committed_state, state)
+        if changes:
+            self.version += 1
+            self.journal.append((self.version, changes))
+            self.committed_state = state
+            self.snapshot = dict(state, version=self.version)
+        return self.version
+    
+    def changes_since(self, version):
+        """Cambios de las versiones posteriores a version, o None si ya no están en el diario"""
+        if version == self.version:
+            return []
+        if version > self.version or not self.journal or self.journal[0][0] > version + 1:
+            return None
+        return [{'version': v, 'changes': changes} for v, changes in self.journal if v > version]
 
-class ParquesServer:
-    def __init__(self, host='0.0.0.0', port=12345):
-        self.host = host
-        self.port = port
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.clients = {}
-        self.game = ParquesGame()
+class SlowConsumerError(Exception):
+    """El cliente no consume lo que se le envía y debe desconectarse"""
+
+
+class OutboundBuffer:
+    """Buffer de salida de una conexión con límite de bytes
+
+    Todo lo que se encola son respuestas a peticiones: el cliente espera
+    exactamente una por petición, así que nunca se descartan ni se juntan.
+    Si no caben en el límite, o el cliente pasa más de stall_timeout
+    segundos sin leer nada, se le desconecta.
+    """
+
+    def __init__(self, max_bytes=256 * 1024, stall_timeout=10.0):
+        self.max_bytes = max_bytes
+        self.stall_timeout = stall_timeout
+        self.frames = deque()  # Respuestas pendientes de empezar a enviar
+        self.pending_bytes = 0
+        self.current = None  # memoryview del frame a medio enviar
+        self.stalled_since = None
+        self.bytes_sent = 0
+
+    def has_pending(self):
+        """Indica si quedan bytes por enviar"""
+        return self.current is not None or bool(self.frames)
+
+    def enqueue(self, data):
+        """Encola una respuesta respetando el límite de bytes pendientes"""
+        if self.pending_bytes + len(data) > self.max_bytes:
+            raise SlowConsumerError(
+                f"Buffer de salida excedido ({self.pending_bytes + len(data)} > {self.max_bytes} bytes)")
+        self.frames.append(data)
+        self.pending_bytes += len(data)
+
+    def flush(self, sock, timeout=1.0):
+        """Envía lo pendiente manejando escrituras parciales
+
+        Devuelve True si el buffer quedó vacío y False si el socket no
+        admitió más datos dentro del tiempo indicado.
+        """
+        deadline = time.time() + timeout
+
+        while self.has_pending():
+            if self.current is None:
+                data = self.frames.popleft()
+                self.pending_bytes -= len(data)
+                self.current = memoryview(data)
+
+            remaining = max(0.0, deadline - time.time())
+            _, writable, _ = select.select([], [sock], [], remaining)
+            if not writable:
+                self._check_stall()
+                return False
+
+            try:
+                sent = sock.send(self.current)
+            except (BlockingIOError, socket.timeout):
+                self._check_stall()
+                return False
+
+            self.current = self.current[sent:] if sent < len(self.current) else None
+            self.stalled_since = None
+            self.bytes_sent += sent
+
+        return True
+
+    def _check_stall(self):
+        """Registra el bloqueo y desconecta si dura más de stall_timeout"""
+        now = time.time()
+        if self.stalled_since is None:
+            self.stalled_since = now
+        elif now - self.stalled_since > self.stall_timeout:
+            raise SlowConsumerError(
+                f"Cliente bloqueado durante más de {self.stall_timeout} segundos")
+
+
+class OutboundStats:
+    """Contadores compartidos del tráfico de salida"""
+
+    def __init__(self):
         self.lock = threading.Lock()
-        self.running = True
-        self.last_broadcast = None  # Almacena el último mensaje de broadcast
+        self.counters = {
+            'slow_disconnects': 0
+        }
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters)
+
+
+class PlayerSession:
+    """Asiento de un jugador: sobrevive a su conexión durante el periodo de gracia"""
     
-    def start_server(self):
-        """Inicia el servidor"""
-        try:
-            # Intentar varias veces en caso de error "Address already in use"
-            max_attempts = 5
-            for attempt in range(max_attempts):
-                try:
-                    self.socket.bind((self.host, self.port))
-                    break  # Si tiene éxito, salir del bucle
-                except OSError as e:
-                    if e.errno == 98 and attempt < max_attempts - 1:  # Address already in use
-                        print(f"Puerto {self.port} ocupado, esperando 2 segundos e intentando de nuevo...")
-                        self.socket.close()
-                        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                        time.sleep(2)
-                    else:
-                        raise  # Re-lanzar la excepción si es otro error o último intento
-            
-            self.socket.listen(4)
-            print(f"Servidor Parqués iniciado en {self.host}:{self.port}")
-            print("Esperando jugadores...")
-            
-            # Iniciar thread para verificar inactividad
-            inactive_checker = threading.Thread(target=self.check_inactive_players)
-            inactive_checker.daemon = True
-            inactive_checker.start()
-            
-            while self.running:
-                try:
-                    self.socket.settimeout(1.0)  # Timeout para poder detener el servidor
-                    client_socket, address = self.socket.accept()
-                    print(f"Cliente conectado desde {address}")
-                    
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    print(f"Error aceptando conexión: {e}")
-                
-        except KeyboardInterrupt:
-            print("\nDeteniendo servidor...")
-        except Exception as e:
-            print(f"Error en el servidor: {e}")
-        finally:
-            self.stop_server()
+    def __init__(self, token, player_id):
+        self.token = token
+        self.player_id = player_id
+        self.connection_id = player_id  # Conexión que ocupa el asiento (ip:puerto)
+        self.detached_at = None  # Momento en que se cayó esa conexión
+
+
+class ClientConnection:
+    """Datos de una conexión activa"""
+
+    def __init__(self, address, outbound):
+        self.address = address
+        self.outbound = outbound
+        self.bytes_received = 0
+        self.connected_at = time.time()
+
+
+class ConnectionPool:
+    """Pool acotado de threads para atender conexiones
     
-    def stop_server(self):
-        """Detiene el servidor"""
-        self.running = False
-        self.socket.close()
-        print("Servidor detenido")
+    Cada conexión ocupa un thread mientras dura; al terminar, el thread espera
+    la siguiente en vez de morir (y se retira tras idle_timeout sin trabajo).
+    Con todos ocupados y max_workers ya creados, submit no encola: devuelve
+    False para que la conexión se rechace al momento y no quede colgada.
+    """
     
-    def check_inactive_players(self):
-        """Verifica y desconecta jugadores inactivos"""
-        while self.running:
+    def __init__(self, max_workers, idle_timeout=60.0, name='conexion'):
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self.tasks = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.workers = 0  # Threads vivos
+        self.idle = 0  # Threads esperando una conexión (sin tarea ya asignada)
+    
+    @property
+    def busy(self):
+        return self.workers - self.idle
+    
+    def submit(self, function, *args):
+        """Asigna la tarea a un thread libre o a uno nuevo; False si el pool está lleno"""
+        with self.lock:
+            if self.idle > 0:
+                self.idle -= 1
+                self.tasks.put((function, args))
+                return True
+            if self.workers >= self.max_workers:
+                return False
+            self.workers += 1
+            number = self.workers
+        worker = threading.Thread(target=self.work, args=((function, args),),
+                                  name=f"{self.name}-{number}")
+        worker.daemon = True
+        worker.start()
+        return True
+    
+    def work(self, task):
+        while task is not None:
+            function, args = task
             try:
-                time.sleep(30)  # Verificar cada 30 segundos
-                
-                with self.lock:
-                    current_time = time.time()
-                    
-                    # Si el juego está iniciado y no ha habido actividad por 5 minutos
-                    if self.game.game_started and (current_time - self.game.last_activity) > 300:
-                        # Si es el turno de un jugador por más de 2 minutos, pasar al siguiente
-                        if self.game.current_turn:
-                            self.game.add_log(f"Tiempo de inactividad excedido, pasando turno")
-                            self.game.next_turn()
+                function(*args)
             except Exception as e:
-                print(f"Error verificando inactividad: {e}")
+                print(f"Error en el pool de conexiones: {e}")
+            task = self.next_task()
     
-    def handle_client(self, client_socket, address):
-        """Maneja las conexiones de los clientes"""
-        player_id = f"{address[0]}:{address[1]}"
+    def next_task(self):
+        """La siguiente tarea, o None si no llega ninguna a tiempo (el thread se retira)"""
+        with self.lock:
+            self.idle += 1
+        try:
+            return self.tasks.get(timeout=self.idle_timeout)
+        except queue.Empty:
+            pass
+        # Una tarea pudo llegar justo al vencer la espera: ya contaba con este thread
+        with self.lock:
+            try:
+                return self.tasks.get_nowait()
+            except queue.Empty:
+                self.idle -= 1
+                self.workers -= 1
+                return None
+
+
+class RoomClosedError(Exception):
+    """La sala se retiró y ya no acepta comandos"""
+
+
+class RoomCommand:
+    """Un comando que esperó en el buzón de una sala; su resultado llega por future"""
+    __slots__ = ('label', 'function', 'args', 'future', 'posted', 'started', 'finished')
+    
+    def __init__(self, label, function, args):
+        self.label = label  # Acción del mensaje o comando interno, para las métricas
+        self.function = function
+        self.args = args
+        self.future = Future()
+        self.posted = time.perf_counter()
+        self.started = None
+        self.finished = None
+
+
+class GameRoom:
+    """Sala de juego como actor: un solo consumidor a la vez es dueño de su ParquesGame
+    
+    Los threads de las conexiones no tocan el juego: le piden a la sala que
+    ejecute un comando (call). Los comandos se ejecutan de uno en uno y en
+    orden de llegada, así que el juego no necesita lock. Si la sala está
+    libre, el thread que llama ejecuta el comando directamente, sin buzón ni
+    future; si está ocupada, el comando espera en el buzón y la respuesta
+    llega por su future. El buzón se vacía en el pool de trabajadores
+    compartido por las salas, por tandas, para que una sala muy activa no
+    acapare un trabajador.
+    """
+    # Acciones que pueden cambiar el estado: al terminar cierran una versión
+    MUTATING_ACTIONS = ('join', 'start_game', 'roll_dice', 'move_piece', 'chat')
+    # Acciones cuya respuesta exitosa lleva el estado (el de después de la petición)
+    STATE_ACTIONS = ('start_game', 'move_piece', 'chat')
+    BATCH_SIZE = 32  # Comandos por turno de la sala en un trabajador
+    
+    def __init__(self, name, workers, session_rooms):
+        self.name = name
+        self.workers = workers  # ThreadPoolExecutor compartido
+        self.session_rooms = session_rooms  # {token: sala} del servidor, para enrutar 'resume'
+        self.game = ParquesGame()
+        self.clients = {}
+        self.sessions = {}  # {token: PlayerSession}
+        self.player_sessions = {}  # {player_id: PlayerSession}
+        self.broadcast_pending = False  # El siguiente get_state se responde como 'update'
+        self.encoded_snapshot = None  # (snapshot, JSON) del último estado serializado
         
+        self.mailbox = deque()  # RoomCommand pendientes
+        self.mailbox_lock = threading.Lock()  # Protege solo el buzón, nunca el juego
+        self.scheduled = False  # Hay un consumidor ejecutando (o a punto de ejecutar) comandos
+        self.closed = False  # Sala retirada: ya no acepta comandos
+        # observer(etiqueta, segundos en el buzón o None si no esperó, segundos ejecutando)
+        self.observer = None
+        self.on_empty = None  # on_empty(sala) cuando se queda sin jugadores ni asientos
+    
+    def call(self, label, function, *args, trace=NULL_TRACE):
+        """Ejecuta function(*args) como comando de la sala y devuelve su resultado
+        
+        Lanza RoomClosedError si la sala ya se retiró.
+        """
+        with self.mailbox_lock:
+            if self.closed:
+                raise RoomClosedError(self.name)
+            if self.scheduled:
+                command = RoomCommand(label, function, args)
+                self.mailbox.append(command)
+            else:
+                command = None
+                self.scheduled = True
+        
+        if command is not None:
+            # Sala ocupada: el consumidor actual lo ejecutará en su turno
+            try:
+                return command.future.result()
+            finally:
+                trace.add('mailbox', command.posted, command.started)
+                trace.add('handler', command.started, command.finished)
+        
+        # Sala libre: este thread es el consumidor mientras dura su comando
+        started = time.perf_counter()
         try:
-            while self.running:
-                try:
-                    client_socket.settimeout(1.0)  # Timeout para detectar desconexiones
-                    data = client_socket.recv(1024).decode('utf-8')
-                    if not data:
-                        break
-                    
-                    message = json.loads(data)
-                    response = self.process_message(player_id, message)
-                    
-                    client_socket.send(json.dumps(response).encode('utf-8'))
-                    
-                except socket.timeout:
-                    continue
-                except json.JSONDecodeError:
-                    error_response = {'status': 'error', 'message': 'Mensaje inválido'}
-                    client_socket.send(json.dumps(error_response).encode('utf-8'))
-                    
-        except Exception as e:
-            print(f"Error manejando cliente {address}: {e}")
+            return function(*args)
         finally:
-            # Limpiar al desconectar
-            with self.lock:
-                if player_id in self.clients:
-                    del self.clients[player_id]
-                    
-                # Eliminar jugador del juego si estaba conectado
-                if player_id in self.game.players:
-                    self.game.remove_player(player_id)
-                    
-            client_socket.close()
-            print(f"Cliente {address} desconectado")
+            finished = time.perf_counter()
+            trace.add('handler', started, finished)
+            if self.observer:
+                self.observer(label, None, finished - started)
+            self.release()
     
-    def process_message(self, player_id, message):
-        """Procesa los mensajes de los clientes"""
-        with self.lock:
-            action = message.get('action')
-            
-            if action == 'join':
-                return self.handle_join(player_id, message.get('name', 'Jugador'))
-            
-            elif action == 'start_game':
-                return self.handle_start_game()
-            
-            elif action == 'roll_dice':
-                return self.handle_roll_dice(player_id)
-            
-            elif action == 'move_piece':
-                return self.handle_move_piece(player_id, message)
-            
-            elif action == 'get_state':
-                return self.handle_get_state()
-            
-            elif action == 'chat':
-                return self.handle_chat(player_id, message.get('message', ''))
-            
-            else:
-                return {'status': 'error', 'message': 'Acción no reconocida'}
+    def release(self):
+        """El consumidor termina su turno; si llegaron comandos, la sala sigue en el pool"""
+        with self.mailbox_lock:
+            if not self.mailbox:
+                self.scheduled = False
+                return
+        try:
+            self.workers.submit(self.drain)
+        except RuntimeError:
+            self.drain()  # Pool cerrado al detener el servidor: seguir aquí
+    
+    def drain(self):
+        """Ejecuta hasta BATCH_SIZE comandos del buzón y cede el trabajador"""
+        for _ in range(self.BATCH_SIZE):
+            with self.mailbox_lock:
+                if not self.mailbox:
+                    self.scheduled = False
+                    return
+                command = self.mailbox.popleft()
+            self.execute(command)
+        self.release()
+    
+    def execute(self, command):
+        command.started = time.perf_counter()
+        try:
+            result = command.function(*command.args)
+        except Exception as e:
+            command.finished = time.perf_counter()
+            command.future.set_exception(e)
+        else:
+            command.finished = time.perf_counter()
+            command.future.set_result(result)
+        if self.observer:
+            self.observer(command.label, command.started - command.posted,
+                          command.finished - command.started)
+    
+    # Comandos (se ejecutan en el actor)
+    
+    def run_message(self, player_id, action, message):
+        """Mensaje de un cliente: al terminar una acción con cambios se publica la versión"""
+        response = self.dispatch_message(player_id, action, message)
+        if action in self.MUTATING_ACTIONS and response.get('status') == 'success':
+            # El estado se construye una vez, con la petición ya aplicada
+            self.game.commit()
+            if action in self.STATE_ACTIONS:
+                response['game_state'] = self.game.snapshot
+        return response
+    
+    def pass_idle_turn(self):
+        """Pasa el turno si la partida lleva 5 minutos sin actividad"""
+        if self.game.game_started and (time.time() - self.game.last_activity) > 300:
+            if self.game.current_turn:
+                self.game.add_log(f"Tiempo de inactividad excedido, pasando turno")
+                self.game.next_turn()
+                self.game.commit()
+    
+    def expire_sessions(self, grace):
+        """Libera los asientos cuya conexión no volvió dentro del periodo de gracia"""
+        now = time.time()
+        expired = [session for session in self.player_sessions.values()
+                   if session.detached_at is not None and now - session.detached_at > grace]
+        for session in expired:
+            print(f"Periodo de gracia de {session.player_id} vencido, liberando su asiento")
+            self.release_player(session.player_id)
+    
+    def disconnect(self, player_id, connection_id, grace):
+        """La conexión del jugador se cerró: se libera su asiento o se reserva"""
+        session = self.player_sessions.get(player_id)
+        if session is None or grace <= 0:
+            # Eliminar jugador del juego si estaba conectado
+            self.release_player(player_id)
+        elif session.connection_id == connection_id:
+            # Guardar el asiento por si vuelve
+            session.detached_at = time.time()
+            print(f"Asiento de {player_id} reservado durante {grace:g} s")
+    
+    def release_player(self, player_id):
+        """Saca al jugador del juego y olvida su sesión; una sala secundaria vacía se retira"""
+        session = self.player_sessions.pop(player_id, None)
+        if session is not None:
+            self.sessions.pop(session.token, None)
+            self.session_rooms.pop(session.token, None)
+        if player_id in self.clients:
+            del self.clients[player_id]
+        if player_id in self.game.players:
+            self.game.remove_player(player_id)
+            self.game.commit()
+        if self.on_empty and not self.game.players and not self.sessions:
+            self.on_empty(self)
     
+    def dispatch_message(self, player_id, action, message):
+        """Despacha un mensaje al manejador de su acción (en el actor de la sala)"""
+        if action == 'join':
+            return self.handle_join(player_id, message.get('name', 'Jugador'))
+        
+        elif action == 'start_game':
+            return self.handle_start_game()
+        
+        elif action == 'roll_dice':
+            return self.handle_roll_dice(player_id)
+        
+        elif action == 'move_piece':
+            return self.handle_move_piece(player_id, message)
+        
+        elif action == 'get_state':
+            return self.handle_get_state()
+        
+        elif action == 'chat':
+            return self.handle_chat(player_id, message.get('message', ''))
+        
+        elif action == 'resume':
+            return self.handle_resume(player_id, message)
+        
+        else:
+            return {'status': 'error', 'message': 'Acción no reconocida'}
+            
     def handle_join(self, player_id, name):
         """Maneja la unión de un jugador"""
         success, message = self.game.add_player(player_id, name)
@@ -424,13 +770,21 @@ class ParquesServer:
             # Verificar si se puede iniciar el juego
             can_start = self.game.can_start_game()
             
+            # Con el token se puede reanudar la partida desde otra conexión
+            session = PlayerSession(secrets.token_urlsafe(16), player_id)
+            self.sessions[session.token] = session
+            self.player_sessions[player_id] = session
+            self.session_rooms[session.token] = self.name
+            
             response = {
                 'status': 'success',
                 'message': message,
                 'player_id': player_id,
                 'color': self.game.players[player_id]['color'],
                 'players_count': len(self.game.players),
-                'can_start': can_start
+                'can_start': can_start,
+                'session_token': session.token,
+                'room': self.name
             }
             
             # Si hay 2 o más jugadores, actualizar a todos los clientes
@@ -441,35 +795,58 @@ class ParquesServer:
         
         return response
         
-    def broadcast_game_state(self):
-        """Envía el estado actual del juego a todos los clientes conectados"""
-        # Este método se llamará cuando ocurra un cambio importante, como un nuevo jugador
-        game_state = self.game.get_game_state()
+    def handle_resume(self, connection_id, message):
+        """Devuelve el asiento de una sesión a una conexión nueva
+        
+        Si el cliente indica la última versión que vio y sus cambios siguen en
+        el diario, solo se envían esos cambios; si no, el estado completo.
+        """
+        session = self.sessions.get(message.get('session_token'))
+        if session is None or session.player_id not in self.game.players:
+            return {'status': 'error', 'message': 'Sesión inválida o expirada'}
         
-        # Agregar bandera de can_start para todos los clientes
-        can_start = self.game.can_start_game()
+        session.connection_id = connection_id
+        session.detached_at = None
+        player = self.game.players[session.player_id]
+        print(f"Sesión de {player['name']} reanudada desde {connection_id}")
         
-        update_message = {
-            'status': 'update',
-            'game_state': game_state,
-            'can_start': can_start,
+        response = {
+            'status': 'success',
+            'message': f"Sesión de {player['name']} reanudada",
+            'player_id': session.player_id,
+            'name': player['name'],
+            'color': player['color'],
+            'session_token': session.token,
+            'room': self.name,
+            'version': self.game.version,
+            'can_start': self.game.can_start_game(),
             'players_count': len(self.game.players)
         }
         
-        # No enviar a través de sockets directamente, ya que no tenemos referencia a ellos aquí
-        # En su lugar, almacenar el mensaje para que los clientes lo reciban en su próxima solicitud
-        self.last_broadcast = update_message
+        version = message.get('version')
+        changes = self.game.changes_since(version) if isinstance(version, int) else None
+        if changes is None:
+            response['game_state'] = self.game.get_game_state()
+        else:
+            response['events'] = changes
+        return response
+    
+    def broadcast_game_state(self):
+        """Avisa a los clientes de un cambio importante, como un nuevo jugador
+        
+        No hay referencia a los sockets aquí: el siguiente get_state se responde
+        como 'update'. Solo se guarda el aviso y no el estado, porque quien
+        pregunte después debe recibir el estado actual y no uno anterior a
+        cambios que ya vio.
+        """
+        self.broadcast_pending = True
     
     def handle_start_game(self):
         """Maneja el inicio del juego"""
         success, message = self.game.start_game()
         
         if success:
-            return {
-                'status': 'success',
-                'message': message,
-                'game_state': self.game.get_game_state()
-            }
+            return {'status': 'success', 'message': message}
         else:
             return {'status': 'error', 'message': message}
     
@@ -539,11 +916,7 @@ class ParquesServer:
             # Verificar ganador
             winner_id, winner_name = self.game.check_winner()
             
-            response = {
-                'status': 'success',
-                'message': msg,
-                'game_state': self.game.get_game_state()
-            }
+            response = {'status': 'success', 'message': msg}
             
             if winner_id:
                 response['winner'] = {'id': winner_id, 'name': winner_name}
@@ -559,15 +932,11 @@ class ParquesServer:
     
     def handle_get_state(self):
         """Devuelve el estado actual del juego"""
-        # Si hay un mensaje de broadcast pendiente, incluirlo en la respuesta
-        if self.last_broadcast:
-            response = self.last_broadcast
-            self.last_broadcast = None  # Limpiar después de enviar
-            return response
-        
-        # De lo contrario, enviar el estado normal
+        # Con un aviso pendiente se responde como 'update', siempre con el estado actual
+        status = 'update' if self.broadcast_pending else 'success'
+        self.broadcast_pending = False
         return {
-            'status': 'success',
+            'status': status,
             'game_state': self.game.get_game_state(),
             'can_start': self.game.can_start_game(),
             'players_count': len(self.game.players)
@@ -581,12 +950,487 @@ class ParquesServer:
         player_name = self.game.players[player_id]['name']
         self.game.add_log(f"Chat - {player_name}: {message}")
         
-        return {
-            'status': 'success',
-            'message': 'Mensaje enviado',
-            'game_state': self.game.get_game_state()
-        }
+        return {'status': 'success', 'message': 'Mensaje enviado'}
+
+
+class ParquesServer:
+    # Acciones con series propias en las métricas (el resto cuenta como 'unknown')
+    METRIC_ACTIONS = ('join', 'start_game', 'roll_dice', 'move_piece', 'get_state', 'chat', 'resume')
+    # Comandos internos de las salas (no vienen de un cliente)
+    ROOM_COMMANDS = ('timeout', 'expire_sessions', 'disconnect')
+    DEFAULT_ROOM = 'principal'  # Sala de quien se une sin indicar otra
+    ROOM_NAME_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-')
 
+    def __init__(self, host='0.0.0.0', port=12345, outbound_max_bytes=256 * 1024,
+                 stall_timeout=10.0,
+                 metrics_port=None, metrics_host='127.0.0.1',
+                 trace=False, trace_threshold_ms=50.0, trace_file='parques_trace.log',
+                 session_grace=60.0, room_workers=4, max_rooms=64,
+                 backlog=128, max_connections=256, max_connections_per_ip=0):
+        self.host = host
+        self.port = port
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.running = True
+        
+        # Sesiones: el asiento se guarda session_grace segundos tras caerse la conexión
+        self.session_grace = session_grace
+        self.session_rooms = {}  # {token: sala}, para saber dónde reanudar
+        
+        # Admisión: cola de conexiones del sistema, threads de conexión y límite por IP
+        self.backlog = backlog
+        self.connection_pool = ConnectionPool(max_connections)
+        self.max_connections_per_ip = max_connections_per_ip  # 0: sin límite (bots y pruebas de carga usan una IP)
+        self.ip_connections = {}  # {ip: conexiones abiertas}
+        self.admission_lock = threading.Lock()
+        
+        # Control de clientes lentos
+        self.outbound_max_bytes = outbound_max_bytes
+        self.stall_timeout = stall_timeout
+        self.outbound_stats = OutboundStats()
+        
+        # Métricas
+        self.connections = {}  # {player_id: ClientConnection}
+        self.closed_bytes = {'in': 0, 'out': 0}  # Bytes de conexiones ya cerradas
+        self.metrics_host = metrics_host
+        self.metrics_port = metrics_port
+        self.metrics_httpd = None
+        self.setup_metrics()
+        
+        # Salas: cada una es un actor; las que tienen comandos en espera comparten el pool
+        self.room_workers = ThreadPoolExecutor(max_workers=room_workers, thread_name_prefix='sala')
+        self.max_rooms = max_rooms
+        self.rooms = {}  # {nombre: GameRoom}
+        self.rooms_lock = threading.Lock()  # Solo para crear y retirar salas
+        self.get_room(self.DEFAULT_ROOM, create=True)
+        
+        # Trazado de peticiones lentas y perfilador (se pueden activar en caliente)
+        self.tracer = Tracer(trace, trace_threshold_ms, trace_file)
+        self.profiler = SamplingProfiler()
+    
+    def setup_metrics(self):
+        """Crea las métricas del servidor"""
+        self.metrics = MetricsRegistry()
+        self.metric_requests = self.metrics.counter(
+            'parques_requests', 'Peticiones procesadas por acción y resultado', ('action', 'status'))
+        self.metric_latency = self.metrics.histogram(
+            'parques_request_duration_seconds', 'Latencia de process_message por acción', ('action',))
+        self.metric_accept_latency = self.metrics.histogram(
+            'parques_accept_latency_seconds', 'Desde accept hasta que un thread atiende la conexión')
+        self.metric_accepted = self.metrics.counter(
+            'parques_connections_accepted', 'Conexiones admitidas')
+        self.metric_rejected = self.metrics.counter(
+            'parques_connections_rejected', 'Conexiones rechazadas por motivo', ('reason',))
+        self.metric_mailbox_wait = self.metrics.histogram(
+            'parques_room_mailbox_wait_seconds', 'Tiempo en el buzón de los comandos que encontraron su sala ocupada')
+        self.metric_processing = self.metrics.histogram(
+            'parques_room_processing_seconds', 'Tiempo ejecutando un comando en su sala', ('command',))
+        self.metric_mailbox_depth = self.metrics.gauge(
+            'parques_room_mailbox_depth', 'Comandos esperando en el buzón de cada sala', ('room',))
+        
+        # Hijos precalculados para no buscar etiquetas en el camino caliente
+        self.action_metrics = {action: self.metric_latency.labels(action)
+                               for action in self.METRIC_ACTIONS + ('unknown',)}
+        self.command_metrics = {command: self.metric_processing.labels(command)
+                                for command in self.METRIC_ACTIONS + ('unknown',) + self.ROOM_COMMANDS}
+        
+        self.metrics.gauge('parques_connections_active', 'Conexiones abiertas').set_function(
+            lambda: len(self.connections))
+        self.metrics.gauge('parques_connection_workers', 'Threads del pool de conexiones').set_function(
+            lambda: self.connection_pool.workers)
+        self.metrics.gauge('parques_connection_workers_busy', 'Threads atendiendo una conexión').set_function(
+            lambda: self.connection_pool.busy)
+        self.metrics.gauge('parques_players_active', 'Jugadores en todas las salas').set_function(
+            lambda: sum(len(room.game.players) for room in list(self.rooms.values())))
+        self.metrics.gauge('parques_rooms_active', 'Salas con al menos un jugador').set_function(
+            lambda: sum(1 for room in list(self.rooms.values()) if room.game.players))
+        self.metrics.add_collector(self.collect_connection_metrics)
+    
+    def collect_connection_metrics(self):
+        """Genera las métricas de bytes y de tráfico de salida al momento de exportar"""
+        connections = list(self.connections.items())
+        lines = ['# HELP parques_connection_bytes_received Bytes recibidos por conexión activa',
+                 '# TYPE parques_connection_bytes_received gauge']
+        lines += [f'parques_connection_bytes_received{{connection="{pid}"}} {conn.bytes_received}'
+                  for pid, conn in connections]
+        lines += ['# HELP parques_connection_bytes_sent Bytes enviados por conexión activa',
+                  '# TYPE parques_connection_bytes_sent gauge']
+        lines += [f'parques_connection_bytes_sent{{connection="{pid}"}} {conn.outbound.bytes_sent}'
+                  for pid, conn in connections]
+        
+        total_in = self.closed_bytes['in'] + sum(c.bytes_received for _, c in connections)
+        total_out = self.closed_bytes['out'] + sum(c.outbound.bytes_sent for _, c in connections)
+        lines += ['# HELP parques_bytes_received_total Bytes recibidos en total',
+                  '# TYPE parques_bytes_received_total counter',
+                  f'parques_bytes_received_total {total_in}',
+                  '# HELP parques_bytes_sent_total Bytes enviados en total',
+                  '# TYPE parques_bytes_sent_total counter',
+                  f'parques_bytes_sent_total {total_out}']
+        
+        for name, value in self.outbound_stats.snapshot().items():
+            lines += [f'# HELP parques_outbound_{name}_total Tráfico de salida: {name}',
+                      f'# TYPE parques_outbound_{name}_total counter',
+                      f'parques_outbound_{name}_total {value}']
+        return lines
+    
+    def observe_command(self, label, waited, elapsed):
+        """Métricas de cada comando ejecutado por una sala (desde su actor)"""
+        if waited is not None:
+            self.metric_mailbox_wait.observe(waited)
+        self.command_metrics[label].observe(elapsed)
+    
+    @property
+    def game(self):
+        """Juego de la sala principal"""
+        return self.rooms[self.DEFAULT_ROOM].game
+    
+    @game.setter
+    def game(self, game):
+        self.rooms[self.DEFAULT_ROOM].game = game
+    
+    @property
+    def clients(self):
+        return self.rooms[self.DEFAULT_ROOM].clients
+    
+    def get_room(self, name, create=False):
+        """Sala por nombre; con create se crea si no existe y caben más (si no, None)"""
+        room = self.rooms.get(name)
+        if room is not None or not create:
+            return room
+        with self.rooms_lock:
+            room = self.rooms.get(name)
+            if room is None and len(self.rooms) < self.max_rooms:
+                room = GameRoom(name, self.room_workers, self.session_rooms)
+                room.observer = self.observe_command
+                if name != self.DEFAULT_ROOM:
+                    room.on_empty = self.retire_room
+                self.metric_mailbox_depth.labels(name).set_function(lambda: len(room.mailbox))
+                self.rooms[name] = room
+        return room
+    
+    def retire_room(self, room):
+        """Retira una sala secundaria vacía (desde su actor); sus comandos tardíos se reenvían"""
+        with self.rooms_lock:
+            with room.mailbox_lock:
+                if room.mailbox or room.game.players or room.sessions:
+                    return
+                room.closed = True
+            if self.rooms.get(room.name) is room:
+                del self.rooms[room.name]
+                self.metric_mailbox_depth.remove(room.name)
+        print(f"Sala {room.name} retirada")
+    
+    def route_message(self, action, message):
+        """Sala de un mensaje de una conexión que aún no está en ninguna
+        
+        join va a la sala indicada en 'room' (se crea al vuelo), resume a la
+        sala de su sesión y el resto a la sala principal. None si la sala no
+        es válida o ya no caben más.
+        """
+        if action == 'join':
+            name = message.get('room') or self.DEFAULT_ROOM
+            if not isinstance(name, str) or len(name) > 32 or not set(name) <= self.ROOM_NAME_CHARS:
+                return None
+            return self.get_room(name, create=True)
+        if action == 'resume':
+            token = message.get('session_token')
+            name = self.session_rooms.get(token) if isinstance(token, str) else None
+            return self.rooms.get(name) or self.rooms[self.DEFAULT_ROOM]
+        return self.rooms[self.DEFAULT_ROOM]
+    
+    def start_server(self):
+        """Inicia el servidor"""
+        try:
+            # Intentar varias veces en caso de error "Address already in use"
+            max_attempts = 5
+            for attempt in range(max_attempts):
+                try:
+                    self.socket.bind((self.host, self.port))
+                    break  # Si tiene éxito, salir del bucle
+                except OSError as e:
+                    if e.errno == 98 and attempt < max_attempts - 1:  # Address already in use
+                        print(f"Puerto {self.port} ocupado, esperando 2 segundos e intentando de nuevo...")
+                        self.socket.close()
+                        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                        time.sleep(2)
+                    else:
+                        raise  # Re-lanzar la excepción si es otro error o último intento
+            
+            self.socket.listen(self.backlog)
+            print(f"Servidor Parqués iniciado en {self.host}:{self.port}")
+            print(f"Admisión: {self.connection_pool.max_workers} conexiones, "
+                  f"{self.max_connections_per_ip or 'sin límite'} por IP, cola de {self.backlog}")
+            
+            if self.metrics_port is not None:
+                self.metrics_httpd = start_metrics_server(
+                    self.metrics, self.metrics_host, self.metrics_port,
+                    actions={'/debug/trace': self.tracer.toggle,
+                             '/debug/profile': lambda: self.profiler.toggle() or "Perfilador iniciado"})
+            
+            if install_signal_toggles(self.tracer, self.profiler):
+                print("Señales: SIGUSR1 alterna el trazado, SIGUSR2 alterna el perfilador")
+            print("Esperando jugadores...")
+            
+            # Iniciar thread para verificar inactividad
+            inactive_checker = threading.Thread(target=self.check_inactive_players)
+            inactive_checker.daemon = True
+            inactive_checker.start()
+            
+            # Thread para liberar los asientos cuya conexión no volvió
+            session_checker = threading.Thread(target=self.check_sessions)
+            session_checker.daemon = True
+            session_checker.start()
+            
+            while self.running:
+                try:
+                    self.socket.settimeout(1.0)  # Timeout para poder detener el servidor
+                    client_socket, address = self.socket.accept()
+                    self.admit(client_socket, address, time.perf_counter())
+                except socket.timeout:
+                    continue
+                except Exception as e:
+                    print(f"Error aceptando conexión: {e}")
+                
+        except KeyboardInterrupt:
+            print("\nDeteniendo servidor...")
+        except Exception as e:
+            print(f"Error en el servidor: {e}")
+        finally:
+            self.stop_server()
+    
+    def stop_server(self):
+        """Detiene el servidor"""
+        self.running = False
+        self.socket.close()
+        self.room_workers.shutdown(wait=False)
+        self.profiler.stop()
+        if self.metrics_httpd:
+            self.metrics_httpd.shutdown()
+            self.metrics_httpd.server_close()
+        print(f"Tráfico de salida: {self.outbound_stats.snapshot()}")
+        print("Servidor detenido")
+    
+    def check_inactive_players(self):
+        """Verifica y desconecta jugadores inactivos"""
+        while self.running:
+            try:
+                time.sleep(30)  # Verificar cada 30 segundos
+                
+                # Cada sala decide en su actor si pasa el turno
+                for room in list(self.rooms.values()):
+                    try:
+                        room.call('timeout', room.pass_idle_turn)
+                    except RoomClosedError:
+                        pass
+            except Exception as e:
+                print(f"Error verificando inactividad: {e}")
+    
+    def check_sessions(self):
+        """Libera los asientos cuya conexión no volvió dentro del periodo de gracia"""
+        while self.running:
+            time.sleep(1.0)
+            try:
+                for room in list(self.rooms.values()):
+                    if not room.player_sessions:
+                        continue
+                    try:
+                        room.call('expire_sessions', room.expire_sessions, self.session_grace)
+                    except RoomClosedError:
+                        pass
+            except Exception as e:
+                print(f"Error verificando sesiones: {e}")
+    
+    def admit(self, client_socket, address, accepted_at):
+        """Pasa la conexión a un thread del pool o la rechaza al momento"""
+        ip = address[0]
+        with self.admission_lock:
+            count = self.ip_connections.get(ip, 0)
+            if self.max_connections_per_ip and count >= self.max_connections_per_ip:
+                reason = 'per_ip'
+            else:
+                self.ip_connections[ip] = count + 1
+                reason = None
+        
+        if reason is None:
+            if self.connection_pool.submit(self.serve_connection, client_socket, address, accepted_at):
+                self.metric_accepted.inc()
+                print(f"Cliente conectado desde {address}")
+                return
+            self.release_ip(ip)
+            reason = 'busy'
+        self.reject(client_socket, reason)
+    
+    def reject(self, client_socket, reason):
+        """Responde "servidor ocupado" sin bloquear el acceptor y cierra la conexión"""
+        self.metric_rejected.labels(reason).inc()
+        message = ('Demasiadas conexiones desde tu dirección' if reason == 'per_ip'
+                   else 'Servidor ocupado, intenta más tarde')
+        try:
+            client_socket.setblocking(False)
+            client_socket.send(json.dumps({'status': 'error', 'message': message, 'busy': True,
+                                           'retry_after': 1.0}).encode('utf-8'))
+        except OSError:
+            pass  # El cliente ya no está o su buffer está lleno: no esperar por él
+        finally:
+            client_socket.close()
+    
+    def release_ip(self, ip):
+        with self.admission_lock:
+            count = self.ip_connections.get(ip, 0) - 1
+            if count > 0:
+                self.ip_connections[ip] = count
+            else:
+                self.ip_connections.pop(ip, None)
+    
+    def serve_connection(self, client_socket, address, accepted_at):
+        """Tarea del pool: atiende la conexión y devuelve su cupo al terminar"""
+        self.metric_accept_latency.observe(time.perf_counter() - accepted_at)
+        try:
+            self.handle_client(client_socket, address)
+        finally:
+            self.release_ip(address[0])
+    
+    def handle_client(self, client_socket, address):
+        """Maneja las conexiones de los clientes"""
+        # El jugador es la conexión, salvo que esta reanude la sesión de otra anterior
+        connection_id = f"{address[0]}:{address[1]}"
+        player_id = connection_id
+        room = None  # Sala en la que se unió o reanudó (antes, la principal)
+        outbound = OutboundBuffer(self.outbound_max_bytes, self.stall_timeout)
+        connection = ClientConnection(address, outbound)
+        self.connections[player_id] = connection
+        
+        try:
+            while self.running:
+                try:
+                    # Intentar vaciar lo que quedó pendiente de envíos anteriores
+                    if outbound.has_pending():
+                        outbound.flush(client_socket)
+                    
+                    # Esperar datos (timeout para detectar desconexiones y vaciar pendientes)
+                    readable, _, _ = select.select([client_socket], [], [], 1.0)
+                    if not readable:
+                        continue
+                    
+                    trace = self.tracer.begin(player_id)
+                    with trace.span('recv'):
+                        client_socket.settimeout(1.0)
+                        raw = client_socket.recv(1024)
+                    if not raw:
+                        break
+                    connection.bytes_received += len(raw)
+                    
+                    with trace.span('decode'):
+                        message = json.loads(raw.decode('utf-8'))
+                    trace.action = message.get('action')
+                    
+                    response = self.process_message(player_id, message, trace, room)
+                    if trace.action in ('join', 'resume') and response.get('status') == 'success':
+                        room = self.rooms.get(response.get('room'), room)
+                    elif room is not None and room.closed:
+                        room = None  # Ya se le respondió que su sala se cerró
+                    if trace.action == 'resume' and response.get('status') == 'success':
+                        if self.connections.get(player_id) is connection:
+                            del self.connections[player_id]
+                        player_id = response['player_id']
+                        self.connections[player_id] = connection
+                    
+                    with trace.span('encode'):
+                        payload = self.encode_response(response, room)
+                    
+                    with trace.span('send'):
+                        outbound.enqueue(payload)
+                        outbound.flush(client_socket)
+                    self.tracer.finish(trace)
+                    
+                except socket.timeout:
+                    continue
+                except json.JSONDecodeError:
+                    error_response = {'status': 'error', 'message': 'Mensaje inválido'}
+                    self.metric_requests.labels('unknown', 'error').inc()
+                    with trace.span('send'):
+                        outbound.enqueue(json.dumps(error_response).encode('utf-8'))
+                        outbound.flush(client_socket)
+                    self.tracer.finish(trace)
+                    
+        except SlowConsumerError as e:
+            self.outbound_stats.increment('slow_disconnects')
+            print(f"Cliente lento {address} desconectado: {e}")
+        except Exception as e:
+            print(f"Error manejando cliente {address}: {e}")
+        finally:
+            # Limpiar al desconectar (si otra conexión reanudó la sesión, ya no es nuestra)
+            if self.connections.get(player_id) is connection:
+                del self.connections[player_id]
+            self.closed_bytes['in'] += connection.bytes_received
+            self.closed_bytes['out'] += outbound.bytes_sent
+            
+            # La sala libera el asiento o lo reserva por si vuelve
+            room = room or self.rooms[self.DEFAULT_ROOM]
+            try:
+                room.call('disconnect', room.disconnect, player_id, connection_id, self.session_grace)
+            except RoomClosedError:
+                pass  # La sala ya se retiró: no queda asiento que liberar
+                    
+            client_socket.close()
+            print(f"Cliente {address} desconectado")
+    
+    def process_message(self, player_id, message, trace=NULL_TRACE, room=None):
+        """Procesa los mensajes de los clientes en el actor de su sala
+        
+        room es la sala de la conexión; sin ella, la elige route_message.
+        """
+        action = message.get('action')
+        label = action if action in self.action_metrics else 'unknown'
+        
+        start = time.perf_counter()
+        response = {'status': 'error', 'message': 'Sala no disponible'}
+        if room is not None:
+            try:
+                response = room.call(label, room.run_message, player_id, action, message, trace=trace)
+            except RoomClosedError:
+                response = {'status': 'error', 'message': 'Tu sala se cerró'}
+        else:
+            # La sala elegida pudo retirarse antes de recibir el comando: se vuelve a elegir
+            for _ in range(3):
+                target = self.route_message(action, message)
+                if target is None:
+                    break
+                try:
+                    response = target.call(label, target.run_message, player_id, action, message,
+                                           trace=trace)
+                    break
+                except RoomClosedError:
+                    continue
+        
+        self.action_metrics[label].observe(time.perf_counter() - start)
+        self.metric_requests.labels(label, response.get('status', 'unknown')).inc()
+        
+        return response
+    
+    def encode_response(self, response, room=None):
+        """Serializa una respuesta fuera del lock; el JSON de cada snapshot se genera una vez
+        
+        Los snapshots no cambian después de publicarse, así que el texto del
+        último se guarda y se reutiliza en todas las respuestas que lo llevan.
+        """
+        state = response.get('game_state')
+        if state is None:
+            return json.dumps(response).encode('utf-8')
+        
+        room = room or self.rooms[self.DEFAULT_ROOM]
+        cached = room.encoded_snapshot
+        if cached is not None and cached[0] is state:
+            state_json = cached[1]
+        else:
+            state_json = json.dumps(state)
+            room.encoded_snapshot = (state, state_json)  # Una sola asignación: sin lock
+        
+        rest = json.dumps({key: value for key, value in response.items() if key != 'game_state'})
+        separator = ', ' if len(rest) > 2 else ''
+        return f'{rest[:-1]}{separator}"game_state": {state_json}}}'.encode('utf-8')
+    
 def main():
     print("🎲 Servidor Parqués Mejorado - Sistemas Distribuidos")
     print("="*60)
@@ -602,7 +1446,13 @@ def main():
     except ValueError:
         port = 12345
     
-    server = ParquesServer(host, port)
+    try:
+        metrics_port = input("Puerto de métricas HTTP (Enter para desactivar): ").strip()
+        metrics_port = int(metrics_port) if metrics_port else None
+    except ValueError:
+        metrics_port = None
+    
+    server = ParquesServer(host, port, metrics_port=metrics_port)
     
     try:
         server.start_server()
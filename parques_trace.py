@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Trazas y Perfilado del Servidor de Parqués
+Spans por petición, volcado de peticiones lentas y perfilador por muestreo
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class _NullSpan:
+    """Context manager vacío para cuando el trazado está desactivado"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTrace:
+    """Traza que no registra nada (coste casi nulo en el camino caliente)"""
+    enabled = False
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def add(self, name, start, end):
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+class _Span:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, self.start, time.perf_counter())
+        return False
+
+
+class RequestTrace:
+    """Spans de una petición: recv, decode, lock, handler, encode, send"""
+    enabled = True
+
+    def __init__(self, player_id):
+        self.player_id = player_id
+        self.action = None
+        self.start = time.perf_counter()
+        self.spans = []  # [(nombre, inicio, fin)]
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def add(self, name, start, end):
+        self.spans.append((name, start, end))
+
+    def total(self):
+        """Duración total desde el primer span hasta el último"""
+        if not self.spans:
+            return 0.0
+        first = min(start for _, start, _ in self.spans)
+        last = max(end for _, _, end in self.spans)
+        return last - first
+
+    def to_dict(self):
+        return {
+            'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'player': self.player_id,
+            'action': self.action,
+            'total_ms': round(self.total() * 1000, 3),
+            'spans_ms': {name: round((end - start) * 1000, 3) for name, start, end in self.spans}
+        }
+
+
+class Tracer:
+    """Registra las peticiones más lentas que un umbral en un archivo rotativo"""
+
+    def __init__(self, enabled=False, threshold_ms=50.0, path='parques_trace.log',
+                 max_bytes=1024 * 1024, backup_count=3):
+        self.enabled = enabled
+        self.threshold = threshold_ms / 1000.0
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.logger = None
+        self.slow_requests = 0
+        self.lock = threading.Lock()  # finish se llama desde todos los threads de conexión
+
+    def _get_logger(self):
+        """Crea el logger rotativo la primera vez que se necesita (con el lock tomado)"""
+        if self.logger is None:
+            logger = logging.getLogger(f"parques.trace.{id(self)}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = logging.handlers.RotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            self.logger = logger
+        return self.logger
+
+    def begin(self, player_id):
+        """Empieza la traza de una petición"""
+        if not self.enabled:
+            return NULL_TRACE
+        return RequestTrace(player_id)
+
+    def finish(self, trace):
+        """Termina la traza y la vuelca si superó el umbral"""
+        if not trace.enabled:
+            return
+        if trace.total() >= self.threshold:
+            with self.lock:
+                self.slow_requests += 1
+                logger = self._get_logger()
+            logger.info(json.dumps(trace.to_dict(), ensure_ascii=False))
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        state = "activado" if self.enabled else "desactivado"
+        print(f"Trazado de peticiones {state} (umbral {self.threshold * 1000:.1f} ms, archivo {self.path})")
+        return self.enabled
+
+
+class SamplingProfiler:
+    """Perfilador por muestreo de las pilas de todos los threads
+
+    Se puede activar y desactivar en caliente. Al detenerse escribe las
+    pilas en formato colapsado (compatible con flamegraph.pl).
+    """
+
+    def __init__(self, interval=0.005, output_dir='.'):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.samples = Counter()
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.running:
+                return False
+            self.samples = Counter()
+            self.running = True
+            self.thread = threading.Thread(target=self._run)
+            self.thread.daemon = True
+            self.thread.start()
+        print(f"Perfilador iniciado (muestreo cada {self.interval * 1000:.1f} ms)")
+        return True
+
+    def stop(self):
+        """Detiene el muestreo y devuelve la ruta del archivo generado"""
+        with self.lock:
+            if not self.running:
+                return None
+            self.running = False
+            thread = self.thread
+        thread.join()
+        return self.dump()
+
+    def toggle(self):
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while self.running:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples[self._collapse(frame)] += 1
+            time.sleep(self.interval)
+
+    def _collapse(self, frame):
+        """Convierte una pila en 'raíz;...;hoja'"""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def dump(self):
+        """Escribe las muestras acumuladas y muestra las funciones más frecuentes"""
+        path = os.path.join(self.output_dir, time.strftime("parques_profile_%Y%m%d_%H%M%S.txt"))
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        print(f"Perfil guardado en {path} ({total} muestras)")
+        for name, count in leaves.most_common(10):
+            print(f"  {count * 100 / total:5.1f}%  {name}")
+        return path
+
+
+def install_signal_toggles(tracer, profiler):
+    """SIGUSR1 activa/desactiva el trazado y SIGUSR2 el perfilador (solo Unix)"""
+    if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGUSR1, lambda signum, frame: tracer.toggle())
+    # El perfilador se detiene en otro thread para no bloquear el manejador de señales
+    signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=profiler.toggle, daemon=True).start())
+    return True
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del Cliente de Parqués sin Interfaz
+Cada petición recibe su propia respuesta, también después de un error de red.
+
+Uso:
+    python -m pytest -q test_parques_client.py
+    python -m unittest test_parques_client
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import socket
+import threading
+import time
+import unittest
+
+from parques_client import AsyncParquesClient, ClientSession, ParquesClient, apply_events
+from parques_client_state import thaw
+from test_parques_server import quiet_server
+
+
+class EchoServer:
+    """Servidor mínimo que responde {'echo': acción}; la acción 'slow' tarda delay segundos"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.socket = socket.create_server(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        self.connections = []
+        thread = threading.Thread(target=self.accept_loop, daemon=True)
+        thread.start()
+
+    def accept_loop(self):
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                return
+            self.connections.append(connection)
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+
+    def serve(self, connection):
+        with connection:
+            while True:
+                try:
+                    raw = connection.recv(1024)
+                except OSError:
+                    return
+                if not raw:
+                    return
+                action = json.loads(raw.decode('utf-8'))['action']
+                if action == 'slow':
+                    time.sleep(self.delay)
+                try:
+                    connection.sendall(json.dumps({'status': 'success', 'echo': action}).encode('utf-8'))
+                except OSError:
+                    return
+
+    def close(self):
+        self.socket.close()
+
+
+class LateReplyTest(unittest.TestCase):
+    """Una respuesta que llega después del tiempo de espera no se entrega a la petición siguiente"""
+
+    def setUp(self):
+        self.server = EchoServer(delay=0.3)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_sync_client_drops_the_connection_on_timeout(self):
+        client = ParquesClient('127.0.0.1', self.server.port, timeout=0.1)
+        client.connect()
+        response = client.request({'action': 'slow'})
+        self.assertTrue(response.get('network_error'))
+        self.assertFalse(client.connected)
+        self.assertIsNone(client.socket)
+
+        time.sleep(0.4)  # La respuesta tardía ya llegó al socket viejo
+        response = client.request({'action': 'fast'})
+        self.assertTrue(response.get('network_error'))
+
+        client.connect()
+        self.assertEqual(client.request({'action': 'fast'})['echo'], 'fast')
+        self.assertEqual(client.request({'action': 'other'})['echo'], 'other')
+        client.close()
+
+    def test_async_client_drops_the_connection_on_timeout(self):
+        async def scenario():
+            client = AsyncParquesClient('127.0.0.1', self.server.port, timeout=0.1)
+            await client.connect()
+            response = await client.request({'action': 'slow'})
+            self.assertTrue(response.get('network_error'))
+            self.assertFalse(client.connected)
+
+            await asyncio.sleep(0.4)
+            await client.connect()
+            self.assertEqual((await client.request({'action': 'fast'}))['echo'], 'fast')
+            await client.close()
+
+        asyncio.run(scenario())
+
+
+def over_the_wire(value):
+    """El valor tal como lo recibe el cliente (las claves numéricas pasan a texto)"""
+    return json.loads(json.dumps(value))
+
+
+class ApplyEventsTest(unittest.TestCase):
+    """Los cambios enviados al reanudar reconstruyen el mismo estado que un get_state completo"""
+
+    def setUp(self):
+        output = contextlib.redirect_stdout(io.StringIO())
+        output.__enter__()
+        self.addCleanup(output.__exit__, None, None, None)
+        self.server = quiet_server(room_workers=1)
+        self.addCleanup(self.server.room_workers.shutdown, wait=True)
+        self.room = self.server.rooms[self.server.DEFAULT_ROOM]
+
+    def get_state(self):
+        return over_the_wire(self.server.process_message('p1', {'action': 'get_state'})['game_state'])
+
+    def play(self):
+        """Salidas de la cárcel, movimientos, una captura, chat y un jugador que se va"""
+        game = self.room.game
+
+        def moves():
+            players = list(game.turn_order)
+            game.move_piece_from_jail(players[0])
+            game.move_piece(players[0], 0, 7)
+            game.move_piece_from_jail(players[1])
+            game.move_piece(players[1], 0, 2)  # Fuera de la salida, que es segura
+            target = game.players[players[1]]['pieces'][0]['position']
+            game.players[players[0]]['pieces'][1]['position'] = target - 3
+            game.move_piece(players[0], 1, 3)  # Captura
+            game.next_turn()
+            game.commit()
+            return game.players[players[1]]['pieces'][0]['position']
+
+        self.server.process_message('p1', {'action': 'start_game'})
+        self.assertEqual(self.room.call('unknown', moves), 'jail')
+        self.server.process_message('p2', {'action': 'chat', 'message': '¡ay!'})
+        self.room.call('disconnect', self.room.disconnect, 'p3', 'p3', 0)
+
+    def test_events_rebuild_the_full_state(self):
+        token = self.server.process_message('p1', {'action': 'join', 'name': 'Ana'})['session_token']
+        self.server.process_message('p2', {'action': 'join', 'name': 'Beto'})
+        self.server.process_message('p3', {'action': 'join', 'name': 'Caro'})
+        old_state = self.get_state()
+
+        self.play()
+        response = over_the_wire(self.server.process_message(
+            'p9', {'action': 'resume', 'session_token': token, 'version': old_state['version']}))
+        self.assertGreater(len(response['events']), 1)
+
+        self.assertEqual(apply_events(old_state, response['events']), self.get_state())
+
+        # Igual a través de la sesión del cliente, que parte de su último snapshot
+        session = ClientSession()
+        session.state_store.update(old_state)
+        session.apply_resume(response)
+        self.assertEqual(thaw(session.game_state), self.get_state())
+
+    def test_events_already_seen_are_applied_again_without_error(self):
+        self.server.process_message('p1', {'action': 'join', 'name': 'Ana'})
+        token = self.server.process_message('p2', {'action': 'join', 'name': 'Beto'})['session_token']
+        first = self.get_state()
+        self.play()
+        events = over_the_wire(self.server.process_message(
+            'p9', {'action': 'resume', 'session_token': token, 'version': first['version']}))['events']
+
+        # El cliente ya había visto la mitad de las versiones
+        halfway = apply_events(first, events[:len(events) // 2])
+        self.assertEqual(apply_events(halfway, events), self.get_state())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del Estado del Cliente de Parqués
+Los eventos de diff_states son la única fuente del log, los sonidos y los
+cambios de turno de la interfaz: cada par de estados debe dar exactamente
+los eventos esperados.
+
+Uso:
+    python -m pytest -q test_parques_client_state.py
+    python -m unittest test_parques_client_state
+"""
+
+import unittest
+
+from parques_client_state import (GameStarted, GameStateStore, PieceCaptured, PieceMoved, PlayerJoined,
+                                  PlayerLeft, TurnChanged, diff_states, freeze)
+
+
+def player(name, color, positions=('jail',) * 4):
+    return {'name': name, 'color': color, 'finished_pieces': 0,
+            'pieces': [{'position': position} for position in positions]}
+
+
+def state(players, started=False, turn=None):
+    return {'players': players, 'game_started': started, 'current_turn': turn,
+            'turn_order': list(players) if started else []}
+
+
+ANA = player('Ana', 'rojo')
+BETO = player('Beto', 'verde')
+LOBBY = state({'a': ANA, 'b': BETO})
+PLAYING = state({'a': ANA, 'b': BETO}, started=True, turn='a')
+
+# (descripción, estado anterior, estado nuevo, eventos esperados)
+CASES = [
+    ("sin estado nuevo", LOBBY, None, []),
+    ("primer estado en la sala de espera", None, LOBBY, []),
+    ("primer estado con la partida empezada", None, PLAYING,
+     [GameStarted(('a', 'b')), TurnChanged(None, 'a')]),
+    ("mismo estado", PLAYING, PLAYING, []),
+    ("jugador que se une", state({'a': ANA}), LOBBY, [PlayerJoined('b', 'Beto', 'verde')]),
+    ("jugador que se va", LOBBY, state({'a': ANA}), [PlayerLeft('b', 'Beto', 'verde')]),
+    ("inicio de la partida", LOBBY, PLAYING, [GameStarted(('a', 'b')), TurnChanged(None, 'a')]),
+    ("cambio de turno", PLAYING, state({'a': ANA, 'b': BETO}, started=True, turn='b'),
+     [TurnChanged('a', 'b')]),
+    ("ficha que sale de la cárcel",
+     PLAYING,
+     state({'a': player('Ana', 'rojo', (5, 'jail', 'jail', 'jail')), 'b': BETO}, started=True, turn='a'),
+     [PieceMoved('a', 0, 'rojo', 'jail', 5)]),
+    ("ficha que avanza y pasa el turno",
+     state({'a': player('Ana', 'rojo', (5, 'jail', 'jail', 'jail')), 'b': BETO}, started=True, turn='a'),
+     state({'a': player('Ana', 'rojo', (12, 'jail', 'jail', 'jail')), 'b': BETO}, started=True, turn='b'),
+     [PieceMoved('a', 0, 'rojo', 5, 12), TurnChanged('a', 'b')]),
+    ("ficha que llega a casa",
+     state({'a': player('Ana', 'rojo', (90, 'jail', 'jail', 'jail')), 'b': BETO}, started=True, turn='a'),
+     state({'a': player('Ana', 'rojo', ('home', 'jail', 'jail', 'jail')), 'b': BETO}, started=True, turn='a'),
+     [PieceMoved('a', 0, 'rojo', 90, 'home')]),
+    ("captura: la ficha capturada vuelve a la cárcel",
+     state({'a': player('Ana', 'rojo', (5, 'jail', 'jail', 'jail')),
+            'b': player('Beto', 'verde', (9, 'jail', 'jail', 'jail'))}, started=True, turn='a'),
+     state({'a': player('Ana', 'rojo', (9, 'jail', 'jail', 'jail')),
+            'b': player('Beto', 'verde', ('jail',) * 4)}, started=True, turn='b'),
+     [PieceMoved('a', 0, 'rojo', 5, 9),
+      PieceMoved('b', 0, 'verde', 9, 'jail'), PieceCaptured('b', 0, 'verde', 9, 'a'),
+      TurnChanged('a', 'b')]),
+    ("ficha devuelta a la cárcel sin nadie que llegue a su casilla",
+     state({'a': player('Ana', 'rojo', (9, 'jail', 'jail', 'jail')), 'b': BETO}, started=True, turn='a'),
+     state({'a': player('Ana', 'rojo', ('jail',) * 4), 'b': BETO}, started=True, turn='a'),
+     [PieceMoved('a', 0, 'rojo', 9, 'jail'), PieceCaptured('a', 0, 'rojo', 9, None)]),
+]
+
+
+class DiffStatesTest(unittest.TestCase):
+
+    def test_cases(self):
+        for description, old, new, expected in CASES:
+            with self.subTest(description):
+                self.assertEqual(diff_states(old, new), expected)
+
+    def test_frozen_snapshots_give_the_same_events(self):
+        for description, old, new, expected in CASES:
+            with self.subTest(description):
+                self.assertEqual(diff_states(freeze(old), freeze(new)), expected)
+
+
+class GameStateStoreTest(unittest.TestCase):
+
+    def test_update_keeps_a_newer_publication(self):
+        store = GameStateStore()
+        store.publish(dict(PLAYING, version=8, current_turn='b'))
+        # La respuesta de una petición anterior llega después de la publicación del thread de red
+        store.update(dict(PLAYING, version=7))
+        self.assertEqual(store.state['version'], 7)
+        self.assertEqual(store.latest()['version'], 8)
+
+        self.assertEqual(store.swap(), [TurnChanged('a', 'b')])
+        self.assertEqual(store.state['version'], 8)
+
+    def test_update_replaces_an_older_publication(self):
+        store = GameStateStore()
+        store.publish(dict(PLAYING, version=7))
+        store.update(dict(PLAYING, version=8, current_turn='b'))
+        self.assertEqual(store.swap(), [])
+        self.assertEqual(store.state['version'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
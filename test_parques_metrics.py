@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las Métricas del Servidor de Parqués
+El texto de /metrics debe poder leerlo un parser estricto del formato 0.0.4:
+cada muestra pertenece a una familia declarada con # TYPE.
+
+Uso:
+    python -m pytest -q test_parques_metrics.py
+    python -m unittest test_parques_metrics
+"""
+
+import re
+import unittest
+
+from parques_metrics import MetricsRegistry
+from test_parques_server import quiet_server
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (\S+)$')
+# Sufijos de muestra que admite cada tipo de familia
+SUFFIXES = {'counter': ('',), 'gauge': ('',), 'untyped': ('',),
+            'histogram': ('_bucket', '_sum', '_count')}
+
+
+def parse_exposition(text):
+    """{familia: (tipo, [(muestra, valor)])}; AssertionError si algo no cumple el formato"""
+    families = {}
+    for line in text.splitlines():
+        if not line:
+            continue
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ', 3)
+            assert name not in families, f"Familia repetida: {name}"
+            assert kind in SUFFIXES, f"Tipo desconocido: {line}"
+            families[name] = (kind, [])
+            continue
+        assert not line.startswith('#'), f"Comentario inesperado: {line}"
+        match = SAMPLE.match(line)
+        assert match, f"Muestra mal formada: {line}"
+        sample, _, value = match.groups()
+        float(value.replace('+Inf', 'inf'))
+        for name, (kind, samples) in families.items():
+            if any(sample == name + suffix for suffix in SUFFIXES[kind]):
+                samples.append((sample, value))
+                break
+        else:
+            raise AssertionError(f"Muestra sin # TYPE de su familia: {line}")
+    return families
+
+
+class ExpositionTest(unittest.TestCase):
+
+    def test_counter_family_and_samples_share_the_name(self):
+        registry = MetricsRegistry()
+        registry.counter('parques_requests', 'Peticiones', ('action',)).labels('join').inc(3)
+        families = parse_exposition(registry.render())
+        self.assertEqual(families['parques_requests_total'],
+                         ('counter', [('parques_requests_total', '3')]))
+
+    def test_histogram_samples_belong_to_their_family(self):
+        registry = MetricsRegistry()
+        registry.histogram('parques_latency_seconds', 'Latencia', buckets=(0.1, 1.0)).observe(0.5)
+        kind, samples = parse_exposition(registry.render())['parques_latency_seconds']
+        self.assertEqual(kind, 'histogram')
+        self.assertEqual([name for name, _ in samples],
+                         ['parques_latency_seconds_bucket'] * 3
+                         + ['parques_latency_seconds_sum', 'parques_latency_seconds_count'])
+
+    def test_server_output_parses(self):
+        server = quiet_server(room_workers=1)
+        try:
+            server.process_message('p1', {'action': 'get_state'})
+            families = parse_exposition(server.metrics.render())
+        finally:
+            server.room_workers.shutdown(wait=True)
+        for name in ('parques_requests_total', 'parques_bytes_sent_total',
+                     'parques_outbound_slow_disconnects_total'):
+            self.assertEqual(families[name][0], 'counter')
+        self.assertEqual(families['parques_requests_total'][1],
+                         [('parques_requests_total', '1')])
+
+
+if __name__ == '__main__':
+    unittest.main()
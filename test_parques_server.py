@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del Servidor de Parqués
+Comportamiento que los clientes dan por hecho: una respuesta por petición
+aunque el cliente sea lento, y comandos de cada sala de uno en uno y en
+orden de llegada.
+
+Uso:
+    python -m pytest -q test_parques_server.py
+    python -m unittest test_parques_server
+"""
+
+import contextlib
+import io
+import json
+import socket
+import threading
+import time
+import unittest
+
+from parques_client import ResponseReader
+from parques_server_improved import OutboundBuffer, ParquesServer, RoomClosedError, SlowConsumerError
+
+
+def quiet_server(**kwargs):
+    """ParquesServer sin socket de escucha y sin imprimir en la consola"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = ParquesServer('127.0.0.1', 0, **kwargs)
+    server.socket.close()
+    return server
+
+
+class OutboundBufferTest(unittest.TestCase):
+
+    def test_replies_are_never_coalesced(self):
+        a, b = socket.socketpair()
+        with a, b:
+            outbound = OutboundBuffer(max_bytes=1024)
+            outbound.enqueue(b'{"n": 1}')
+            outbound.enqueue(b'{"n": 2}')
+            self.assertTrue(outbound.flush(a))
+            self.assertEqual(b.recv(100), b'{"n": 1}{"n": 2}')
+
+    def test_reply_over_the_limit_disconnects(self):
+        outbound = OutboundBuffer(max_bytes=20)
+        outbound.enqueue(b'{"reply": 1}')
+        with self.assertRaises(SlowConsumerError):
+            outbound.enqueue(b'{"reply": 2}')
+        self.assertEqual(list(outbound.frames), [b'{"reply": 1}'])
+
+    def test_stalled_client_is_disconnected_after_the_timeout(self):
+        a, b = socket.socketpair()
+        with a, b:
+            a.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+            a.setblocking(False)
+            outbound = OutboundBuffer(max_bytes=1024 * 1024, stall_timeout=0.05)
+            outbound.enqueue(b'x' * (512 * 1024))
+            self.assertFalse(outbound.flush(a, timeout=0.01))
+            time.sleep(0.1)
+            with self.assertRaises(SlowConsumerError):
+                outbound.flush(a, timeout=0.01)
+
+
+class SlowClientTest(unittest.TestCase):
+
+    def test_slow_client_gets_every_reply_or_is_disconnected(self):
+        """Un cliente que no lee recibe sus respuestas completas y en orden hasta que se le desconecta"""
+        server = quiet_server(outbound_max_bytes=8192)
+        server_side, client_side = socket.socketpair()
+        server_side.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        processed = server.action_metrics['get_state']
+
+        thread = threading.Thread(target=server.handle_client, args=(server_side, ('127.0.0.1', 1)),
+                                  daemon=True)
+        with contextlib.redirect_stdout(io.StringIO()), client_side:
+            thread.start()
+            sent = 0
+            while thread.is_alive() and sent < 50:
+                client_side.sendall(json.dumps({'action': 'get_state'}).encode('utf-8'))
+                sent += 1
+                # Una petición a la vez: el servidor no separa mensajes pegados
+                deadline = time.time() + 5
+                while sum(processed.counts) < sent and time.time() < deadline:
+                    time.sleep(0.001)
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+            reader = ResponseReader()
+            replies = []
+            client_side.settimeout(1.0)
+            while True:
+                raw = client_side.recv(65536)
+                if not raw:
+                    break
+                reader.feed(raw)
+                response = reader.next_response()
+                while response is not None:
+                    replies.append(response)
+                    response = reader.next_response()
+
+        stats = server.outbound_stats.snapshot()
+        self.assertEqual(stats['slow_disconnects'], 1)
+        # Las respuestas que llegaron son las primeras, sin huecos; el resto no llegó nunca
+        self.assertTrue(replies)
+        self.assertLess(len(replies), sent)
+        self.assertTrue(all(reply['status'] == 'success' and 'game_state' in reply for reply in replies))
+
+
+class GameRoomTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = quiet_server(room_workers=2)
+        self.room = self.server.rooms[ParquesServer.DEFAULT_ROOM]
+
+    def tearDown(self):
+        self.server.room_workers.shutdown(wait=True)
+
+    def test_commands_run_one_at_a_time_in_arrival_order(self):
+        room = self.room
+        order = []
+        running = [0, 0]  # Ejecutando ahora, máximo visto
+        busy = threading.Event()
+        unblock = threading.Event()
+
+        def command(n):
+            running[0] += 1
+            running[1] = max(running)
+            if n == 0:
+                busy.set()
+                unblock.wait(5)
+            order.append(n)
+            running[0] -= 1
+            return n
+
+        results = {}
+
+        def caller(n):
+            results[n] = room.call('get_state', command, n)
+
+        threads = [threading.Thread(target=caller, args=(0,))]
+        threads[0].start()
+        self.assertTrue(busy.wait(5))
+        # Con la sala ocupada, cada comando espera en el buzón en el orden en que llegó
+        for n in range(1, 20):
+            thread = threading.Thread(target=caller, args=(n,))
+            thread.start()
+            threads.append(thread)
+            deadline = time.time() + 5
+            while len(room.mailbox) < n and time.time() < deadline:
+                time.sleep(0.001)
+        unblock.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(order, list(range(20)))
+        self.assertEqual(running[1], 1)
+        self.assertEqual(results, {n: n for n in range(20)})
+        self.assertFalse(room.scheduled)
+        self.assertFalse(room.mailbox)
+
+    def test_uncontended_command_runs_on_the_caller_thread(self):
+        threads = []
+        self.room.call('get_state', lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertFalse(self.room.scheduled)
+
+    def test_command_errors_reach_the_caller(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.room.call('get_state', lambda: 1 / 0)
+        self.assertEqual(self.room.call('get_state', lambda: 'ok'), 'ok')
+
+    def test_empty_room_is_retired_and_its_connections_get_an_error(self):
+        server = self.server
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = server.process_message('p1', {'action': 'join', 'name': 'Ana', 'room': 'mesa-1'})
+            self.assertEqual(response['room'], 'mesa-1')
+            room = server.rooms['mesa-1']
+
+            room.call('disconnect', room.disconnect, 'p1', 'p1', 0)
+            self.assertNotIn('mesa-1', server.rooms)
+            self.assertTrue(room.closed)
+            with self.assertRaises(RoomClosedError):
+                room.call('get_state', room.handle_get_state)
+
+            # Una conexión que seguía en la sala recibe un error, no la sala principal
+            response = server.process_message('p2', {'action': 'get_state'}, room=room)
+            self.assertEqual(response['status'], 'error')
+
+            # Unirse otra vez con el mismo nombre crea una sala nueva
+            response = server.process_message('p3', {'action': 'join', 'name': 'Beto', 'room': 'mesa-1'})
+        self.assertEqual(response['status'], 'success')
+        self.assertIsNot(server.rooms['mesa-1'], room)
+
+    def test_default_room_is_never_retired(self):
+        server = self.server
+        with contextlib.redirect_stdout(io.StringIO()):
+            server.process_message('p1', {'action': 'join', 'name': 'Ana'})
+            self.room.call('disconnect', self.room.disconnect, 'p1', 'p1', 0)
+        self.assertIs(server.rooms[ParquesServer.DEFAULT_ROOM], self.room)
+        self.assertFalse(self.room.closed)
+
+
+class RoomRoutingTest(unittest.TestCase):
+
+    def setUp(self):
+        output = contextlib.redirect_stdout(io.StringIO())
+        output.__enter__()
+        self.addCleanup(output.__exit__, None, None, None)
+        self.server = quiet_server(room_workers=1, max_rooms=2)
+        self.addCleanup(self.server.room_workers.shutdown, wait=True)
+
+    def join(self, connection_id, room):
+        return self.server.process_message(connection_id, {'action': 'join', 'name': connection_id, 'room': room})
+
+    def test_invalid_room_names_are_rejected(self):
+        for name in ('mesa 1', 'mesa/1', 'x' * 33, 'mesa-ñ', 7, ['mesa']):
+            with self.subTest(name=name):
+                self.assertEqual(self.join('p1', name)['status'], 'error')
+        self.assertEqual(list(self.server.rooms), [ParquesServer.DEFAULT_ROOM])
+
+        # Sin sala, o con una vacía, se entra a la principal
+        self.assertEqual(self.join('p1', None)['room'], ParquesServer.DEFAULT_ROOM)
+        self.assertEqual(self.join('p2', '')['room'], ParquesServer.DEFAULT_ROOM)
+
+    def test_room_limit_counts_the_default_room(self):
+        self.assertEqual(self.join('p1', 'mesa-1')['room'], 'mesa-1')
+        self.assertEqual(self.join('p2', 'mesa-1')['room'], 'mesa-1')
+        self.assertEqual(self.join('p3', 'mesa-2')['status'], 'error')
+        self.assertNotIn('mesa-2', self.server.rooms)
+
+        # Al retirarse una sala queda lugar para otra
+        room = self.server.rooms['mesa-1']
+        for player_id in ('p1', 'p2'):
+            room.call('disconnect', room.disconnect, player_id, player_id, 0)
+        self.assertEqual(self.join('p3', 'mesa-2')['room'], 'mesa-2')
+
+    def test_resume_goes_to_the_room_of_the_session(self):
+        token = self.join('p1', 'mesa-1')['session_token']
+        response = self.server.process_message('p9', {'action': 'resume', 'session_token': token})
+        self.assertEqual((response['status'], response['room']), ('success', 'mesa-1'))
+
+    def test_room_with_a_reserved_seat_is_retired_only_when_the_seat_expires(self):
+        self.join('p1', 'mesa-1')
+        room = self.server.rooms['mesa-1']
+        room.call('disconnect', room.disconnect, 'p1', 'p1', 60)
+        self.assertIs(self.server.rooms['mesa-1'], room)
+
+        room.player_sessions['p1'].detached_at -= 120
+        room.call('expire_sessions', room.expire_sessions, 60)
+        self.assertNotIn('mesa-1', self.server.rooms)
+        self.assertTrue(room.closed)
+        self.assertEqual(self.server.session_rooms, {})
+
+
+class AdmissionTest(unittest.TestCase):
+
+    def setUp(self):
+        output = contextlib.redirect_stdout(io.StringIO())
+        output.__enter__()
+        self.addCleanup(output.__exit__, None, None, None)
+
+    def start(self, **kwargs):
+        self.server = quiet_server(room_workers=1, **kwargs)
+        self.addCleanup(self.server.room_workers.shutdown, wait=True)
+        # Al terminar: cerrar las conexiones, detener el servidor y esperar a que sus threads acaben
+        self.addCleanup(self.wait_idle)
+        self.addCleanup(setattr, self.server, 'running', False)
+
+    def connect(self, port, ip='127.0.0.1'):
+        """Entrega al servidor una conexión como si viniera de accept; devuelve el lado del cliente"""
+        server_side, client_side = socket.socketpair()
+        self.addCleanup(client_side.close)
+        client_side.settimeout(5)
+        self.server.admit(server_side, (ip, port), time.perf_counter())
+        return client_side
+
+    def request(self, client_side, message):
+        client_side.sendall(json.dumps(message).encode('utf-8'))
+        return json.loads(client_side.recv(65536).decode('utf-8'))
+
+    def assert_rejected(self, client_side, reason):
+        response = json.loads(client_side.recv(65536).decode('utf-8'))
+        self.assertEqual(response['status'], 'error')
+        self.assertTrue(response['busy'])
+        self.assertEqual(client_side.recv(1), b'')  # Y se cierra la conexión
+        self.assertEqual(self.server.metric_rejected.labels(reason).value, 1)
+
+    def wait_for(self, condition):
+        deadline = time.time() + 5
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def wait_idle(self):
+        self.wait_for(lambda: self.server.connection_pool.busy == 0)
+
+    def test_full_pool_answers_busy_and_frees_the_slot_on_disconnect(self):
+        self.start(max_connections=1)
+        first = self.connect(1)
+        self.assertEqual(self.request(first, {'action': 'get_state'})['status'], 'success')
+
+        self.assert_rejected(self.connect(2), 'busy')
+
+        first.close()
+        self.wait_idle()
+        third = self.connect(3)
+        self.assertEqual(self.request(third, {'action': 'get_state'})['status'], 'success')
+        self.assertEqual(self.server.connection_pool.workers, 1)  # Se reutilizó el mismo thread
+
+    def test_per_ip_limit_and_release(self):
+        self.start(max_connections_per_ip=1)
+        first = self.connect(1)
+        self.assertEqual(self.request(first, {'action': 'get_state'})['status'], 'success')
+        other_ip = self.connect(2, ip='10.0.0.2')
+        self.assertEqual(self.request(other_ip, {'action': 'get_state'})['status'], 'success')
+
+        self.assert_rejected(self.connect(3), 'per_ip')
+
+        first.close()
+        self.wait_for(lambda: '127.0.0.1' not in self.server.ip_connections)
+        again = self.connect(4)
+        self.assertEqual(self.request(again, {'action': 'get_state'})['status'], 'success')
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_get_state_only_reads_the_committed_snapshot(self):
+        server = quiet_server(room_workers=1)
+        self.addCleanup(server.room_workers.shutdown, wait=True)
+        game = server.game
+        with contextlib.redirect_stdout(io.StringIO()):
+            server.process_message('p1', {'action': 'join', 'name': 'Ana'})
+        snapshot, version, journal = game.snapshot, game.version, list(game.journal)
+
+        game.commit = None  # Leer el estado no debe publicar nada
+        for _ in range(3):
+            response = server.process_message('p1', {'action': 'get_state'})
+            self.assertIs(response['game_state'], snapshot)
+        self.assertEqual((game.version, list(game.journal)), (version, journal))
+        self.assertEqual(snapshot['players']['p1']['name'], 'Ana')
+
+
+class SessionResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = quiet_server(room_workers=1)
+        self.room = self.server.rooms[ParquesServer.DEFAULT_ROOM]
+        output = contextlib.redirect_stdout(io.StringIO())
+        output.__enter__()
+        self.addCleanup(output.__exit__, None, None, None)
+        self.token = self.server.process_message('p1', {'action': 'join', 'name': 'Ana'})['session_token']
+        self.server.process_message('p2', {'action': 'join', 'name': 'Beto'})
+
+    def tearDown(self):
+        self.server.room_workers.shutdown(wait=True)
+
+    def resume(self, connection_id, version=None, token=None):
+        return self.server.process_message(connection_id, {
+            'action': 'resume', 'session_token': token or self.token, 'version': version})
+
+    def test_valid_token_returns_the_seat_and_only_the_missed_changes(self):
+        version = self.room.game.version
+        self.server.process_message('p1', {'action': 'chat', 'message': 'hola'})
+        self.room.call('disconnect', self.room.disconnect, 'p1', 'p1', 60)
+
+        response = self.resume('p9', version)
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(response['player_id'], 'p1')
+        self.assertEqual(response['version'], version + 1)
+        self.assertEqual([event['version'] for event in response['events']], [version + 1])
+        self.assertNotIn('game_state', response)
+        session = self.room.player_sessions['p1']
+        self.assertEqual(session.connection_id, 'p9')
+        self.assertIsNone(session.detached_at)
+
+        # Al día: no hay nada que enviar
+        self.assertEqual(self.resume('p9', response['version'])['events'], [])
+
+    def test_expired_token_is_rejected(self):
+        self.room.call('disconnect', self.room.disconnect, 'p1', 'p1', 60)
+        self.room.player_sessions['p1'].detached_at -= 120
+        self.room.call('expire_sessions', self.room.expire_sessions, 60)
+
+        response = self.resume('p9', self.room.game.version)
+        self.assertEqual(response['status'], 'error')
+        self.assertNotIn('p1', self.room.game.players)
+        self.assertEqual(self.resume('p9', token='no-existe')['status'], 'error')
+
+    def test_version_older_than_the_journal_gets_the_full_state(self):
+        version = self.room.game.version
+        for n in range(self.room.game.JOURNAL_SIZE + 1):
+            self.server.process_message('p1', {'action': 'chat', 'message': f'mensaje {n}'})
+
+        for old_version in (version, None, 'x', self.room.game.version + 5):
+            with self.subTest(version=old_version):
+                response = self.resume('p9', old_version)
+                self.assertEqual(response['status'], 'success')
+                self.assertNotIn('events', response)
+                self.assertIs(response['game_state'], self.room.game.snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()